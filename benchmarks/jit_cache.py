@@ -0,0 +1,91 @@
+# SPDX-License-Identifier: BSD-3-Clause
+"""
+Compare the startup time of the compiled kernels (``vendeeglobe.utils``) with a
+cold and a warm numba cache, and with the NumPy versions used when numba is not
+installed.
+
+Each measurement runs in a fresh Python process, with a temporary cache directory
+(``NUMBA_CACHE_DIR``): the first run compiles the kernels and fills the cache, the
+second one loads them from the cache. The time of a short workload (moving ships
+and sampling the wind, as in a race step) is also reported.
+
+Usage:
+    python jit_cache.py [--ships N] [--steps N]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+CODE = """
+import json, sys, time
+if %(no_numba)r:
+    sys.modules["numba"] = None
+t0 = time.perf_counter()
+from vendeeglobe import utils
+utils.pre_compile()
+startup = time.perf_counter() - t0
+
+import numpy as np
+
+rng = np.random.default_rng(42)
+sea_array = (rng.random((180, 360)) > 0.3).astype(np.int64)
+sea_array.setflags(write=False)
+u = rng.normal(0.0, 10.0, (8, 90, 180))
+v = rng.normal(0.0, 10.0, (8, 90, 180))
+lat = rng.uniform(-60.0, 60.0, %(ships)d)
+lon = rng.uniform(-180.0, 180.0, %(ships)d)
+headings = rng.uniform(0.0, 360.0, %(ships)d)
+t0 = time.perf_counter()
+for step in range(%(steps)d):
+    t = np.full(len(lat), step * 0.05)
+    wu, wv = utils.interpolate_uv(u, v, lat, lon, t, 2.0, 2.0, 3.0, 1.0, True)
+    fx, fy = utils.wind_force_many(headings, wu, wv)
+    lat, lon, dist = utils.march_rays(
+        sea_array,
+        lat,
+        lon,
+        utils.lat_degs_from_length(fy * 0.2),
+        utils.lon_degs_from_length(fx * 0.2, lat),
+    )
+workload = time.perf_counter() - t0
+print(json.dumps({"startup": startup, "workload": workload}))
+"""
+
+
+def measure(cache_dir: str, no_numba: bool, ships: int, steps: int) -> dict:
+    code = CODE % {"no_numba": no_numba, "ships": ships, "steps": steps}
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "NUMBA_CACHE_DIR": cache_dir},
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"The measurement failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ships", type=int, default=50)
+    parser.add_argument("--steps", type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        results = {
+            "cold cache": measure(cache_dir, False, args.ships, args.steps),
+            "warm cache": measure(cache_dir, False, args.ships, args.steps),
+            "no numba": measure(cache_dir, True, args.ships, args.steps),
+        }
+    print()
+    print(f"{'':>12} {'startup (s)':>12} {f'{args.steps} steps (s)':>16}")
+    for name, result in results.items():
+        print(f"{name:>12} {result['startup']:>12.3f} {result['workload']:>16.3f}")
+
+
+if __name__ == "__main__":
+    main()
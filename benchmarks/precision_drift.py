@@ -0,0 +1,98 @@
+# SPDX-License-Identifier: BSD-3-Clause
+"""
+Compare the trajectories of ships when the weather fields are stored with
+different precisions (see ``vendeeglobe.weather.convert_fields``).
+
+The same race (same seed and bots) is run headless once per precision, and the
+positions of the ships are compared to the ones obtained with float64 fields.
+
+Usage:
+    python precision_drift.py [--seed SEED] [--time-limit SECONDS] [--ships N]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+import vendeeglobe as vg
+from vendeeglobe.headless import HeadlessEngine
+from vendeeglobe.utils import distance_on_surface, goto
+from vendeeglobe.weather import PRECISIONS
+
+
+class Bot:
+    """
+    Sail towards the first checkpoint, starting with a different heading offset
+    for each ship so that the ships explore different parts of the weather.
+    """
+
+    def __init__(self, team: str, offset: float):
+        self.team = team
+        self.offset = offset
+
+    def run(self, t, dt, longitude, latitude, heading, speed, vector, **kwargs):
+        target = vg.config.checkpoints[0]
+        instructions = vg.Instructions()
+        angle = goto(
+            vg.Location(longitude=longitude, latitude=latitude),
+            vg.Location(longitude=target.longitude, latitude=target.latitude),
+        )
+        instructions.heading = vg.Heading(angle + self.offset)
+        return instructions
+
+
+def run(precision: str, seed: int, time_limit: float, nships: int):
+    bots = [
+        Bot(team=f"ship{i}", offset=i * 60.0 / nships - 30.0) for i in range(nships)
+    ]
+    engine = HeadlessEngine(
+        bots=bots,
+        time_limit=time_limit,
+        seed=seed,
+        precision=precision,
+    )
+    nbytes = sum(array.nbytes for array in engine.weather.fields.values())
+    trajectory = []
+    t0 = time.time()
+    engine.initialize_time()
+    while not engine.finished:
+        engine.advance(min(engine.time_step, time_limit - engine.current_time))
+        trajectory.append(
+            np.stack([engine.fleet.longitude.copy(), engine.fleet.latitude.copy()])
+        )
+    return np.array(trajectory), nbytes, time.time() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--time-limit", type=float, default=60.0)
+    parser.add_argument("--ships", type=int, default=10)
+    args = parser.parse_args()
+
+    results = {
+        precision: run(precision, args.seed, args.time_limit, args.ships)
+        for precision in PRECISIONS
+    }
+    reference = results["float64"][0]
+    print()
+    print(
+        f"{'precision':>10} {'memory (MB)':>12} {'race (s)':>9} "
+        f"{'mean drift (km)':>16} {'max drift (km)':>15}"
+    )
+    for precision, (trajectory, nbytes, duration) in results.items():
+        drift = distance_on_surface(
+            longitude1=trajectory[:, 0].ravel(),
+            latitude1=trajectory[:, 1].ravel(),
+            longitude2=reference[:, 0].ravel(),
+            latitude2=reference[:, 1].ravel(),
+        )
+        print(
+            f"{precision:>10} {nbytes / 1e6:12.1f} {duration:9.2f} "
+            f"{drift.mean():16.3f} {drift.max():15.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
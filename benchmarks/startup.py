@@ -0,0 +1,128 @@
+# SPDX-License-Identifier: BSD-3-Clause
+"""
+Measure the startup time of vendeeglobe, and check it against time budgets.
+
+Each measurement runs in a fresh Python process:
+
+- the import of the bot API (``from vendeeglobe import Instructions, Location``),
+  which must not import the engines, numba, scipy or the GUI stack;
+- the creation of a ``HeadlessEngine`` (imports, JIT compilation, map loading and
+  weather generation), which must not import the GUI stack. It is run twice, and
+  the budget applies to the second run, when the caches are warm;
+- with ``--graphics``, the creation of an ``Engine`` (which needs a display).
+
+The script exits with a non-zero status if a budget is exceeded.
+
+Usage:
+    python startup.py [--seed SEED] [--api-budget SECONDS]
+                      [--headless-budget SECONDS] [--graphics]
+                      [--graphics-budget SECONDS]
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+GUI_MODULES = ("PyQt5", "PySide2", "pyqtgraph", "OpenGL", "matplotlib")
+HEAVY_MODULES = ("numba", "scipy", "PIL", "vendeeglobe.headless") + GUI_MODULES
+
+API = """
+import json, sys, time
+t0 = time.perf_counter()
+from vendeeglobe import Instructions, Location
+elapsed = time.perf_counter() - t0
+print(json.dumps({
+    "times": {"import": elapsed},
+    "modules": [m for m in %(modules)r if m in sys.modules],
+}))
+"""
+
+ENGINE = """
+import json, sys, time
+t0 = time.perf_counter()
+import vendeeglobe as vg
+from vendeeglobe.timing import startup_times
+
+
+class Bot:
+    team = "bot"
+
+    def run(self, **kwargs):
+        return vg.Instructions()
+
+
+engine = vg.%(engine)s(bots=[Bot()], seed=%(seed)d)
+elapsed = time.perf_counter() - t0
+startup_times["other"] = elapsed - sum(startup_times.values())
+print(json.dumps({
+    "times": {**startup_times, "total": elapsed},
+    "modules": [m for m in %(modules)r if m in sys.modules],
+}))
+"""
+
+
+def measure(code: str) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"The measurement failed:\n{result.stderr}")
+    # The engines print their progress: the measurements are on the last line
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def check(name: str, result: dict, budget: float, forbidden: tuple) -> bool:
+    total = result["times"].get("total", sum(result["times"].values()))
+    print(f"{name}:")
+    for stage, elapsed in result["times"].items():
+        print(f"  {stage:>16}: {elapsed:.3f} s")
+    ok = total <= budget
+    print(f"  budget {budget:.3f} s: {'ok' if ok else 'EXCEEDED'}")
+    imported = [m for m in result["modules"] if m in forbidden]
+    if imported:
+        print(f"  unexpected imports: {', '.join(imported)}")
+    return ok and not imported
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--api-budget", type=float, default=0.5)
+    parser.add_argument("--headless-budget", type=float, default=3.0)
+    parser.add_argument("--graphics", action="store_true")
+    parser.add_argument("--graphics-budget", type=float, default=6.0)
+    args = parser.parse_args()
+
+    results = [
+        check(
+            "Bot API import",
+            measure(API % {"modules": HEAVY_MODULES}),
+            args.api_budget,
+            HEAVY_MODULES,
+        )
+    ]
+    engine = ENGINE % {
+        "engine": "HeadlessEngine",
+        "seed": args.seed,
+        "modules": GUI_MODULES,
+    }
+    # The first run fills the weather and JIT caches
+    check("Headless engine (cold caches)", measure(engine), float("inf"), ())
+    results.append(
+        check(
+            "Headless engine (warm caches)",
+            measure(engine),
+            args.headless_budget,
+            GUI_MODULES,
+        )
+    )
+    if args.graphics:
+        engine = ENGINE % {"engine": "Engine", "seed": args.seed, "modules": ()}
+        results.append(check("Engine", measure(engine), args.graphics_budget, ()))
+    if not all(results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
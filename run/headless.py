@@ -0,0 +1,21 @@
+# SPDX-License-Identifier: BSD-3-Clause
+
+import importlib
+import glob
+
+import vendeeglobe as vg
+
+
+bots = []
+for repo in glob.glob("*_bot"):
+    module = importlib.import_module(f"{repo}")
+    bots.append(module.Bot())
+
+result = vg.play_headless(
+    bots=bots,  # List of bots to use
+    seed=None,  # Seed for generating the weather
+    time_limit=60 * 8,  # Time limit in seconds
+    time_step=0.05,  # Fixed time step in seconds
+)
+for name, summary in result.players.items():
+    print(summary)
@@ -0,0 +1,21 @@
+# SPDX-License-Identifier: BSD-3-Clause
+
+import importlib
+import glob
+
+import vendeeglobe as vg
+
+
+if __name__ == "__main__":
+    bots = []
+    for repo in glob.glob("*_bot"):
+        module = importlib.import_module(f"{repo}")
+        bots.append(module.Bot())
+
+    vg.play_tournament(
+        bots=bots,  # List of bots to use
+        rounds=50,  # Number of races, each with a different weather seed
+        seeds=None,  # Or supply a list of weather seeds (one per race)
+        max_workers=None,  # Number of processes (defaults to the number of CPUs)
+        test=False,
+    )
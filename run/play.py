@@ -19,7 +19,7 @@ vg.play(
     start=start,  # Starting location for all bots
     seed=None,  # Seed for generating the weather
     time_limit=60 * 8,  # Time limit in seconds
-    speedup=None,  # Time speedup factor (this one is a little buggy!)
+    speedup=None,  # Time speedup factor
     course_preview=None,  # A list of checkpoints should be supplied: eg bots[0].course
     high_contrast=False,
 )
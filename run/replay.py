@@ -0,0 +1,11 @@
+# SPDX-License-Identifier: BSD-3-Clause
+
+import sys
+
+import vendeeglobe as vg
+
+# Replay a race recorded with e.g. vg.play(bots=bots, record="my_race")
+vg.replay(
+    directory=sys.argv[1] if len(sys.argv) > 1 else "my_race",
+    speed=10,  # Playback speed, from 1 to 100 times the speed of the race
+)
@@ -2,22 +2,56 @@
 
 # flake8: noqa F401
 
+import importlib
+import time
+
 from .config import config
 from .core import Checkpoint, Heading, Instructions, Location, Vector
-from .engine import Engine
+from .timing import record_startup_time
+
+# The engines pull in numba, scipy and (for the graphics) the whole Qt/OpenGL stack:
+# they are only imported when they are first used, so that e.g. importing the
+# ``Instructions`` in a bot is fast.
+_LAZY_ATTRIBUTES = {
+    "Engine": ".engine",
+    "HeadlessEngine": ".headless",
+    "play_headless": ".headless",
+    "play_tournament": ".tournament",
+}
+
+
+def __getattr__(name):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    t0 = time.time()
+    module = importlib.import_module(_LAZY_ATTRIBUTES[name], __name__)
+    record_startup_time("import", time.time() - t0)
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
 
 
 def play(*args, **kwargs):
-    eng = Engine(*args, **kwargs)
+    eng = __getattr__("Engine")(*args, **kwargs)
     eng.run()
 
 
+def replay(*args, **kwargs):
+    from .replay import replay
+
+    replay(*args, **kwargs)
+
+
 __all__ = [
     "Checkpoint",
+    "HeadlessEngine",
     "Heading",
     "Instructions",
     "Location",
     "Vector",
     "config",
     "play",
+    "play_headless",
+    "play_tournament",
+    "replay",
 ]
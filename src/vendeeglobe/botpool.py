@@ -0,0 +1,291 @@
+# SPDX-License-Identifier: BSD-3-Clause
+
+import math
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+import traceback
+from dataclasses import dataclass
+from multiprocessing.connection import Connection, wait
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from .core import Instructions
+from .shared import attach_arrays, share_arrays
+
+# The exceptions raised when talking to a worker process which has died
+_DEAD_WORKER_ERRORS = (EOFError, OSError)
+
+
+@dataclass
+class BotStats:
+    """
+    Timing statistics for a bot. Times are the CPU time (in seconds) spent by the
+    thread or process running the bot.
+
+    In the ``"processes"`` dispatch mode, ``timeouts`` counts the steps where the
+    bot did not reply before the deadline or used more than its CPU-time budget,
+    and ``dead`` is set when the worker process of the bot has died (which also
+    counts as an error).
+    """
+
+    calls: int = 0
+    timeouts: int = 0
+    errors: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+    dead: bool = False
+
+    @property
+    def mean_time(self) -> float:
+        return self.total_time / max(self.calls, 1)
+
+    def record(self, elapsed: float, error: bool = False):
+        self.calls += 1
+        self.errors += int(error)
+        self.total_time += elapsed
+        self.max_time = max(self.max_time, elapsed)
+
+
+def _bot_worker(conn: Connection, bot: Any, world_map: Any):
+    """
+    Run a bot in a dedicated process.
+    The bot keeps its state between steps, as it would in the main process.
+
+    Each request contains the step number, the lightweight player state, and a new
+    forecast (only when it changed since the previous request, otherwise ``None``).
+    The forecast is not sent through the pipe: it is described by the paths to its
+    wind arrays, which are memory-mapped (see ``BotPool._share_forecast``), and
+    the other fields of the forecast.
+    The reply contains the step number, the instructions, the CPU time spent in the
+    bot, and the formatted exception if the bot raised one.
+    """
+    from .weather import WeatherForecast
+
+    forecast = None
+    while True:
+        request = conn.recv()
+        if request is None:
+            break
+        step, state, new_forecast = request
+        if new_forecast is not None:
+            paths, fields = new_forecast
+            forecast = WeatherForecast(**attach_arrays(paths), **fields)
+        instructions = None
+        error = None
+        t0 = time.process_time()
+        try:
+            instructions = bot.run(**state, forecast=forecast, world_map=world_map)
+        except Exception:
+            error = traceback.format_exc()
+        conn.send((step, instructions, time.process_time() - t0, error))
+    conn.close()
+
+
+class BotPool:
+    """
+    Run each bot in its own worker process, under a CPU-time budget per step.
+
+    All the bots are run in parallel. Each worker measures the CPU time spent by
+    its bot, and a bot that used more than ``budget`` seconds of CPU time for a step
+    gets no instructions for that step (the ship keeps its previous heading).
+    Once the requests have been sent, the pool waits for the instructions for at
+    most ``wall_budget`` seconds: a bot that has not replied by then also gets no
+    instructions, and its late reply is discarded.
+    A bot which is still busy with an old step is not sent a new one until it has
+    replied.
+    A bot whose worker process has died gets no instructions for the rest of the
+    race.
+
+    When the forecast changes, its wind arrays are written once to a temporary
+    directory, and the workers memory-map them, instead of receiving a pickled
+    copy of the forecast through their pipe.
+
+    Parameters
+    ----------
+    bots:
+        The bots, indexed by team name.
+    world_map:
+        The world map given to the bots. It is sent to the workers only once.
+    budget:
+        The maximum CPU time (in seconds) a bot can use at each step.
+    wall_budget:
+        The maximum wall-clock time (in seconds) to wait for the bots at each step.
+        By default, the CPU budget times the number of bots per CPU core, so that
+        every bot can use its whole budget when the bots share the cores.
+    """
+
+    def __init__(
+        self,
+        bots: Dict[str, Any],
+        world_map: Any,
+        budget: float,
+        wall_budget: Optional[float] = None,
+    ):
+        self.budget = budget
+        if wall_budget is None:
+            wall_budget = budget * max(math.ceil(len(bots) / (os.cpu_count() or 1)), 1)
+        self.wall_budget = wall_budget
+        self.step = 0
+        self.stats = {team: BotStats() for team in bots}
+        self._connections = {}
+        self._processes = {}
+        # The step of the request each worker is currently busy with
+        self._pending = {}
+        # The forecast each worker currently holds
+        self._forecasts = {}
+        # The teams whose worker process has died
+        self._dead = set()
+        self._forecast_dir = Path(tempfile.mkdtemp(prefix="vendeeglobe-forecast-"))
+        # The forecast currently shared with the workers, with its description
+        self._shared_forecast = None
+        self._forecast_count = 0
+        for team, bot in bots.items():
+            conn, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_bot_worker, args=(child, bot, world_map), daemon=True
+            )
+            process.start()
+            child.close()
+            self._connections[team] = conn
+            self._processes[team] = process
+
+    def _kill(self, team: str) -> str:
+        """
+        Mark the worker of a team as dead, and return the error message.
+        """
+        self._dead.add(team)
+        self._pending.pop(team, None)
+        self.stats[team].errors += 1
+        self.stats[team].dead = True
+        return f"The worker process of bot {team} has died."
+
+    def _receive(
+        self, team: str
+    ) -> Tuple[int, Optional[Instructions], float, Optional[str]]:
+        try:
+            step, instructions, elapsed, error = self._connections[team].recv()
+        except _DEAD_WORKER_ERRORS:
+            return self.step, None, 0.0, self._kill(team)
+        del self._pending[team]
+        self.stats[team].record(elapsed, error=error is not None)
+        return step, instructions, elapsed, error
+
+    def _share_forecast(self, forecast: Any) -> Tuple[Dict[str, Path], dict]:
+        """
+        Write the wind arrays of a new forecast to the shared directory, and return
+        the description of the forecast which is sent to the workers.
+        The files of the forecast before the previous one are removed: the workers
+        which are still busy with the previous forecast keep their memory maps.
+        """
+        if (self._shared_forecast is None) or (
+            self._shared_forecast[0] is not forecast
+        ):
+            n = self._forecast_count
+            paths = share_arrays(
+                {f"u{n}": forecast.u, f"v{n}": forecast.v}, self._forecast_dir
+            )
+            for name in (f"u{n - 2}", f"v{n - 2}"):
+                try:
+                    os.remove(self._forecast_dir / f"{name}.npy")
+                except OSError:
+                    pass
+            fields = {
+                "du": forecast.du,
+                "dv": forecast.dv,
+                "dt": forecast.dt,
+                "interpolation": forecast.interpolation,
+            }
+            description = ({"u": paths[f"u{n}"], "v": paths[f"v{n}"]}, fields)
+            self._shared_forecast = (forecast, description)
+            self._forecast_count += 1
+        return self._shared_forecast[1]
+
+    def run(
+        self, states: Dict[str, dict], forecast: Any, safe: bool = True
+    ) -> Dict[str, Optional[Instructions]]:
+        """
+        Run the bots for one step, and return the instructions of the bots which
+        replied in time and within their CPU-time budget.
+
+        Parameters
+        ----------
+        states:
+            The arguments of the ``run`` function of each bot, except for the
+            forecast and the world map.
+        forecast:
+            The current weather forecast.
+        safe:
+            If ``False``, raise an error when a bot fails.
+        """
+        self.step += 1
+
+        # Discard the late replies of the previous steps
+        for team in list(self._pending):
+            if self._connections[team].poll():
+                self._receive(team)
+
+        waiting = {}
+        for team, state in states.items():
+            if team in self._dead:
+                continue
+            if team in self._pending:
+                self.stats[team].timeouts += 1
+                continue
+            conn = self._connections[team]
+            new_forecast = None
+            if self._forecasts.get(team) is not forecast:
+                new_forecast = self._share_forecast(forecast)
+            try:
+                conn.send((self.step, state, new_forecast))
+            except _DEAD_WORKER_ERRORS:
+                error = self._kill(team)
+                if not safe:
+                    raise RuntimeError(error)
+                continue
+            self._forecasts[team] = forecast
+            self._pending[team] = self.step
+            waiting[conn] = team
+
+        # The budget of the bots starts once all the requests have been sent
+        deadline = time.perf_counter() + self.wall_budget
+        instructions = {}
+        while waiting:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            for conn in wait(list(waiting), timeout=remaining):
+                team = waiting.pop(conn)
+                _, reply, elapsed, error = self._receive(team)
+                if error is not None and not safe:
+                    raise RuntimeError(f"Bot {team} failed:\n{error}")
+                if elapsed > self.budget:
+                    # Over the CPU-time budget, even if the reply came in time
+                    self.stats[team].timeouts += 1
+                else:
+                    instructions[team] = reply
+        for team in waiting.values():
+            self.stats[team].timeouts += 1
+        return instructions
+
+    def close(self):
+        """
+        Stop the worker processes.
+        """
+        for team, conn in self._connections.items():
+            try:
+                conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._processes.values():
+            process.join(timeout=0.1)
+            if process.is_alive():
+                process.terminate()
+        for conn in self._connections.values():
+            conn.close()
+        self._connections.clear()
+        self._processes.clear()
+        self._shared_forecast = None
+        shutil.rmtree(self._forecast_dir, ignore_errors=True)
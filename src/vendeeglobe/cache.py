@@ -0,0 +1,114 @@
+# SPDX-License-Identifier: BSD-3-Clause
+
+import hashlib
+import json
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, Mapping, Optional
+
+import numpy as np
+
+from . import config
+from .shared import attach_arrays, share_arrays
+
+# Bump this when the way the cached arrays are generated changes
+CACHE_VERSION = 2
+
+_COMPLETE = "complete.json"
+
+
+def cache_key(name: str, params: Mapping) -> str:
+    """
+    Compute a key from the parameters used to generate a set of arrays.
+    """
+    contents = json.dumps(
+        {"name": name, "version": CACHE_VERSION, **params}, sort_keys=True
+    )
+    return hashlib.sha256(contents.encode()).hexdigest()
+
+
+def _entry_size(entry: Path) -> int:
+    return sum(f.stat().st_size for f in entry.iterdir() if f.is_file())
+
+
+def evict(max_size: Optional[int] = None, keep: Optional[Path] = None):
+    """
+    Remove the least recently used entries from the cache, until its total size is
+    below ``max_size`` (in bytes). The entry ``keep`` is never removed.
+    """
+    if max_size is None:
+        max_size = config.max_cache_size
+    if not config.cache_dir.exists():
+        return
+    entries = []
+    for entry in config.cache_dir.glob("*/*"):
+        marker = entry / _COMPLETE
+        if entry.is_dir() and marker.exists():
+            entries.append((marker.stat().st_mtime, _entry_size(entry), entry))
+    total = sum(size for _, size, _ in entries)
+    for _, size, entry in sorted(entries):
+        if total <= max_size:
+            break
+        if entry == keep:
+            continue
+        shutil.rmtree(entry, ignore_errors=True)
+        total -= size
+
+
+def load(name: str, params: Mapping) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Memory-map the arrays stored for the given parameters, if they are in the cache.
+    An entry whose marker or arrays cannot be read is treated as a cache miss.
+    """
+    entry = config.cache_dir / name / cache_key(name, params)
+    marker = entry / _COMPLETE
+    if not marker.exists():
+        return None
+    try:
+        with open(marker, "r") as f:
+            keys = json.load(f)["arrays"]
+        # Mark as recently used
+        marker.touch()
+        return attach_arrays({key: entry / f"{key}.npy" for key in keys})
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def store(name: str, params: Mapping, arrays: Mapping[str, np.ndarray]):
+    """
+    Store arrays in the cache, and evict old entries if the cache is too large.
+
+    The marker which makes the entry visible to ``load`` is written under a
+    temporary name and then renamed, once all the arrays are in place.
+    """
+    entry = config.cache_dir / name / cache_key(name, params)
+    share_arrays(arrays, entry)
+    tmp = entry / f".{_COMPLETE}.{uuid.uuid4().hex}"
+    with open(tmp, "w") as f:
+        json.dump({"params": dict(params), "arrays": list(arrays)}, f)
+    os.replace(tmp, entry / _COMPLETE)
+    evict(keep=entry)
+
+
+def get_or_create(
+    name: str, params: Mapping, create: Callable[[], Mapping[str, np.ndarray]]
+) -> Dict[str, np.ndarray]:
+    """
+    Load arrays from the cache, or create them and store them in the cache.
+    The returned arrays are read-only memory maps in both cases.
+
+    If the cache directory cannot be written to, the created arrays are returned
+    as they are.
+    """
+    arrays = load(name, params)
+    if arrays is not None:
+        return arrays
+    arrays = create()
+    try:
+        store(name, params, arrays)
+    except OSError as e:
+        print(f"Could not write to cache {config.cache_dir}: {e}")
+        return dict(arrays)
+    return load(name, params)
@@ -1,5 +1,6 @@
 # SPDX-License-Identifier: BSD-3-Clause
 
+import os
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Tuple
@@ -23,6 +24,14 @@ class Config:
     seconds_to_hours: float
     score_step: float
     max_name_length: int
+    bot_time_budget: float
+    globe_tessellation: Tuple[int, int]
+    target_fps: float
+    min_tracer_fraction: float
+    coarse_detail_distance: float
+    coarse_tracer_fraction: float
+    cache_dir: Path
+    max_cache_size: int
 
 
 config = Config(
@@ -43,6 +52,16 @@ config = Config(
     seconds_to_hours=4.0,
     score_step=100_000,
     max_name_length=15,
+    bot_time_budget=0.05,  # in seconds (CPU time), per step
+    globe_tessellation=(24, 48),  # bands of latitude and longitude
+    target_fps=60.0,
+    min_tracer_fraction=0.1,  # of the tracer positions drawn at full detail
+    coarse_detail_distance=8.0,  # in map radii
+    coarse_tracer_fraction=0.25,
+    cache_dir=Path(
+        os.environ.get("VENDEEGLOBE_CACHE_DIR", Path.home() / ".cache" / "vendeeglobe")
+    ),
+    max_cache_size=2_000_000_000,  # in bytes
 )
 
 
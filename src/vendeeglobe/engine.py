@@ -1,8 +1,10 @@
 # SPDX-License-Identifier: BSD-3-Clause
 
 import datetime
+import threading
 import time
-from typing import List, Optional
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
 
 import numpy as np
 import pyqtgraph as pg
@@ -38,20 +40,79 @@ except ImportError:
 from . import config
 from .core import Checkpoint, Location
 from .graphics import Graphics
-from .map import Map
+from .headless import HeadlessEngine
 from .player import Player
-from .scores import (
-    finalize_scores,
-    get_player_points,
-    read_fastest_times,
-    read_scores,
-    write_fastest_times,
-)
-from .utils import distance_on_surface, pre_compile
-from .weather import Weather
-
-
-class Engine:
+from .scores import get_player_points, read_scores
+from .timing import startup_report
+from .utils import wrap
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """
+    The state of the race after a simulation step, as drawn by the graphics.
+
+    The arrays are copies of the fleet arrays, which are never modified, so that the
+    graphics can read a snapshot while the simulation carries on. They are named as
+    in ``PlayerFleet``, so that ``Player`` views can be made of a snapshot (see
+    ``SnapshotView``).
+    """
+
+    time: float  # game time
+    clock_time: float  # wall-clock time at which the snapshot was taken
+    accumulator: float  # game time elapsed on the clock but not simulated yet
+    finished: bool
+    previous_latitude: np.ndarray  # at the previous step
+    previous_longitude: np.ndarray
+    latitude: np.ndarray
+    longitude: np.ndarray
+    heading: np.ndarray
+    sail: np.ndarray
+    speed: np.ndarray
+    distance_travelled: np.ndarray
+    bonus: np.ndarray
+    arrived: np.ndarray
+    reached: np.ndarray
+
+
+class SnapshotView:
+    """
+    The players of a race, as views of the arrays of a ``Snapshot``.
+
+    The players are made only once: setting ``snapshot`` makes them show a new
+    snapshot, instead of making new players at every frame.
+    """
+
+    def __init__(self, snapshot: Snapshot, teams: List[str]):
+        self.snapshot = snapshot
+        self.players: Dict[str, Player] = {
+            team: Player(team=team, fleet=self, index=i) for i, team in enumerate(teams)
+        }
+
+    def __getattr__(self, name: str) -> np.ndarray:
+        # The arrays of the players
+        return getattr(self.snapshot, name)
+
+
+class Engine(HeadlessEngine):
+    """
+    Run a race with graphics.
+
+    The simulation advances in fixed steps of ``time_step`` seconds of game time,
+    exactly as in the ``HeadlessEngine``, so that a race gives the same results
+    whatever the frame rate or the ``speedup``.
+    As many steps are run as needed to keep up with the wall clock (multiplied by
+    the ``speedup``), and the ships are drawn at positions interpolated between the
+    last two steps.
+
+    If ``threaded`` is ``True``, the simulation (the bots and the motion of the
+    ships) runs in its own thread, at its own pace, and publishes a ``Snapshot``
+    of the race after each batch of steps. The graphics only draw the latest
+    snapshot, so that a slow bot does not make the display stutter, and a slow
+    display does not slow down the race. Otherwise, the steps are run at each frame,
+    before drawing.
+    """
+
     def __init__(
         self,
         bots: dict,
@@ -62,192 +123,198 @@ class Engine:
         speedup: Optional[float] = None,
         course_preview: Optional[List[Checkpoint]] = None,
         high_contrast: bool = False,
+        interpolation: str = "nearest",
+        dispatch: str = "serial",
+        bot_budget: Optional[float] = None,
+        record: Optional[str] = None,
+        time_step: float = 0.05,
+        threaded: bool = True,
     ):
-        pre_compile()
-
-        self.time_limit = time_limit
+        # The bot processes are started before the graphics are created
+        super().__init__(
+            bots=bots,
+            test=test,
+            time_limit=time_limit,
+            seed=seed,
+            start=start,
+            interpolation=interpolation,
+            dispatch=dispatch,
+            bot_budget=bot_budget,
+            record=record,
+            time_step=time_step,
+        )
         self.start_time = None
-        self.safe = not test
-        self.test = test
         self.speedup = speedup
         self.high_contrast = high_contrast
+        self.threaded = threaded
+        self.simulation_thread = None
+        self.stop_simulation = threading.Event()
 
-        t0 = time.time()
-        print("Generating players...", end=" ", flush=True)
-        self.bots = {bot.team: bot for bot in bots}
-        self.players = {}
-        for name in self.bots:
-            self.players[name] = Player(team=name, start=start)
-        print(f"done [{time.time() - t0:.2f} s]")
-
-        self.map = Map()
-        self.weather = Weather(seed=seed, time_limit=self.time_limit)
         self.graphics = Graphics(
             game_map=self.map,
             weather=self.weather,
             players=self.players,
             course_preview=course_preview,
         )
-        self.players_not_arrived = list(self.players.keys())
-        self.forecast = self.weather.get_forecast(0)
-        self.fastest_times = read_fastest_times(self.players)
+        print(startup_report())
 
     def initialize_time(self):
+        super().initialize_time()
         self.start_time = time.time()
-        self.last_player_update = self.start_time
-        self.last_graphics_update = self.start_time
         self.last_time_update = self.start_time
-        self.last_forecast_update = self.start_time
         self.previous_clock_time = self.start_time
-        self.current_time = 0.0
-
-    def execute_player_bot(self, player, t: float, dt: float):
-        instructions = None
-        args = {
-            "t": t,
-            "dt": dt,
-            "longitude": player.longitude,
-            "latitude": player.latitude,
-            "heading": player.heading,
-            "speed": player.speed,
-            "vector": player.get_vector(),
-            "forecast": self.forecast.get_uv,
-            "world_map": self.map.get_terrain,
-        }
-        if self.safe:
-            try:
-                instructions = self.bots[player.team].run(**args)
-            except:  # noqa
-                pass
-        else:
-            instructions = self.bots[player.team].run(**args)
-        return instructions
-
-    def call_player_bots(self, t: float, dt: float):
-        for player in self.players.values():
-            if self.safe:
-                try:
-                    player.execute_bot_instructions(
-                        self.execute_player_bot(player=player, t=t, dt=dt)
-                    )
-                except:  # noqa
-                    pass
-            else:
-                player.execute_bot_instructions(
-                    self.execute_player_bot(player=player, t=t, dt=dt)
-                )
-
-    def move_players(self, weather: Weather, t: float, dt: float):
-        latitudes = np.array([player.latitude for player in self.players.values()])
-        longitudes = np.array([player.longitude for player in self.players.values()])
-        u, v = weather.get_uv(latitudes, longitudes, np.array([t]))
-        for i, player in enumerate([p for p in self.players.values() if not p.arrived]):
-            lat, lon = player.get_path(dt, u[i], v[i])
-            terrain = self.map.get_terrain(longitudes=lon, latitudes=lat)
-            w = np.where(terrain == 0)[0]
-            if len(w) > 0:
-                ind = max(w[0] - 1, 0)
-            else:
-                ind = len(terrain) - 1
-            if ind > 0:
-                next_lat = lat[ind]
-                next_lon = lon[ind]
-                player.distance_travelled += distance_on_surface(
-                    longitude1=player.longitude,
-                    latitude1=player.latitude,
-                    longitude2=next_lon,
-                    latitude2=next_lat,
-                )
-                player.latitude = next_lat
-                player.longitude = next_lon
-            else:
-                player.dlat = 0
-                player.dlon = 0
-
-            for checkpoint in player.checkpoints:
-                if not checkpoint.reached:
-                    d = distance_on_surface(
-                        longitude1=player.longitude,
-                        latitude1=player.latitude,
-                        longitude2=checkpoint.longitude,
-                        latitude2=checkpoint.latitude,
-                    )
-                    if d < checkpoint.radius:
-                        checkpoint.reached = True
-                        print(f"{player.team} reached {checkpoint}")
-            dist_to_finish = distance_on_surface(
-                longitude1=player.longitude,
-                latitude1=player.latitude,
-                longitude2=config.start.longitude,
-                latitude2=config.start.latitude,
-            )
-            if dist_to_finish < config.start.radius and all(
-                ch.reached for ch in player.checkpoints
-            ):
-                player.arrived = True
-                player.bonus = config.score_step * len(self.players_not_arrived)
-                n_not_arrived = len(self.players_not_arrived)
-                n_players = len(self.players)
-                if n_not_arrived == n_players:
-                    pos_str = "st"
-                elif n_not_arrived == n_players - 1:
-                    pos_str = "nd"
-                elif n_not_arrived == n_players - 2:
-                    pos_str = "rd"
-                else:
-                    pos_str = "th"
-                print(
-                    f"{player.team} finished in {n_players - n_not_arrived + 1}"
-                    f"{pos_str} position!"
-                )
-                self.players_not_arrived.remove(player.team)
-                self.fastest_times[player.team] = min(
-                    t, self.fastest_times[player.team]
-                )
+        self.simulation_clock_time = self.start_time
+        self.accumulator = 0.0
+        self.previous_latitude = self.fleet.latitude.copy()
+        self.previous_longitude = self.fleet.longitude.copy()
+        # A reference to an immutable snapshot is published by a single (atomic)
+        # assignment: the simulation builds the next snapshot while the graphics draw
+        # the current one, so that no lock is needed.
+        self.snapshot = self.take_snapshot(self.start_time)
+        # Only used by the graphics
+        self.snapshot_view = SnapshotView(self.snapshot, self.teams)
+
+    def start_simulation_thread(self):
+        self.stop_simulation.clear()
+        self.simulation_thread = threading.Thread(
+            target=self.simulation_loop, name="vendeeglobe-simulation", daemon=True
+        )
+        self.simulation_thread.start()
+
+    def stop_simulation_thread(self):
+        if self.simulation_thread is not None:
+            self.stop_simulation.set()
+            self.simulation_thread.join()
+            self.simulation_thread = None
 
     def shutdown(self):
-        final_scores = finalize_scores(players=self.players, test=self.test)
-        write_fastest_times(self.fastest_times)
+        self.stop_simulation_thread()
+        final_scores = super().shutdown()
         self.update_leaderboard(final_scores, self.fastest_times)
         self.timer.stop()
+        return final_scores
+
+    def step(self):
+        """
+        Advance the simulation by one fixed time step.
+        """
+        self.previous_latitude[:] = self.fleet.latitude
+        self.previous_longitude[:] = self.fleet.longitude
+        self.advance(min(self.time_step, self.time_limit - self.current_time))
+
+    def take_snapshot(self, clock_time: float) -> Snapshot:
+        fleet = self.fleet
+        return Snapshot(
+            time=self.current_time,
+            clock_time=clock_time,
+            accumulator=self.accumulator,
+            finished=self.finished,
+            previous_latitude=self.previous_latitude.copy(),
+            previous_longitude=self.previous_longitude.copy(),
+            latitude=fleet.latitude.copy(),
+            longitude=fleet.longitude.copy(),
+            heading=fleet.heading.copy(),
+            sail=fleet.sail.copy(),
+            speed=fleet.speed.copy(),
+            distance_travelled=fleet.distance_travelled.copy(),
+            bonus=fleet.bonus.copy(),
+            arrived=fleet.arrived.copy(),
+            reached=fleet.reached.copy(),
+        )
+
+    def simulate_until(self, clock_time: float):
+        """
+        Run the steps which are due at the wall-clock time ``clock_time``, and
+        publish a snapshot of the race.
+        """
+        dt = clock_time - self.simulation_clock_time
+        self.simulation_clock_time = clock_time
+        if self.speedup is not None:
+            dt *= self.speedup
+        self.accumulator += dt
+        while self.accumulator >= self.time_step and not self.finished:
+            self.step()
+            self.accumulator -= self.time_step
+            if (time.time() - clock_time) > config.graphics_update_interval:
+                # The simulation cannot keep up: slow down the game instead of
+                # making the steps longer, so that the results do not change.
+                self.accumulator = 0.0
+                break
+        self.snapshot = self.take_snapshot(clock_time)
+
+    def simulation_loop(self):
+        """
+        Run the simulation until the end of the race, sleeping until the next step
+        is due.
+        """
+        speedup = 1.0 if self.speedup is None else self.speedup
+        while not self.finished and not self.stop_simulation.is_set():
+            self.simulate_until(time.time())
+            self.stop_simulation.wait(
+                max(self.time_step - self.accumulator, 0.0) / speedup
+            )
+
+    def interpolated_positions(
+        self, snapshot: Snapshot, alpha: float
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        The positions of the ships at a fraction ``alpha`` of the time between the
+        last two steps of the ``snapshot``.
+        """
+        dlon = (
+            snapshot.longitude - snapshot.previous_longitude + 180.0
+        ) % 360.0 - 180.0
+        return wrap(
+            lat=snapshot.previous_latitude
+            + alpha * (snapshot.latitude - snapshot.previous_latitude),
+            lon=snapshot.previous_longitude + alpha * dlon,
+        )
 
     def update(self):
         clock_time = time.time()
-        dt_raw = clock_time - self.previous_clock_time
+        dt = clock_time - self.previous_clock_time
         if self.speedup is not None:
-            dt_raw *= self.speedup
-            self.current_time += dt_raw
-        else:
-            self.current_time = clock_time - self.start_time
-        dt = dt_raw * config.seconds_to_hours
-        if self.current_time > self.time_limit:
-            self.shutdown()
+            dt *= self.speedup
+        if not self.threaded:
+            self.simulate_until(clock_time)
+        snapshot = self.snapshot
+        self.snapshot_view.snapshot = snapshot
+        players = self.snapshot_view.players
 
         if (clock_time - self.last_time_update) > config.time_update_interval:
-            self.update_scoreboard(self.time_limit - self.current_time)
+            self.update_scoreboard(self.time_limit - snapshot.time, players)
             self.last_time_update = clock_time
 
-        if (clock_time - self.last_forecast_update) > config.weather_update_interval:
-            self.forecast = self.weather.get_forecast(self.current_time)
-            self.last_forecast_update = clock_time
-
-        self.call_player_bots(t=self.current_time * config.seconds_to_hours, dt=dt)
-        self.move_players(self.weather, t=self.current_time, dt=dt)
+        self.graphics.update_level_of_detail(clock_time - self.previous_clock_time)
         if self.tracer_checkbox.isChecked():
             self.weather.update_wind_tracers(
-                t=np.array([self.current_time]), dt=dt, speedup=self.speedup
+                t=np.array([snapshot.time]),
+                dt=dt * config.seconds_to_hours,
+                speedup=self.speedup,
+                ntracers=self.graphics.tracer_detail.ntracers,
             )
             self.graphics.update_wind_tracers(
-                self.weather.tracer_lat, self.weather.tracer_lon
+                self.weather.tracer_lat,
+                self.weather.tracer_lon,
+                head=self.weather.tracer_head,
             )
-        self.graphics.update_player_positions(self.players)
+        # The game time elapsed since the last step of the snapshot
+        elapsed = snapshot.accumulator + (clock_time - snapshot.clock_time) * (
+            1.0 if self.speedup is None else self.speedup
+        )
+        latitudes, longitudes = self.interpolated_positions(
+            snapshot, min(elapsed / self.time_step, 1.0)
+        )
+        self.graphics.update_player_positions(
+            players, latitudes=latitudes, longitudes=longitudes
+        )
 
-        if len(self.players_not_arrived) == 0:
+        if snapshot.finished:
             self.shutdown()
 
         self.previous_clock_time = clock_time
 
-    def update_scoreboard(self, t: float):
+    def update_scoreboard(self, t: float, players: Dict[str, Player]):
         time = str(datetime.timedelta(seconds=int(t)))[2:]
         self.time_label.setText(f"Time left: {time} s")
         status = [
@@ -259,7 +326,7 @@ class Engine:
                 player.color,
                 len([ch for ch in player.checkpoints if ch.reached]),
             )
-            for player in self.players.values()
+            for player in players.values()
         ]
         for i, (_, dist, team, speed, col, nch) in enumerate(
             sorted(status, reverse=True)
@@ -383,5 +450,8 @@ class Engine:
         self.timer = QtCore.QTimer()
         self.timer.timeout.connect(self.update)
         self.initialize_time()
+        if self.threaded:
+            self.start_simulation_thread()
         self.timer.start(0)
         pg.exec()
+        self.stop_simulation_thread()
@@ -1,8 +1,9 @@
 # SPDX-License-Identifier: BSD-3-Clause
 
 # flake8: noqa F405
+import ctypes
 import time
-from typing import Any, Dict, Optional, List
+from typing import Any, Dict, Optional, List, Tuple
 
 import numpy as np
 import pyqtgraph as pg
@@ -17,14 +18,45 @@ from . import utils as ut
 from .core import Location, Checkpoint
 from .map import Map
 from .player import Player
+from .timing import print_done
 from .weather import Weather
 
 
+def make_sphere_mesh(rows: int, cols: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Tessellate the globe into ``rows`` bands of latitude and ``cols`` bands of
+    longitude.
+
+    Returns the vertex positions (float32, shape (n, 3)), the texture coordinates
+    (float32, shape (n, 2)), and the indices of the vertices of the triangles
+    (uint32, two triangles per quad).
+    """
+    theta = np.linspace(0, np.pi, rows + 1, dtype="float32")
+    phi = np.linspace(0, 2 * np.pi, cols + 1, dtype="float32")
+    phi_grid, theta_grid = np.meshgrid(phi, theta, indexing="ij")
+    x, y, z = ut.to_xyz(phi_grid, theta_grid, gl=True)
+    vertices = np.stack([x, y, z], axis=-1).reshape(-1, 3).astype("float32")
+    p_n, t_n = np.meshgrid(phi / (2 * np.pi), theta / np.pi, indexing="ij")
+    texcoords = np.stack([p_n, t_n], axis=-1).reshape(-1, 2).astype("float32")
+
+    # Index of vertex (i, j) is i * (rows + 1) + j
+    i, j = np.meshgrid(np.arange(cols), np.arange(rows), indexing="ij")
+    a = (i * (rows + 1) + j).ravel()
+    b = a + 1
+    c = a + rows + 2
+    d = a + rows + 1
+    indices = np.stack([a, b, c, a, c, d], axis=-1).ravel().astype("uint32")
+    return vertices, texcoords, indices
+
+
 class GLTexturedSphereItem(GLGraphicsItem):
     """
     **Bases:** :class:`GLGraphicsItem <pyqtgraph.opengl.GLGraphicsItem.GLGraphicsItem>`
 
-    Displays image data as a textured quad.
+    Displays image data as a textured sphere.
+
+    The mesh of the sphere is computed once, and uploaded to vertex buffers on the
+    GPU the first time it is painted; every paint is then a single draw call.
     """
 
     def __init__(
@@ -33,6 +65,8 @@ class GLTexturedSphereItem(GLGraphicsItem):
         smooth: bool = False,
         glOptions: str = "translucent",
         parentItem: Any = None,
+        rows: int = 24,
+        cols: int = 48,
     ):
         """
         **Arguments:**
@@ -41,6 +75,10 @@ class GLTexturedSphereItem(GLGraphicsItem):
             dtype=ubyte. (See functions.makeRGBA)
         smooth:
             If True, the volume slices are rendered with linear interpolation
+        rows:
+            The number of bands of latitude used to tessellate the sphere
+        cols:
+            The number of bands of longitude used to tessellate the sphere
         """
 
         self.smooth = smooth
@@ -49,6 +87,10 @@ class GLTexturedSphereItem(GLGraphicsItem):
         self.setData(data)
         self.setGLOptions(glOptions)
         self.texture = None
+        self.vertices, self.texcoords, self.indices = make_sphere_mesh(
+            rows=rows, cols=cols
+        )
+        self.buffers = None
 
     def initializeGL(self):
         if self.texture is not None:
@@ -117,29 +159,178 @@ class GLTexturedSphereItem(GLGraphicsItem):
 
         glColor4f(1, 1, 1, 1)
 
-        theta = np.linspace(0, np.pi, 25, dtype="float32")
-        phi = np.linspace(0, 2 * np.pi, 49, dtype="float32")
-        t_n = theta / np.pi
-        p_n = phi / (2 * np.pi)
-
-        phi_grid, theta_grid = np.meshgrid(phi, theta, indexing="ij")
-        x, y, z = ut.to_xyz(phi_grid, theta_grid, gl=True)
-
-        glBegin(GL_QUADS)
-        for j in range(len(theta) - 1):
-            for i in range(len(phi) - 1):
-                glTexCoord2f(p_n[i], t_n[j])
-                glVertex3f(x[i, j], y[i, j], z[i, j])
-                glTexCoord2f(p_n[i], t_n[j + 1])
-                glVertex3f(x[i, j + 1], y[i, j + 1], z[i, j + 1])
-                glTexCoord2f(p_n[i + 1], t_n[j + 1])
-                glVertex3f(x[i + 1, j + 1], y[i + 1, j + 1], z[i + 1, j + 1])
-                glTexCoord2f(p_n[i + 1], t_n[j])
-                glVertex3f(x[i + 1, j], y[i + 1, j], z[i + 1, j])
-
-        glEnd()
+        if self.buffers is None:
+            self._uploadMesh()
+        vertex_buffer, texcoord_buffer, index_buffer = self.buffers
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_TEXTURE_COORD_ARRAY)
+        try:
+            glBindBuffer(GL_ARRAY_BUFFER, vertex_buffer)
+            glVertexPointer(3, GL_FLOAT, 0, None)
+            glBindBuffer(GL_ARRAY_BUFFER, texcoord_buffer)
+            glTexCoordPointer(2, GL_FLOAT, 0, None)
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, index_buffer)
+            glDrawElements(GL_TRIANGLES, len(self.indices), GL_UNSIGNED_INT, None)
+        finally:
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+            glDisableClientState(GL_TEXTURE_COORD_ARRAY)
+            glDisableClientState(GL_VERTEX_ARRAY)
         glDisable(GL_TEXTURE_2D)
 
+    def _uploadMesh(self):
+        self.buffers = glGenBuffers(3)
+        for target, buffer, data in zip(
+            (GL_ARRAY_BUFFER, GL_ARRAY_BUFFER, GL_ELEMENT_ARRAY_BUFFER),
+            self.buffers,
+            (self.vertices, self.texcoords, self.indices),
+        ):
+            glBindBuffer(target, buffer)
+            glBufferData(target, data.nbytes, data, GL_STATIC_DRAW)
+            glBindBuffer(target, 0)
+
+
+class GLTracerItem(GLGraphicsItem):
+    """
+    **Bases:** :class:`GLGraphicsItem <pyqtgraph.opengl.GLGraphicsItem.GLGraphicsItem>`
+
+    Displays the wind tracers as points, from a ring buffer of positions.
+
+    The positions stay in a vertex buffer on the GPU, and only the rows of the ring
+    buffer which changed are uploaded again (with ``glBufferSubData``). The colors
+    are given by age, from the newest to the oldest position, and repeated twice:
+    the colors of the rows of the ring buffer, starting from row 0, are then the
+    contiguous slice which starts at ``lifetime - head``, and are selected with an
+    offset into the color buffer. The ``trail`` newest rows of the first
+    ``ntracers`` tracers are drawn, in at most two segments when all the tracers are
+    drawn (one per row otherwise).
+    """
+
+    def __init__(
+        self,
+        positions: np.ndarray,
+        colors: np.ndarray,
+        size: float = 2,
+        glOptions: str = "translucent",
+        parentItem: Any = None,
+    ):
+        """
+        **Arguments:**
+        positions:
+            The ring buffer of positions, of shape (lifetime, ntracers, 3) with
+            dtype=float32. It is updated in place (see ``updateRows``).
+        colors:
+            The colors of the positions by age, of shape (2 * lifetime, ntracers, 4)
+            with dtype=float32.
+        size:
+            The size of the points, in pixels
+        """
+        super().__init__(parentItem=parentItem)
+        self.setGLOptions(glOptions)
+        self.positions = positions
+        self.colors = colors
+        self.size = size
+        self.lifetime, self.ntracers, _ = positions.shape
+        self.head = 0
+        self.trail = self.lifetime
+        self.buffers = None
+        self._dirtyRows = set()
+        self._needUpload = True
+        self._needColors = True
+
+    def setSize(self, size: float):
+        self.size = size
+        self.update()
+
+    def setColors(self, colors: np.ndarray):
+        self.colors = colors
+        self._needColors = True
+        self.update()
+
+    def updateRows(self, rows: Optional[List[int]] = None):
+        """
+        Mark the given rows of the ring buffer of positions as changed (all the rows
+        if ``rows`` is None).
+        """
+        if rows is None:
+            self._needUpload = True
+        else:
+            self._dirtyRows.update(rows)
+        self.update()
+
+    def setHead(self, head: int, ntracers: int, trail: int):
+        """
+        Draw the ``trail`` rows starting at the newest row ``head``, for the first
+        ``ntracers`` tracers.
+        """
+        self.head, self.ntracers, self.trail = head, ntracers, trail
+        self.update()
+
+    def _segments(self) -> Tuple[np.ndarray, np.ndarray]:
+        lifetime, ntracers = self.positions.shape[:2]
+        if self.ntracers == ntracers:
+            end = self.head + self.trail
+            rows = [(self.head, min(end, lifetime))]
+            if end > lifetime:
+                rows.append((0, end - lifetime))
+            first = np.array([a for a, _ in rows]) * ntracers
+            count = np.array([b - a for a, b in rows]) * ntracers
+        else:
+            first = ((self.head + np.arange(self.trail)) % lifetime) * ntracers
+            count = np.full(self.trail, self.ntracers)
+        return first.astype(np.int32), count.astype(np.int32)
+
+    def _uploadData(self):
+        if self.buffers is None:
+            self.buffers = glGenBuffers(2)
+            self._needUpload = self._needColors = True
+        position_buffer, color_buffer = self.buffers
+        glBindBuffer(GL_ARRAY_BUFFER, position_buffer)
+        if self._needUpload:
+            glBufferData(
+                GL_ARRAY_BUFFER,
+                self.positions.nbytes,
+                self.positions,
+                GL_DYNAMIC_DRAW,
+            )
+        else:
+            row_bytes = self.positions[0].nbytes
+            for row in self._dirtyRows:
+                data = self.positions[row, : self.ntracers]
+                glBufferSubData(GL_ARRAY_BUFFER, row * row_bytes, data.nbytes, data)
+        if self._needColors:
+            glBindBuffer(GL_ARRAY_BUFFER, color_buffer)
+            glBufferData(
+                GL_ARRAY_BUFFER, self.colors.nbytes, self.colors, GL_STATIC_DRAW
+            )
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        self._dirtyRows.clear()
+        self._needUpload = self._needColors = False
+
+    def paint(self):
+        self._uploadData()
+        position_buffer, color_buffer = self.buffers
+
+        self.setupGLState()
+        glPointSize(self.size)
+
+        start = (self.lifetime - self.head) % self.lifetime
+        first, count = self._segments()
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+        try:
+            glBindBuffer(GL_ARRAY_BUFFER, position_buffer)
+            glVertexPointer(3, GL_FLOAT, 0, None)
+            glBindBuffer(GL_ARRAY_BUFFER, color_buffer)
+            glColorPointer(
+                4, GL_FLOAT, 0, ctypes.c_void_p(start * self.colors[0].nbytes)
+            )
+            glMultiDrawArrays(GL_POINTS, first, count, len(first))
+        finally:
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+            glDisableClientState(GL_COLOR_ARRAY)
+            glDisableClientState(GL_VERTEX_ARRAY)
+
 
 """
 Use GLImageItem to display image data on rectangular planes.
@@ -217,6 +408,182 @@ def _make_course_preview(course_preview: List[Checkpoint]) -> tuple:
     return line, vertices
 
 
+class TrackBuffer:
+    """
+    The track of a player: a polyline with a fixed maximum number of points.
+
+    Points are appended in a preallocated array. When the array is full, every
+    other point is dropped and, from then on, only one in two new points is kept
+    (then one in four, and so on), so that the whole track is always covered with
+    evenly spaced points.
+    The latest point is always at the end of the polyline, even when it is not
+    kept.
+    Appending is amortized O(1), whatever the length of the track.
+
+    Parameters
+    ----------
+    capacity:
+        The maximum number of kept points.
+    """
+
+    def __init__(self, capacity: int = 1000):
+        # One extra row for the latest point
+        self.data = np.empty((capacity + 1, 3), dtype=np.float32)
+        self.capacity = capacity
+        self.size = 0
+        self.stride = 1
+        self.skipped = 0
+
+    @property
+    def positions(self) -> np.ndarray:
+        """
+        The points of the polyline (a view, not a copy).
+        """
+        return self.data[: self.size + (self.skipped > 0)]
+
+    def append(self, point: np.ndarray):
+        if self.skipped + 1 < self.stride and self.size > 0:
+            # Only show the point, at the end of the polyline
+            self.skipped += 1
+            self.data[self.size] = point
+            return
+        if self.size == self.capacity:
+            half = self.capacity // 2
+            self.data[:half] = self.data[: 2 * half : 2]
+            self.size = half
+            self.stride *= 2
+        self.data[self.size] = point
+        self.size += 1
+        self.skipped = 0
+
+    def extend(self, points: np.ndarray):
+        """
+        Append the given points, of shape (n, 3), in the same way as ``append``,
+        without looping over all the points.
+        """
+        n = len(points)
+        j = 0
+        while j < n:
+            # The index of the next point which is kept
+            if self.size == 0:
+                kept = j
+            else:
+                kept = j + max(self.stride - 1 - self.skipped, 0)
+            if kept >= n:
+                self.skipped += n - j
+                self.data[self.size] = points[-1]
+                return
+            if self.size == self.capacity:
+                half = self.capacity // 2
+                self.data[:half] = self.data[: 2 * half : 2]
+                self.size = half
+                self.stride *= 2
+            m = min((n - 1 - kept) // self.stride + 1, self.capacity - self.size)
+            end = kept + (m - 1) * self.stride + 1
+            self.data[self.size : self.size + m] = points[kept : end : self.stride]
+            self.size += m
+            self.skipped = 0
+            j = end
+
+    def reset(self, points: np.ndarray):
+        """
+        Replace the track by the given points, of shape (n, 3).
+        """
+        n = len(points)
+        self.stride = 1
+        while n > self.stride * self.capacity:
+            self.stride *= 2
+        kept = points[:: self.stride]
+        self.size = len(kept)
+        self.data[: self.size] = kept
+        self.skipped = (n - 1) % self.stride
+        if self.skipped > 0:
+            self.data[self.size] = points[-1]
+
+
+class TracerDetail:
+    """
+    Choose how many wind tracers are drawn, and how long their trails are, to keep
+    up with a target frame rate.
+
+    The mean frame time is measured over intervals of ``interval`` seconds. After
+    each interval, the level of detail is lowered if the frames took too long, and
+    raised again if there was time to spare. At level ``i`` (out of ``nlevels``), a
+    fraction ``i / nlevels`` of the tracer positions is drawn: both the number of
+    tracers and the length of their trails are scaled by the square root of that
+    fraction.
+    When the camera is far from the globe, where the tracers are too small to be
+    seen in detail, the fraction is capped at ``config.coarse_tracer_fraction``.
+
+    Parameters
+    ----------
+    ntracers:
+        The number of tracers at full detail.
+    lifetime:
+        The length of the trails at full detail.
+    target_fps:
+        The frame rate to keep up with.
+    interval:
+        The time between two changes of the level of detail, in seconds.
+    nlevels:
+        The number of levels of detail.
+    """
+
+    def __init__(
+        self,
+        ntracers: int,
+        lifetime: int,
+        target_fps: float = 60.0,
+        interval: float = 0.5,
+        nlevels: int = 10,
+    ):
+        self.max_ntracers = ntracers
+        self.max_trail = lifetime
+        self.frame_budget = 1.0 / target_fps
+        self.interval = interval
+        self.nlevels = nlevels
+        self.min_level = max(int(np.ceil(config.min_tracer_fraction * nlevels)), 1)
+        self.level = nlevels
+        self.coarse = False
+        self.elapsed = 0.0
+        self.nframes = 0
+        self.ntracers = ntracers
+        self.trail = lifetime
+
+    @property
+    def fraction(self) -> float:
+        """
+        The fraction of the tracer positions which are drawn.
+        """
+        fraction = self.level / self.nlevels
+        if self.coarse:
+            fraction = min(fraction, config.coarse_tracer_fraction)
+        return fraction
+
+    def add_frame(self, frame_time: float, coarse: bool = False) -> bool:
+        """
+        Account for a frame which took ``frame_time`` seconds, and return ``True``
+        if the number of tracers or the length of the trails changed.
+        """
+        self.elapsed += frame_time
+        self.nframes += 1
+        if self.elapsed >= self.interval:
+            mean_frame_time = self.elapsed / self.nframes
+            if mean_frame_time > 1.25 * self.frame_budget:
+                self.level = max(self.level - 1, self.min_level)
+            elif mean_frame_time < 1.1 * self.frame_budget:
+                self.level = min(self.level + 1, self.nlevels)
+            self.elapsed = 0.0
+            self.nframes = 0
+        self.coarse = coarse
+        scale = np.sqrt(self.fraction)
+        ntracers = max(int(round(self.max_ntracers * scale)), 1)
+        trail = max(int(round(self.max_trail * scale)), 2)
+        changed = (ntracers, trail) != (self.ntracers, self.trail)
+        self.ntracers, self.trail = ntracers, trail
+        return changed
+
+
 class Graphics:
     def __init__(
         self,
@@ -240,7 +607,8 @@ class Graphics:
         self.high_contrast_texture = np.transpose(
             game_map.high_contrast_texture, axes=[1, 0, 2]
         )
-        self.sphere = GLTexturedSphereItem(self.default_texture)
+        rows, cols = config.globe_tessellation
+        self.sphere = GLTexturedSphereItem(self.default_texture, rows=rows, cols=cols)
         self.sphere.setGLOptions("opaque")
         self.window.addItem(self.sphere)
 
@@ -286,17 +654,35 @@ class Graphics:
             ut.lon_to_phi(weather.tracer_lon.ravel()),
             ut.lat_to_theta(weather.tracer_lat.ravel()),
         )
-        self.default_tracer_colors = weather.tracer_colors
-        self.high_contrast_tracer_colors = weather.tracer_colors.copy()
-        self.high_contrast_tracer_colors[..., :3] *= 0.8
-        self.tracers = gl.GLScatterPlotItem(
-            pos=np.array([x, y, z]).T,
-            color=self.default_tracer_colors,
+        self.tracer_positions = np.array([x, y, z], dtype=np.float32).T.copy()
+        # The colors go from the newest to the oldest tracer positions. They are
+        # repeated twice, so that the colors matching the rows of the ring buffer of
+        # positions are always a contiguous slice (see ``GLTracerItem``).
+        default_colors = weather.tracer_colors.astype(np.float32)
+        high_contrast_colors = default_colors.copy()
+        high_contrast_colors[..., :3] *= 0.8
+        self.default_tracer_colors = np.concatenate([default_colors] * 2)
+        self.high_contrast_tracer_colors = np.concatenate([high_contrast_colors] * 2)
+        self.tracer_color_cycle = self.default_tracer_colors
+        self.tracer_head = weather.tracer_head
+        # When the level of detail is reduced, the trails are shorter and fade out
+        # faster: their colors are stored in this buffer
+        self.tracer_detail = TracerDetail(
+            ntracers=config.ntracers,
+            lifetime=config.tracer_lifetime,
+            target_fps=config.target_fps,
+        )
+        self.detail_colors = np.empty_like(self.default_tracer_colors)
+        self.active_tracers = config.ntracers
+        self.tracers = GLTracerItem(
+            positions=self.tracer_positions.reshape(weather.tracer_lat.shape + (3,)),
+            colors=self.tracer_color_cycle,
             size=2,
-            pxMode=True,
+            glOptions="translucent",
+        )
+        self.tracers.setHead(
+            self.tracer_head, self.tracer_detail.ntracers, self.tracer_detail.trail
         )
-        # self.tracers.setGLOptions("opaque")
-        self.tracers.setGLOptions("translucent")
         self.window.addItem(self.tracers)
 
         # Add players
@@ -322,11 +708,15 @@ class Graphics:
                 ut.lon_to_phi(player.longitude),
                 ut.lat_to_theta(player.latitude),
             )
-            pos = np.array([[x], [y], [z]]).T
+            track = TrackBuffer()
+            track.append([x, y, z])
             self.tracks[name] = {
-                "pos": pos,
+                "track": track,
                 "artist": gl.GLLinePlotItem(
-                    pos=pos, color=tuple(colors[i]), width=4, antialias=True
+                    pos=track.positions,
+                    color=tuple(colors[i]),
+                    width=4,
+                    antialias=True,
                 ),
             }
             self.tracks[name]["artist"].setGLOptions("opaque")
@@ -337,31 +727,130 @@ class Graphics:
             self.window.addItem(line)
             self.window.addItem(vertices)
 
-        print(f"done [{time.time() - t0:.2f} s]")
+        print_done("graphics", t0)
 
-    def update_wind_tracers(self, tracer_lat: np.ndarray, tracer_lon: np.ndarray):
-        x, y, z = ut.to_xyz(
-            ut.lon_to_phi(tracer_lon.ravel()),
-            ut.lat_to_theta(tracer_lat.ravel()),
+    def update_level_of_detail(self, frame_time: float):
+        """
+        Adapt the number of drawn tracers to the time taken by the last frame, and
+        to the distance of the camera.
+        """
+        coarse = (
+            self.window.opts["distance"]
+            > config.coarse_detail_distance * config.map_radius
         )
-        self.tracers.setData(pos=np.array([x, y, z]).T)
+        if self.tracer_detail.add_frame(frame_time, coarse=coarse):
+            self._set_tracer_colors()
+            # The positions of the tracers which were not drawn are refreshed by the
+            # next ``update_wind_tracers``
+            self.tracers.setHead(
+                self.tracer_head,
+                min(self.tracer_detail.ntracers, self.active_tracers),
+                self.tracer_detail.trail,
+            )
 
-    def update_player_positions(self, players: Dict[str, Player]):
-        latitudes = np.array([player.latitude for player in players.values()])
-        longitudes = np.array([player.longitude for player in players.values()])
+    def _set_tracer_colors(self):
+        lifetime = config.tracer_lifetime
+        n, trail = self.tracer_detail.ntracers, self.tracer_detail.trail
+        if (n, trail) == (config.ntracers, lifetime):
+            self.tracers.setColors(self.tracer_color_cycle)
+            return
+        # Only the ``trail`` newest positions are drawn, in both copies of the colors
+        alpha = np.linspace(1, 0, trail).reshape((-1, 1))
+        for start in (0, lifetime):
+            colors = self.detail_colors[start : start + trail]
+            colors[..., :3] = self.tracer_color_cycle[0, 0, :3]
+            colors[..., 3] = alpha
+        self.tracers.setColors(self.detail_colors)
+
+    def update_wind_tracers(
+        self, tracer_lat: np.ndarray, tracer_lon: np.ndarray, head: int
+    ):
+        """
+        Update the positions of the tracers from the ring buffers of positions
+        ``tracer_lat`` and ``tracer_lon`` (see ``Weather``), of which only the
+        newest row ``head`` has changed since the previous update, for the tracers
+        which are drawn at the current level of detail.
+        """
+        n = self.tracer_detail.ntracers
+        positions = self.tracer_positions.reshape(tracer_lat.shape + (3,))
+        if n > self.active_tracers:
+            # The positions of the tracers which were not drawn are out of date
+            active = slice(self.active_tracers, n)
+            x, y, z = ut.to_xyz(
+                ut.lon_to_phi(tracer_lon[:, active]),
+                ut.lat_to_theta(tracer_lat[:, active]),
+            )
+            positions[:, active] = np.stack([x, y, z], axis=-1)
+            self.tracers.updateRows()
+        self.active_tracers = n
+        x, y, z = ut.to_xyz(
+            ut.lon_to_phi(tracer_lon[head, :n]), ut.lat_to_theta(tracer_lat[head, :n])
+        )
+        row = positions[head, :n]
+        row[:, 0] = x
+        row[:, 1] = y
+        row[:, 2] = z
+        self.tracer_head = head
+        self.tracers.updateRows([head])
+        self.tracers.setHead(head, n, self.tracer_detail.trail)
+
+    def update_player_positions(
+        self,
+        players: Dict[str, Player],
+        latitudes: Optional[np.ndarray] = None,
+        longitudes: Optional[np.ndarray] = None,
+        extend_tracks: bool = True,
+    ):
+        """
+        Move the players (and extend their tracks, unless ``extend_tracks`` is
+        ``False``) to their current positions, or to the supplied ``latitudes`` and
+        ``longitudes``.
+        """
+        if latitudes is None:
+            latitudes = np.array([player.latitude for player in players.values()])
+            longitudes = np.array([player.longitude for player in players.values()])
         x, y, z = ut.to_xyz(ut.lon_to_phi(longitudes), ut.lat_to_theta(latitudes))
         self.players.setData(pos=np.array([x, y, z]).T)
+        if not extend_tracks:
+            return
 
         for i, (name, player) in enumerate(players.items()):
             if not player.arrived:
-                arr = np.array([x[i], y[i], z[i]])
-                pos = np.vstack(
-                    [self.tracks[name]["pos"], arr],
-                )
-                npos = len(pos)
-                step = (npos // 1000) if npos > 1000 else 1
-                self.tracks[name]["artist"].setData(pos=pos[::step])
-                self.tracks[name]["pos"] = pos
+                track = self.tracks[name]["track"]
+                track.append([x[i], y[i], z[i]])
+                self.tracks[name]["artist"].setData(pos=track.positions)
+
+    def set_player_tracks(
+        self,
+        players: Dict[str, Player],
+        latitudes: np.ndarray,
+        longitudes: np.ndarray,
+    ):
+        """
+        Replace the tracks of the players by the given positions, of shape
+        (number of positions, number of players).
+        """
+        x, y, z = ut.to_xyz(ut.lon_to_phi(longitudes), ut.lat_to_theta(latitudes))
+        for i, name in enumerate(players):
+            track = self.tracks[name]["track"]
+            track.reset(np.array([x[:, i], y[:, i], z[:, i]]).T)
+            self.tracks[name]["artist"].setData(pos=track.positions)
+
+    def extend_player_tracks(
+        self,
+        players: Dict[str, Player],
+        latitudes: np.ndarray,
+        longitudes: np.ndarray,
+    ):
+        """
+        Append the given positions, of shape (number of positions, number of
+        players), to the tracks of the players.
+        """
+        x, y, z = ut.to_xyz(ut.lon_to_phi(longitudes), ut.lat_to_theta(latitudes))
+        for i, name in enumerate(players):
+            track = self.tracks[name]["track"]
+            track.extend(np.array([x[:, i], y[:, i], z[:, i]]).T)
+            self.tracks[name]["artist"].setData(pos=track.positions)
 
     def toggle_wind_tracers(self, val):
         self.tracers.setVisible(val)
@@ -369,13 +858,14 @@ class Graphics:
     def toggle_texture(self, val):
         if val:
             self.sphere.setData(self.high_contrast_texture)
-            self.tracers.setData(color=self.high_contrast_tracer_colors)
+            self.tracer_color_cycle = self.high_contrast_tracer_colors
         else:
             self.sphere.setData(self.default_texture)
-            self.tracers.setData(color=self.default_tracer_colors)
+            self.tracer_color_cycle = self.default_tracer_colors
+        self._set_tracer_colors()
 
     def set_tracer_thickness(self, val):
-        self.tracers.setData(size=val)
+        self.tracers.setSize(val)
 
     def toggle_stars(self, val):
         self.background_stars.setVisible(val)
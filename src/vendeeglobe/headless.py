@@ -0,0 +1,418 @@
+# SPDX-License-Identifier: BSD-3-Clause
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+import numpy as np
+
+from . import config
+from .botpool import BotPool, BotStats
+from .core import Location
+from .map import Map
+from .player import PlayerFleet
+from .recorder import FINISH, RaceRecorder
+from .scores import (
+    finalize_scores,
+    get_player_points,
+    read_fastest_times,
+    write_fastest_times,
+)
+from .timing import print_done
+from .utils import pre_compile
+from .weather import Weather
+
+
+@dataclass(frozen=True)
+class PlayerSummary:
+    """
+    The state of a player at the end of a race.
+
+    The distance travelled is in kilometers, the finish time is in seconds (it is
+    infinite if the player did not make it back home).
+    """
+
+    team: str
+    latitude: float
+    longitude: float
+    distance_travelled: float
+    checkpoints_reached: int
+    arrived: bool
+    finish_time: float
+    points: int
+
+
+@dataclass(frozen=True)
+class RaceResult:
+    """
+    The outcome of a race: the final (accumulated) scores, and a summary per player.
+    """
+
+    scores: Dict[str, float]
+    players: Dict[str, PlayerSummary]
+
+
+DISPATCH_MODES = ("serial", "threads", "processes")
+
+
+class HeadlessEngine:
+    """
+    Run a race without any graphics.
+
+    Simulated time advances in fixed steps of ``time_step`` seconds, as fast as the
+    CPU allows, instead of following the wall clock.
+    This makes the outcome of a race independent of the machine load, for a given
+    weather seed and set of bots.
+
+    A pre-built ``game_map`` and ``weather`` can be supplied, e.g. when they are
+    shared between several processes.
+    The ``precision`` and ``interpolation`` set how the weather fields are stored
+    and sampled (see ``Weather``).
+
+    The bots are run one after the other in the main process when ``dispatch`` is
+    ``"serial"``. With ``"threads"``, the bots are all launched at the same time in
+    a pool of threads, which helps when the bots spend their time in NumPy
+    functions that release the GIL; the instructions are applied in the order of
+    the players once all the bots have replied.
+    With ``"processes"``, each bot runs in its own worker process, and a bot that
+    uses more than ``bot_budget`` seconds of CPU time at a step (or does not reply
+    in time) gets no instructions for that step (see ``BotPool``).
+    Timing statistics for each bot are recorded in ``bot_stats``.
+
+    If a ``record`` directory is supplied, the state of the ships is recorded every
+    ``record_interval`` seconds of game time, so that the race can be replayed
+    (see ``RaceRecorder``). A race with a supplied ``weather`` can only be recorded
+    if the seed of the weather is known.
+    """
+
+    def __init__(
+        self,
+        bots: dict,
+        test: bool = True,
+        time_limit: float = 8 * 60,
+        seed: int = None,
+        start: Optional[Location] = None,
+        time_step: float = 0.05,
+        game_map: Optional[Map] = None,
+        weather: Optional[Weather] = None,
+        precision: str = "float64",
+        interpolation: str = "nearest",
+        dispatch: str = "serial",
+        bot_budget: Optional[float] = None,
+        record: Optional[Union[str, Path]] = None,
+        record_interval: float = 0.1,
+    ):
+        if dispatch not in DISPATCH_MODES:
+            raise ValueError(
+                f"Unknown dispatch mode {dispatch}, must be one of {DISPATCH_MODES}."
+            )
+        pre_compile()
+
+        self.time_limit = time_limit
+        self.time_step = time_step
+        self.safe = not test
+        self.test = test
+
+        t0 = time.time()
+        print("Generating players...", end=" ", flush=True)
+        self.bots = {bot.team: bot for bot in bots}
+        self.teams = list(self.bots.keys())
+        self.fleet = PlayerFleet(teams=self.teams, start=start)
+        self.players = self.fleet.players
+        print_done("players", t0)
+
+        if record is not None and seed is None:
+            # The seed of the weather is recorded, so that the race can be replayed
+            if weather is None:
+                seed = int(np.random.default_rng().integers(2**31))
+            elif weather.seed is None:
+                raise ValueError(
+                    "Recording a race with a supplied weather requires the seed of "
+                    "the weather: supply it as the seed of the race, or of the "
+                    "weather."
+                )
+            else:
+                seed = weather.seed
+        self.map = Map() if game_map is None else game_map
+        self.weather = (
+            Weather(
+                seed=seed,
+                time_limit=self.time_limit,
+                precision=precision,
+                interpolation=interpolation,
+            )
+            if weather is None
+            else weather
+        )
+        self.players_not_arrived = list(self.players.keys())
+        self.forecast = self.weather.get_forecast(0)
+        self.fastest_times = read_fastest_times(self.players)
+        self.finish_times = {name: np.inf for name in self.players}
+        self.current_time = 0.0
+        self.last_forecast_update = 0.0
+
+        self.recorder = None
+        if record is not None:
+            self.recorder = RaceRecorder(
+                directory=record,
+                teams=self.teams,
+                seed=seed,
+                interval=record_interval,
+                time_limit=time_limit,
+                # The settings of the weather used in the race, which may have
+                # been supplied
+                precision=str(self.weather.u.dtype),
+                interpolation=self.weather.interpolation,
+            )
+            self.recorder.record(0.0, self.fleet)
+
+        self.dispatch = dispatch
+        self.bot_stats = {team: BotStats() for team in self.teams}
+        self.bot_pool = None
+        self.bot_threads = None
+        if dispatch == "threads":
+            self.bot_threads = ThreadPoolExecutor(
+                max_workers=max(len(self.bots), 1), thread_name_prefix="vendeeglobe-bot"
+            )
+        if dispatch == "processes":
+            t0 = time.time()
+            print("Starting bot processes...", end=" ", flush=True)
+            self.bot_pool = BotPool(
+                bots=self.bots,
+                world_map=self.map.world_map,
+                budget=config.bot_time_budget if bot_budget is None else bot_budget,
+            )
+            self.bot_stats = self.bot_pool.stats
+            print_done("bot processes", t0)
+
+    def initialize_time(self):
+        self.current_time = 0.0
+        self.last_forecast_update = 0.0
+
+    def get_player_state(self, player, t: float, dt: float) -> dict:
+        """
+        The lightweight arguments of the bot's ``run`` function, i.e. all of them
+        except for the forecast and the world map.
+        """
+        return {
+            "t": t,
+            "dt": dt,
+            "longitude": player.longitude,
+            "latitude": player.latitude,
+            "heading": player.heading,
+            "speed": player.speed,
+            "vector": player.get_vector(),
+        }
+
+    def execute_player_bot(self, player, t: float, dt: float):
+        instructions = None
+        args = {
+            **self.get_player_state(player=player, t=t, dt=dt),
+            "forecast": self.forecast,
+            "world_map": self.map.world_map,
+        }
+        stats = self.bot_stats[player.team]
+        t0 = time.thread_time()
+        if self.safe:
+            try:
+                instructions = self.bots[player.team].run(**args)
+            except:  # noqa
+                stats.errors += 1
+        else:
+            instructions = self.bots[player.team].run(**args)
+        stats.record(time.thread_time() - t0)
+        return instructions
+
+    def call_player_bots(self, t: float, dt: float):
+        if self.bot_pool is not None:
+            self.call_player_bots_in_pool(t=t, dt=dt)
+            return
+        if self.bot_threads is not None:
+            self.call_player_bots_in_threads(t=t, dt=dt)
+            return
+        for player in self.players.values():
+            if self.safe:
+                try:
+                    player.execute_bot_instructions(
+                        self.execute_player_bot(player=player, t=t, dt=dt)
+                    )
+                except:  # noqa
+                    pass
+            else:
+                player.execute_bot_instructions(
+                    self.execute_player_bot(player=player, t=t, dt=dt)
+                )
+
+    def call_player_bots_in_threads(self, t: float, dt: float):
+        futures = {
+            team: self.bot_threads.submit(
+                self.execute_player_bot, player=player, t=t, dt=dt
+            )
+            for team, player in self.players.items()
+        }
+        # Wait for all the bots, and apply the instructions in the order of the
+        # players, as in the serial mode.
+        for team, player in self.players.items():
+            if self.safe:
+                try:
+                    player.execute_bot_instructions(futures[team].result())
+                except:  # noqa
+                    pass
+            else:
+                player.execute_bot_instructions(futures[team].result())
+
+    def call_player_bots_in_pool(self, t: float, dt: float):
+        states = {
+            team: self.get_player_state(player=player, t=t, dt=dt)
+            for team, player in self.players.items()
+        }
+        instructions = self.bot_pool.run(
+            states=states, forecast=self.forecast, safe=self.safe
+        )
+        # Apply the instructions in the order of the players, so that the outcome
+        # does not depend on the order in which the bots replied.
+        for team, player in self.players.items():
+            if instructions.get(team) is None:
+                continue
+            if self.safe:
+                try:
+                    player.execute_bot_instructions(instructions[team])
+                except:  # noqa
+                    pass
+            else:
+                player.execute_bot_instructions(instructions[team])
+
+    def move_players(self, weather: Weather, t: float, dt: float):
+        fleet = self.fleet
+        u, v = weather.get_uv(fleet.latitude, fleet.longitude, np.array([t]))
+        fleet.move(game_map=self.map, u=u, v=v, dt=dt)
+
+        if self.recorder is not None:
+            self.recorder.record(t, fleet)
+
+        newly_reached = fleet.update_checkpoints()
+        for i, j in zip(*np.where(newly_reached)):
+            player = self.players[self.teams[i]]
+            print(f"{player.team} reached {player.checkpoints[j]}")
+            if self.recorder is not None:
+                self.recorder.record_event(t, i, j)
+
+        for i in fleet.get_finishers():
+            player = self.players[self.teams[i]]
+            player.arrived = True
+            player.bonus = config.score_step * len(self.players_not_arrived)
+            n_not_arrived = len(self.players_not_arrived)
+            n_players = len(self.players)
+            if n_not_arrived == n_players:
+                pos_str = "st"
+            elif n_not_arrived == n_players - 1:
+                pos_str = "nd"
+            elif n_not_arrived == n_players - 2:
+                pos_str = "rd"
+            else:
+                pos_str = "th"
+            print(
+                f"{player.team} finished in {n_players - n_not_arrived + 1}"
+                f"{pos_str} position!"
+            )
+            self.players_not_arrived.remove(player.team)
+            if self.recorder is not None:
+                self.recorder.record_event(t, i, FINISH)
+            self.finish_times[player.team] = t
+            self.fastest_times[player.team] = min(t, self.fastest_times[player.team])
+
+    def advance(self, dt: float):
+        """
+        Advance the simulation by ``dt`` seconds: call the bots and move the players.
+        """
+        self.current_time += dt
+        if (
+            self.current_time - self.last_forecast_update
+        ) > config.weather_update_interval:
+            self.forecast = self.weather.get_forecast(self.current_time)
+            self.last_forecast_update = self.current_time
+
+        dt_hours = dt * config.seconds_to_hours
+        self.call_player_bots(
+            t=self.current_time * config.seconds_to_hours, dt=dt_hours
+        )
+        self.move_players(self.weather, t=self.current_time, dt=dt_hours)
+
+    @property
+    def finished(self) -> bool:
+        return (self.current_time >= self.time_limit) or (
+            len(self.players_not_arrived) == 0
+        )
+
+    def simulate(self) -> Dict[str, PlayerSummary]:
+        """
+        Run the race until the time limit is reached, or all players have arrived.
+        No scores are written to disk.
+        """
+        t0 = time.time()
+        print("Racing...", end=" ", flush=True)
+        self.initialize_time()
+        while not self.finished:
+            self.advance(min(self.time_step, self.time_limit - self.current_time))
+        if self.recorder is not None:
+            self.recorder.flush()
+        print(f"done [{time.time() - t0:.2f} s]")
+        return self.summary()
+
+    def summary(self) -> Dict[str, PlayerSummary]:
+        return {
+            name: PlayerSummary(
+                team=name,
+                latitude=float(player.latitude),
+                longitude=float(player.longitude),
+                distance_travelled=float(player.distance_travelled),
+                checkpoints_reached=len(
+                    [ch for ch in player.checkpoints if ch.reached]
+                ),
+                arrived=player.arrived,
+                finish_time=self.finish_times[name],
+                points=get_player_points(player),
+            )
+            for name, player in self.players.items()
+        }
+
+    def close(self):
+        """
+        Stop the bot worker processes or threads, if any, and write the end of
+        the race log.
+        """
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+        if self.bot_threads is not None:
+            self.bot_threads.shutdown()
+            self.bot_threads = None
+        if self.bot_pool is not None:
+            self.bot_pool.close()
+            self.bot_pool = None
+
+    def print_bot_stats(self):
+        print("Bot timings (mean / max per step, in ms):")
+        for team, stats in self.bot_stats.items():
+            print(
+                f"  {team}: {stats.mean_time * 1000:.2f} / "
+                f"{stats.max_time * 1000:.2f} [{stats.calls} calls, "
+                f"{stats.timeouts} timeouts, {stats.errors} errors]"
+            )
+
+    def shutdown(self) -> Dict[str, float]:
+        self.close()
+        self.print_bot_stats()
+        final_scores = finalize_scores(players=self.players, test=self.test)
+        write_fastest_times(self.fastest_times)
+        return final_scores
+
+    def run(self) -> RaceResult:
+        players = self.simulate()
+        return RaceResult(scores=self.shutdown(), players=players)
+
+
+def play_headless(*args, **kwargs) -> RaceResult:
+    return HeadlessEngine(*args, **kwargs).run()
@@ -1,16 +1,21 @@
 # SPDX-License-Identifier: BSD-3-Clause
 
+import hashlib
 import os
-from typing import Union
+import threading
+from typing import Dict, Mapping, Optional, Union
 
 import numpy as np
-from PIL import Image
 import time
 
 from . import config
+from .cache import get_or_create
+from .timing import print_done
 
 
 def create_map_data(fname):
+    from PIL import Image
+
     im = Image.open(os.path.join(config.resourcedir, config.map_file))
     array = np.array(im.convert('RGBA'))
     img16 = array.astype('int16')
@@ -28,12 +33,101 @@ def create_map_data(fname):
     )
 
 
+def _coast(mask: np.ndarray) -> np.ndarray:
+    """
+    The cells of ``mask`` which have a neighbour (including diagonals) outside of
+    the mask. The map wraps around in longitude, but not in latitude.
+    """
+    outside = ~mask
+    padded = np.pad(outside, ((1, 1), (0, 0)), mode='constant')
+    padded = np.pad(padded, ((0, 0), (1, 1)), mode='wrap')
+    nlat, nlon = mask.shape
+    neighbour = np.zeros_like(mask)
+    for i in range(3):
+        for j in range(3):
+            neighbour |= padded[i : i + nlat, j : j + nlon]
+    return mask & neighbour
+
+
+def create_distance_to_land(sea_array: np.ndarray) -> np.ndarray:
+    """
+    Compute the signed distance (in km) from the center of each map cell to the
+    nearest coast: positive at sea (distance to the nearest land cell), and negative
+    on land (distance to the nearest sea cell).
+
+    The cell centers are placed on a sphere, and the nearest coastal cell of the
+    other kind is found with a k-d tree on their 3D coordinates: the straight-line
+    distance between two points of the sphere grows with the distance on its
+    surface, so this is the nearest cell on the globe (also across the date line
+    and near the poles). The straight-line distance is then converted to the
+    distance on the surface.
+    """
+    from scipy.spatial import cKDTree
+
+    nlat, nlon = sea_array.shape
+    sea = sea_array != 0
+    lat = np.radians(np.linspace(-90 + 90 / nlat, 90 - 90 / nlat, nlat))
+    lon = np.radians(np.linspace(-180 + 180 / nlon, 180 - 180 / nlon, nlon))
+    lat, lon = np.meshgrid(lat, lon, indexing='ij')
+    xyz = np.stack(
+        [np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=-1
+    )
+
+    distance = np.zeros((nlat, nlon), dtype=np.float32)
+    for mask, sign in ((sea, 1.0), (~sea, -1.0)):
+        coast = _coast(~mask)
+        if not (mask.any() and coast.any()):
+            continue
+        chord, _ = cKDTree(xyz[coast]).query(xyz[mask], workers=-1)
+        distance[mask] = sign * 2.0 * config.map_radius * np.arcsin(0.5 * chord)
+    return distance
+
+
+def load_distance_to_land(sea_array: np.ndarray) -> np.ndarray:
+    """
+    Load the distance to land field from the cache, or compute it and store it in
+    the cache (see ``config.cache_dir``). The field is identified by the contents
+    of the sea array.
+    """
+
+    def create():
+        t0 = time.time()
+        print('Computing distance to land...', end=' ', flush=True)
+        distance = create_distance_to_land(sea_array)
+        print_done('distance to land', t0)
+        return {'distance': distance}
+
+    sea = np.ascontiguousarray(sea_array)
+    params = {
+        'shape': list(sea.shape),
+        'dtype': str(sea.dtype),
+        'hash': hashlib.sha256(sea.data).hexdigest(),
+    }
+    return get_or_create('distance_to_land', params=params, create=create)['distance']
+
+
+def load_map_data() -> Dict[str, np.ndarray]:
+    mapdata = np.load(os.path.join(config.resourcedir, 'mapdata.npz'))
+    return {key: mapdata[key] for key in mapdata.files}
+
+
 class Map:
-    def __init__(self):
+    """
+    The world map.
+
+    Parameters
+    ----------
+    mapdata:
+        Pre-loaded map arrays (as returned by ``load_map_data``), e.g. arrays shared
+        between processes. If not supplied, the map is loaded from the resources.
+    """
+
+    def __init__(self, mapdata: Optional[Mapping[str, np.ndarray]] = None):
         t0 = time.time()
         print('Creating world map...', end=' ', flush=True)
 
-        mapdata = np.load(os.path.join(config.resourcedir, 'mapdata.npz'))
+        if mapdata is None:
+            mapdata = load_map_data()
         self.array = mapdata['array']
         self.sea_array = mapdata['sea_array']
         self.high_contrast_texture = mapdata['high_contrast_texture']
@@ -51,9 +145,34 @@ class Map:
         self.lon = np.linspace(
             lon_min + 0.5 * self.dlon, lon_max - 0.5 * self.dlon, self.nlon
         )
-        self.lon_grid, self.lat_grid = np.meshgrid(self.lon, self.lat)
         self.sea_array.setflags(write=False)
-        print(f'done [{time.time() - t0:.2f} s]')
+        self._distance_to_land = None
+        self._distance_lock = threading.Lock()
+        self.world_map = WorldMap(self)
+        print_done('map', t0)
+
+    @property
+    def distance_field(self) -> np.ndarray:
+        """
+        The signed distance to the nearest coast (in km) for every map cell,
+        positive at sea and negative on land. It is loaded on first use (only once,
+        when bots running in threads ask for it at the same time).
+        """
+        if self._distance_to_land is None:
+            with self._distance_lock:
+                if self._distance_to_land is None:
+                    self._distance_to_land = load_distance_to_land(self.sea_array)
+        return self._distance_to_land
+
+    def __getstate__(self) -> dict:
+        # The lock cannot be sent to the bot worker processes
+        state = self.__dict__.copy()
+        del state['_distance_lock']
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        self._distance_lock = threading.Lock()
 
     def get_terrain(
         self,
@@ -74,3 +193,59 @@ class Map:
         ilon = ((np.asarray(longitudes) + 180.0) / self.dlon).astype(int)
         ilat = ((np.asarray(latitudes) + 90.0) / self.dlat).astype(int)
         return self.sea_array[ilat, ilon]
+
+    def distance_to_land(
+        self,
+        latitudes: Union[float, np.ndarray],
+        longitudes: Union[float, np.ndarray],
+    ) -> Union[float, np.ndarray]:
+        """
+        Get the distance (in km) to the nearest coast at the supplied latitude(s)
+        and longitude(s). The distance is positive at sea and negative on land.
+
+        Parameters
+        ----------
+        latitudes:
+            The latitude(s) in degrees.
+        longitudes:
+            The longitude(s) in degrees.
+        """
+        ilon = ((np.asarray(longitudes) + 180.0) / self.dlon).astype(int)
+        ilat = ((np.asarray(latitudes) + 90.0) / self.dlat).astype(int)
+        return self.distance_field[ilat, ilon]
+
+
+class WorldMap:
+    """
+    The world map given to the bots.
+
+    Calling it returns the terrain type (1 = sea, 0 = land) at the given
+    location(s): ``world_map(latitudes, longitudes)``.
+    The distance to the nearest coast can be queried with
+    ``world_map.distance_to_land(latitudes, longitudes)``.
+    """
+
+    def __init__(self, game_map: Map):
+        self._map = game_map
+
+    @property
+    def sea_array(self) -> np.ndarray:
+        """
+        The read-only map array, with 1 for sea and 0 for land, of shape
+        (latitude, longitude).
+        """
+        return self._map.sea_array
+
+    def __call__(
+        self,
+        latitudes: Union[float, np.ndarray],
+        longitudes: Union[float, np.ndarray],
+    ) -> Union[float, np.ndarray]:
+        return self._map.get_terrain(latitudes=latitudes, longitudes=longitudes)
+
+    def distance_to_land(
+        self,
+        latitudes: Union[float, np.ndarray],
+        longitudes: Union[float, np.ndarray],
+    ) -> Union[float, np.ndarray]:
+        return self._map.distance_to_land(latitudes=latitudes, longitudes=longitudes)
@@ -1,7 +1,6 @@
 # SPDX-License-Identifier: BSD-3-Clause
 
-from dataclasses import asdict
-from typing import Optional, Sequence, Tuple, Union
+from typing import Dict, List, Optional, Sequence, Union
 
 import numpy as np
 
@@ -10,29 +9,80 @@ from . import utils as utl
 from .core import Checkpoint, Heading, Location, Vector
 
 
+def _fleet_attribute(name: str) -> property:
+    """
+    Expose the entry of one of the fleet arrays as a player attribute.
+    """
+
+    def getter(self):
+        return getattr(self._fleet, name)[self._index].item()
+
+    def setter(self, value):
+        getattr(self._fleet, name)[self._index] = value
+
+    return property(getter, setter)
+
+
+class PlayerCheckpoint(Checkpoint):
+    """
+    A checkpoint as seen by one player: the ``reached`` flag is a view of the
+    corresponding entry of ``PlayerFleet.reached``, so that setting it on the
+    checkpoint updates the fleet, and vice versa.
+    """
+
+    def __init__(
+        self, checkpoint: Checkpoint, fleet: "PlayerFleet", index: int, i: int
+    ):
+        self._fleet = fleet
+        self._index = index
+        self._i = i
+        self.latitude = checkpoint.latitude
+        self.longitude = checkpoint.longitude
+        self.radius = checkpoint.radius
+
+    @property
+    def reached(self) -> bool:
+        return bool(self._fleet.reached[self._index, self._i])
+
+    @reached.setter
+    def reached(self, value: bool):
+        self._fleet.reached[self._index, self._i] = value
+
+
 class Player:
+    """
+    A single ship in the race.
+
+    The state of the ship is not stored in the player itself, but in a
+    :class:`PlayerFleet`, of which the player is a view.
+    """
+
+    latitude = _fleet_attribute("latitude")
+    longitude = _fleet_attribute("longitude")
+    heading = _fleet_attribute("heading")
+    sail = _fleet_attribute("sail")
+    speed = _fleet_attribute("speed")
+    distance_travelled = _fleet_attribute("distance_travelled")
+    bonus = _fleet_attribute("bonus")
+    arrived = _fleet_attribute("arrived")
+
     def __init__(
         self,
         team: str,
         start: Optional[Location] = None,
+        fleet: Optional["PlayerFleet"] = None,
+        index: int = 0,
     ):
         self.team = team
-        self.bonus = 0
-        self.heading = 180.0
-        self.speed = 0.0
-        if start is None:
-            self.latitude = config.start.latitude
-            self.longitude = config.start.longitude
-        else:
-            self.latitude = start.latitude
-            self.longitude = start.longitude
         self.color = utl.string_to_color(team)
-        self.checkpoints = [
-            Checkpoint(**asdict(checkpoint)) for checkpoint in config.checkpoints
+        if fleet is None:
+            fleet = PlayerFleet(teams=[team], start=start)
+        self._fleet = fleet
+        self._index = index
+        self.checkpoints: List[Checkpoint] = [
+            PlayerCheckpoint(checkpoint, fleet=fleet, index=index, i=i)
+            for i, checkpoint in enumerate(config.checkpoints)
         ]
-        self.arrived = False
-        self.distance_travelled = 0.0
-        self.sail = 1.0
 
     def execute_bot_instructions(self, instructions: Union[Location, Heading, Vector]):
         if [
@@ -106,21 +156,117 @@ class Player:
         """
         return utl.distance(self.get_position(), [longitude, latitude])
 
-    def get_path(self, dt: float, u: float, v: float) -> Tuple[np.ndarray, np.ndarray]:
+
+class PlayerFleet:
+    """
+    The state of all the ships in a race, stored as arrays (one entry per ship).
+
+    This allows to move all the ships in one go, instead of looping over the
+    players.
+
+    Parameters
+    ----------
+    teams:
+        The names of the teams.
+    start:
+        The starting location of all the ships.
+    """
+
+    def __init__(self, teams: Sequence[str], start: Optional[Location] = None):
+        if start is None:
+            start = config.start
+        n = len(teams)
+        self.latitude = np.full(n, float(start.latitude))
+        self.longitude = np.full(n, float(start.longitude))
+        self.heading = np.full(n, 180.0)
+        self.sail = np.ones(n)
+        self.speed = np.zeros(n)
+        self.distance_travelled = np.zeros(n)
+        self.bonus = np.zeros(n, dtype=int)
+        self.arrived = np.zeros(n, dtype=bool)
+        self.reached = np.zeros((n, len(config.checkpoints)), dtype=bool)
+
+        self.checkpoint_latitudes = np.array([ch.latitude for ch in config.checkpoints])
+        self.checkpoint_longitudes = np.array(
+            [ch.longitude for ch in config.checkpoints]
+        )
+        self.checkpoint_radii = np.array([ch.radius for ch in config.checkpoints])
+
+        self.players: Dict[str, Player] = {
+            team: Player(team=team, fleet=self, index=i) for i, team in enumerate(teams)
+        }
+
+    def __len__(self) -> int:
+        return len(self.latitude)
+
+    def move(self, game_map, u: np.ndarray, v: np.ndarray, dt: float):
+        """
+        Move all the ships that have not yet arrived, for the given wind and time step.
+        Ships stop before they hit land.
+
+        Parameters
+        ----------
+        game_map:
+            The world map, used to detect collisions with land.
+        u:
+            The horizontal wind component at the location of each ship.
+        v:
+            The vertical wind component at the location of each ship.
+        dt:
+            The time step in hours.
+        """
+        active = ~self.arrived
+        if not active.any():
+            return
+        fx, fy = utl.wind_force_many(self.heading[active], u[active], v[active])
+        self.speed[active] = np.sqrt(fx**2 + fy**2)
+
+        lat = self.latitude[active]
+        scaling = dt * self.sail[active]
+        iactive = np.where(active)[0]
+        next_lat, next_lon, dist = utl.march_rays(
+            game_map.sea_array,
+            lat,
+            self.longitude[active],
+            utl.lat_degs_from_length(fy * scaling),
+            utl.lon_degs_from_length(fx * scaling, lat),
+        )
+        self.distance_travelled[iactive] += dist
+        self.latitude[iactive] = next_lat
+        self.longitude[iactive] = next_lon
+
+    def update_checkpoints(self) -> np.ndarray:
+        """
+        Mark the checkpoints that the ships are currently in as reached.
+        Return a mask of shape (number of ships, number of checkpoints) of the
+        checkpoints that were reached during this call.
+        """
+        nch = len(self.checkpoint_radii)
+        dist = utl.distance_on_surface(
+            longitude1=np.repeat(self.longitude, nch),
+            latitude1=np.repeat(self.latitude, nch),
+            longitude2=np.tile(self.checkpoint_longitudes, len(self)),
+            latitude2=np.tile(self.checkpoint_latitudes, len(self)),
+        ).reshape(self.reached.shape)
+        newly_reached = (
+            (dist < self.checkpoint_radii)
+            & ~self.reached
+            & ~self.arrived.reshape((-1, 1))
+        )
+        self.reached |= newly_reached
+        return newly_reached
+
+    def get_finishers(self) -> np.ndarray:
         """
-        Compute the path of the ship for the given time step.
+        Return the indices of the ships that have reached all checkpoints and are
+        back home, but have not yet been marked as arrived.
         """
-        pos = self.get_position()
-        uv = np.array([u, v])
-        vec = utl.wind_force(self.get_vector(), uv)
-        self.speed = np.linalg.norm(vec)
-        f = vec * dt * self.sail
-        dist = np.array(
-            [utl.lon_degs_from_length(f[0], pos[1]), utl.lat_degs_from_length(f[1])]
+        dist = utl.distance_on_surface(
+            longitude1=self.longitude,
+            latitude1=self.latitude,
+            longitude2=config.start.longitude,
+            latitude2=config.start.latitude,
         )
-        # Race trace the path
-        norm = np.linalg.norm(dist)
-        ray = dist.reshape((2, 1)) * np.linspace(0, 1, (int(norm) + 1) * 8)
-        path = np.array(self.get_position()).reshape((2, 1)) + ray
-        lat, lon = utl.wrap(lat=path[1, :], lon=path[0, :])
-        return lat, lon
+        return np.where(
+            (dist < config.start.radius) & self.reached.all(axis=1) & ~self.arrived
+        )[0]
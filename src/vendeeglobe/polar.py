@@ -0,0 +1,99 @@
+# SPDX-License-Identifier: BSD-3-Clause
+
+from typing import Tuple, Union
+
+import numpy as np
+
+from .utils import wind_force_many
+
+
+class PolarTable:
+    """
+    The performance of the ship: its speed (in km/h, with the sails fully out) as a
+    function of the true wind angle and the wind speed, tabulated on a regular grid.
+
+    The true wind angle is the angle between the heading of the ship and the
+    direction the wind is coming from: 0 degrees means the wind is coming from
+    straight ahead, and 180 degrees means the wind is blowing from behind.
+
+    The table is built once from the same physics as the game (see
+    ``utils.wind_force_many``), and looking up a speed is a direct index into the
+    table, whatever its size.
+
+    Parameters
+    ----------
+    max_wind_speed:
+        The largest wind speed in the table (in km/h). Larger wind speeds use the
+        last column of the table.
+    angle_step:
+        The spacing of the table in true wind angle (in degrees).
+    speed_step:
+        The spacing of the table in wind speed (in km/h).
+    """
+
+    def __init__(
+        self,
+        max_wind_speed: float = 200.0,
+        angle_step: float = 1.0,
+        speed_step: float = 0.5,
+    ):
+        self.angle_step = angle_step
+        self.speed_step = speed_step
+        self.angles = np.arange(0.0, 180.0 + angle_step, angle_step)
+        self.wind_speeds = np.arange(0.0, max_wind_speed + speed_step, speed_step)
+        # A ship heading East (0 degrees), with the wind coming from the angle
+        twa = np.radians(self.angles).reshape(-1, 1)
+        fx, fy = wind_force_many(
+            0.0,
+            -self.wind_speeds * np.cos(twa),
+            -self.wind_speeds * np.sin(twa),
+        )
+        self.table = np.sqrt(fx**2 + fy**2)
+        self.table.setflags(write=False)
+
+    def speed(
+        self,
+        true_wind_angle: Union[float, np.ndarray],
+        wind_speed: Union[float, np.ndarray],
+    ) -> Union[float, np.ndarray]:
+        """
+        Look up the speed of the ship for the given true wind angle(s) (in degrees)
+        and wind speed(s) (in km/h), using the nearest entries of the table.
+        """
+        angle = np.abs((np.asarray(true_wind_angle) + 180.0) % 360.0 - 180.0)
+        ia = np.rint(angle / self.angle_step).astype(int)
+        iw = np.minimum(
+            np.rint(np.asarray(wind_speed) / self.speed_step).astype(int),
+            len(self.wind_speeds) - 1,
+        )
+        return self.table[ia, iw]
+
+    def speed_uv(
+        self,
+        headings: Union[float, np.ndarray],
+        u: Union[float, np.ndarray],
+        v: Union[float, np.ndarray],
+    ) -> Union[float, np.ndarray]:
+        """
+        Look up the speed of the ship for the given heading(s) (in degrees) and
+        wind vector(s) ``u`` and ``v``.
+        """
+        twa, wind_speed = true_wind(headings, u, v)
+        return self.speed(twa, wind_speed)
+
+
+def true_wind(
+    headings: Union[float, np.ndarray],
+    u: Union[float, np.ndarray],
+    v: Union[float, np.ndarray],
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compute the true wind angle (in degrees, see ``PolarTable``) and the wind speed,
+    for ships with the given heading(s) (in degrees) and the wind ``u`` and ``v``.
+    """
+    u = np.asarray(u)
+    v = np.asarray(v)
+    # The wind vector points where the wind is going, so it comes from the opposite
+    coming_from = np.degrees(np.arctan2(-v, -u))
+    angle = np.abs((coming_from - np.asarray(headings) + 180.0) % 360.0 - 180.0)
+    return angle, np.sqrt(u**2 + v**2)
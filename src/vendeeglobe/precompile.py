@@ -0,0 +1,26 @@
+# SPDX-License-Identifier: BSD-3-Clause
+"""
+Compile the numba kernels of vendeeglobe into the cache, so that the races start
+without compilation, e.g. when building a container image:
+
+    python -m vendeeglobe.precompile
+
+The cache is stored in the ``numba`` folder of the vendeeglobe cache (see
+``config.cache_dir``), or in the directory given by the ``NUMBA_CACHE_DIR``
+environment variable.
+"""
+
+
+def main():
+    from . import utils
+
+    if utils.numba is None:
+        print("Numba is not installed: the NumPy versions of the kernels are used.")
+        return
+    utils.pre_compile()
+    cache_dir = utils.numba.config.CACHE_DIR or "the default numba cache location"
+    print(f"The compiled kernels are cached in {cache_dir}")
+
+
+if __name__ == "__main__":
+    main()
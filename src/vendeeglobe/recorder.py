@@ -0,0 +1,161 @@
+# SPDX-License-Identifier: BSD-3-Clause
+
+import json
+from pathlib import Path
+from typing import Dict, List, Union
+
+import numpy as np
+
+from . import config
+
+# The columns of the log, with the type and the scale factor used to store them.
+# A stored value is multiplied by the scale to get the real value back.
+COLUMNS = {
+    "latitude": ("<f4", 1.0),
+    "longitude": ("<f4", 1.0),
+    "heading": ("<u2", 360.0 / 65536),
+    "sail": ("u1", 1.0 / 255),
+    "speed": ("<f2", 1.0),
+    "distance_travelled": ("<f4", 1.0),
+}
+
+EVENT_DTYPE = np.dtype([("time", "<f4"), ("player", "<u2"), ("checkpoint", "<i2")])
+
+# The checkpoint index used for the arrival of a player at the finish
+FINISH = -1
+
+
+class RaceRecorder:
+    """
+    Record the state of all the ships during a race, so that it can be replayed.
+
+    The log is a directory containing:
+
+    - ``meta.json``: the teams, the weather seed and the other settings of the
+      race, and the description of the columns
+    - one raw binary file per column (``time.bin``, ``latitude.bin``, ...), with
+      one row of values (one per player) per recorded frame
+    - ``events.bin``: the times at which the players reached the checkpoints and
+      the finish
+
+    The columns are quantized to keep the log small (e.g. the heading is stored on
+    16 bits, and the sail on 8 bits).
+    Frames are recorded every ``interval`` seconds of game time, and are kept in
+    memory in chunks of ``chunk_size`` frames before being appended to the files.
+
+    Parameters
+    ----------
+    directory:
+        The directory where the log is written. It is created if needed, and an
+        existing log is overwritten.
+    teams:
+        The names of the teams, in the order of the players in the fleet.
+    seed:
+        The weather seed.
+    interval:
+        The time between two recorded frames, in seconds of game time.
+    chunk_size:
+        The number of frames written to disk at once.
+    **settings:
+        Any other settings of the race to store in the metadata.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        teams: List[str],
+        seed: int,
+        interval: float = 0.1,
+        chunk_size: int = 256,
+        **settings,
+    ):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.interval = interval
+        self.next_time = 0.0
+        self.nplayers = len(teams)
+        self._times = np.zeros(chunk_size, dtype="<f4")
+        # The frames are buffered as floats, and quantized when they are flushed
+        self._buffers = {
+            name: np.zeros((chunk_size, self.nplayers), dtype=np.float32)
+            for name in COLUMNS
+        }
+        self._events = []
+        self._nframes = 0
+
+        meta = {
+            "teams": list(teams),
+            "seed": seed,
+            "interval": interval,
+            "checkpoints": [
+                [ch.latitude, ch.longitude, ch.radius] for ch in config.checkpoints
+            ],
+            "columns": {
+                name: {"dtype": dtype, "scale": scale}
+                for name, (dtype, scale) in COLUMNS.items()
+            },
+            **settings,
+        }
+        with open(self.directory / "meta.json", "w") as f:
+            json.dump(meta, f, indent=2)
+        for name in ["time", *COLUMNS, "events"]:
+            open(self.directory / f"{name}.bin", "wb").close()
+
+    def record(self, t: float, fleet):
+        """
+        Record the state of the fleet at time ``t`` (in seconds), if the time since
+        the previous frame is at least the recording interval.
+        """
+        if t < self.next_time:
+            return
+        self.next_time = (np.floor(t / self.interval) + 1) * self.interval
+        i = self._nframes
+        self._times[i] = t
+        for name, buffer in self._buffers.items():
+            buffer[i] = getattr(fleet, name)
+        self._nframes += 1
+        if self._nframes == len(self._times):
+            self.flush()
+
+    def record_event(self, t: float, player: int, checkpoint: int):
+        """
+        Record that a player reached a checkpoint (or the finish, with the
+        checkpoint index ``FINISH``) at time ``t``.
+        """
+        self._events.append((t, player, checkpoint))
+
+    def flush(self):
+        """
+        Append the recorded frames and events to the files.
+        """
+        n = self._nframes
+        with open(self.directory / "time.bin", "ab") as f:
+            self._times[:n].tofile(f)
+        for name, (dtype, scale) in COLUMNS.items():
+            values = self._buffers[name][:n]
+            if scale != 1.0:
+                values = np.clip(np.rint(values / scale), 0, np.iinfo(dtype).max)
+            with open(self.directory / f"{name}.bin", "ab") as f:
+                values.astype(dtype).tofile(f)
+        with open(self.directory / "events.bin", "ab") as f:
+            np.array(self._events, dtype=EVENT_DTYPE).tofile(f)
+        self._nframes = 0
+        self._events = []
+
+    def close(self):
+        self.flush()
+
+
+def read_meta(directory: Union[str, Path]) -> Dict:
+    """
+    Read the metadata of a recorded race.
+    """
+    with open(Path(directory) / "meta.json", "r") as f:
+        return json.load(f)
+
+
+def read_events(directory: Union[str, Path]) -> np.ndarray:
+    """
+    Read the checkpoint and finish events of a recorded race.
+    """
+    return np.fromfile(Path(directory) / "events.bin", dtype=EVENT_DTYPE)
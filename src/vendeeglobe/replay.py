@@ -0,0 +1,266 @@
+# SPDX-License-Identifier: BSD-3-Clause
+
+import datetime
+import time
+from pathlib import Path
+from typing import Union
+
+import numpy as np
+import pyqtgraph as pg
+from pyqtgraph.Qt import QtCore
+
+try:
+    from PyQt5.QtWidgets import (
+        QCheckBox,
+        QHBoxLayout,
+        QLabel,
+        QMainWindow,
+        QSlider,
+        QVBoxLayout,
+        QWidget,
+    )
+    from PyQt5.QtCore import Qt
+except ImportError:
+    from PySide2.QtWidgets import (
+        QCheckBox,
+        QHBoxLayout,
+        QLabel,
+        QMainWindow,
+        QSlider,
+        QVBoxLayout,
+        QWidget,
+    )
+    from PySide2.QtCore import Qt
+
+from . import config
+from .graphics import Graphics
+from .map import Map
+from .player import PlayerFleet
+from .recorder import FINISH, read_events, read_meta
+from .weather import Weather
+
+
+class RaceLog:
+    """
+    A race recorded with ``RaceRecorder``.
+
+    The columns are memory-mapped, so that only the frames which are displayed are
+    read from disk.
+
+    Parameters
+    ----------
+    directory:
+        The directory containing the log.
+    """
+
+    def __init__(self, directory: Union[str, Path]):
+        self.directory = Path(directory)
+        self.meta = read_meta(self.directory)
+        self.teams = self.meta["teams"]
+        self.events = read_events(self.directory)
+        if (self.directory / "time.bin").stat().st_size == 0:
+            raise ValueError(f"The race log in {self.directory} contains no frames.")
+        self.time = np.memmap(self.directory / "time.bin", dtype="<f4", mode="r")
+        self.nframes = len(self.time)
+        self.columns = {
+            name: np.memmap(
+                self.directory / f"{name}.bin",
+                dtype=column["dtype"],
+                mode="r",
+                shape=(self.nframes, len(self.teams)),
+            )
+            for name, column in self.meta["columns"].items()
+        }
+
+    def frame_index(self, t: float) -> int:
+        """
+        The index of the last frame recorded at or before time ``t`` (in seconds).
+        """
+        i = int(np.searchsorted(self.time, t, side="right")) - 1
+        return min(max(i, 0), self.nframes - 1)
+
+    def get(self, name: str, frames: Union[int, slice]) -> np.ndarray:
+        """
+        Get the values of a column for the given frame(s), converted back to
+        floats.
+        """
+        return self.columns[name][frames] * self.meta["columns"][name]["scale"]
+
+
+class Replay:
+    """
+    Replay a recorded race, without running the bots or moving the ships.
+
+    The positions of the ships are read from the log, and the wind tracers are
+    computed from the weather, which is generated again from the recorded seed.
+    The replay can be played at a speed from 1 to 100 times the speed of the race,
+    and the time slider can be used to jump to any time in the race.
+
+    Parameters
+    ----------
+    directory:
+        The directory containing the log.
+    speed:
+        The initial playback speed.
+    """
+
+    def __init__(self, directory: Union[str, Path], speed: float = 1.0):
+        self.log = RaceLog(directory)
+        meta = self.log.meta
+        self.speed = speed
+        self.fleet = PlayerFleet(teams=self.log.teams)
+        self.players = self.fleet.players
+        self.map = Map()
+        self.weather = Weather(
+            seed=meta["seed"],
+            time_limit=meta["time_limit"],
+            precision=meta.get("precision", "float64"),
+            interpolation=meta.get("interpolation", "nearest"),
+        )
+        self.current_time = 0.0
+        self.frame = -1
+        self.playing = True
+        self.set_frame(0)
+        self.graphics = Graphics(
+            game_map=self.map, weather=self.weather, players=self.players
+        )
+
+    def set_frame(self, i: int):
+        """
+        Set the state of the ships to the frame ``i`` of the log.
+        """
+        for name in self.log.columns:
+            getattr(self.fleet, name)[:] = self.log.get(name, i)
+        t = self.log.time[i]
+        events = self.log.events[self.log.events["time"] <= t]
+        self.fleet.reached[:] = False
+        self.fleet.arrived[:] = False
+        for event in events:
+            if event["checkpoint"] == FINISH:
+                self.fleet.arrived[event["player"]] = True
+            else:
+                self.fleet.reached[event["player"], event["checkpoint"]] = True
+        self.frame = i
+
+    def show_frame(self, i: int):
+        """
+        Display the frame ``i``. The frames since the current one are appended to
+        the tracks of the ships; the tracks are only rebuilt from the log when
+        going back in time.
+        """
+        previous = self.frame
+        # As in a race, the tracks of the ships which had arrived are not extended
+        sailing = ~self.fleet.arrived
+        self.set_frame(i)
+        if i > previous:
+            frames = slice(previous + 1, i + 1)
+            self.graphics.extend_player_tracks(
+                {
+                    name: player
+                    for (name, player), is_sailing in zip(self.players.items(), sailing)
+                    if is_sailing
+                },
+                latitudes=self.log.get("latitude", frames)[:, sailing],
+                longitudes=self.log.get("longitude", frames)[:, sailing],
+            )
+        else:
+            step = max(i // 1000, 1)
+            self.graphics.set_player_tracks(
+                self.players,
+                latitudes=self.log.get("latitude", slice(0, i + 1, step)),
+                longitudes=self.log.get("longitude", slice(0, i + 1, step)),
+            )
+        self.graphics.update_player_positions(self.players, extend_tracks=False)
+        self.time_label.setText(
+            "Time: " + str(datetime.timedelta(seconds=int(self.log.time[i])))[2:]
+        )
+        self.time_slider.blockSignals(True)
+        self.time_slider.setValue(i)
+        self.time_slider.blockSignals(False)
+
+    def seek(self, i: int):
+        self.current_time = float(self.log.time[i])
+        self.show_frame(i)
+
+    def set_speed(self, val: int):
+        self.speed = val
+        self.speed_label.setText(f"Speed: {val}x")
+
+    def toggle_playing(self, val):
+        self.playing = bool(val)
+
+    def update(self):
+        clock_time = time.time()
+        dt = clock_time - self.previous_clock_time
+        self.previous_clock_time = clock_time
+        if self.playing and self.frame < self.log.nframes - 1:
+            self.current_time += dt * self.speed
+            i = self.log.frame_index(self.current_time)
+            if i != self.frame:
+                self.show_frame(i)
+        self.graphics.update_level_of_detail(dt)
+        if self.tracer_checkbox.isChecked():
+            self.weather.update_wind_tracers(
+                t=np.array([self.current_time]),
+                dt=dt * config.seconds_to_hours,
+                speedup=None,
+                ntracers=self.graphics.tracer_detail.ntracers,
+            )
+            self.graphics.update_wind_tracers(
+                self.weather.tracer_lat,
+                self.weather.tracer_lon,
+                head=self.weather.tracer_head,
+            )
+
+    def run(self):
+        window = QMainWindow()
+        window.setWindowTitle("Vendée Globe - Replay")
+        window.setGeometry(100, 100, 1280, 720)
+        central_widget = QWidget()
+        window.setCentralWidget(central_widget)
+        layout = QVBoxLayout(central_widget)
+        layout.addWidget(self.graphics.window)
+
+        controls = QWidget()
+        layout.addWidget(controls)
+        controls_layout = QHBoxLayout(controls)
+
+        play_checkbox = QCheckBox("Play", checked=self.playing)
+        play_checkbox.stateChanged.connect(self.toggle_playing)
+        controls_layout.addWidget(play_checkbox)
+        self.tracer_checkbox = QCheckBox("Wind tracers", checked=True)
+        self.tracer_checkbox.stateChanged.connect(self.graphics.toggle_wind_tracers)
+        controls_layout.addWidget(self.tracer_checkbox)
+
+        self.time_label = QLabel("Time:")
+        controls_layout.addWidget(self.time_label)
+        self.time_slider = QSlider(Qt.Horizontal)
+        self.time_slider.setMinimum(0)
+        self.time_slider.setMaximum(self.log.nframes - 1)
+        self.time_slider.valueChanged.connect(self.seek)
+        controls_layout.addWidget(self.time_slider, stretch=1)
+
+        self.speed_label = QLabel("")
+        controls_layout.addWidget(self.speed_label)
+        speed_slider = QSlider(Qt.Horizontal)
+        speed_slider.setMinimum(1)
+        speed_slider.setMaximum(100)
+        speed_slider.valueChanged.connect(self.set_speed)
+        speed_slider.setValue(int(self.speed))
+        self.set_speed(int(self.speed))
+        controls_layout.addWidget(speed_slider)
+
+        window.show()
+        self.show_frame(0)
+        self.timer = QtCore.QTimer()
+        self.timer.timeout.connect(self.update)
+        self.previous_clock_time = time.time()
+        self.timer.start(0)
+        pg.exec()
+
+
+def replay(directory: Union[str, Path], speed: float = 1.0):
+    """
+    Open a window to replay a race recorded with ``record=directory``.
+    """
+    Replay(directory=directory, speed=speed).run()
@@ -0,0 +1,219 @@
+# SPDX-License-Identifier: BSD-3-Clause
+
+import time
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from . import config
+from . import utils as utl
+from .core import Checkpoint, Location
+from .weather import WeatherForecast
+
+
+def isochrones(
+    start: Location,
+    target: Checkpoint,
+    forecast: WeatherForecast,
+    sea_array: np.ndarray,
+    t: float = 0.0,
+    dt: float = 12.0,
+    nheadings: int = 16,
+    resolution: float = 2.0,
+    max_points: int = 30,
+    max_steps: int = 200,
+    time_limit: Optional[float] = None,
+) -> Tuple[List[Location], float]:
+    """
+    Find a fast route from ``start`` to ``target`` with the isochrone method.
+
+    At each step, all the positions on the current isochrone (the set of positions
+    that can be reached in the same amount of time) are moved for ``dt`` hours in a
+    fan of ``nheadings`` headings, with the forecast wind.
+    Moves that would hit land stop at the coast (see ``utils.march_rays``).
+    The new positions are then binned on a grid of cells of ``resolution`` degrees:
+    only the position closest to the target is kept in each cell, and cells which
+    were already reached by an earlier isochrone are discarded.
+    A target which is smaller than the cells is considered reached within half a
+    cell of its center, and the center is then added as the last waypoint.
+
+    Returns the waypoints of the route (one per time step, the last one being inside
+    the target), and the time (in hours) at which the target is reached.
+    If the target cannot be reached in ``max_steps`` steps (or ``time_limit``
+    seconds), the route leads to the position which is closest to the target.
+
+    With the default parameters, a leg across an ocean takes about 10 ms (about
+    0.4 ms per step, mostly spent in ``utils.march_rays``), on a map of 0.2
+    degree cells, i.e. well under the time budget of the bots in a race
+    (``config.bot_time_budget``).
+    The positions must move by more than a cell at each step to get past the cells
+    of the earlier isochrones: in light winds, use a longer ``dt`` or a finer
+    ``resolution``.
+
+    Parameters
+    ----------
+    start:
+        The starting location.
+    target:
+        The checkpoint to reach.
+    forecast:
+        The weather forecast. Times beyond the end of the forecast use its last
+        slice.
+    sea_array:
+        The sea (1) and land (0) array of the world map (see ``Map.sea_array``).
+    t:
+        The time (in hours, relative to the start of the forecast) at which the
+        route starts.
+    dt:
+        The duration (in hours) of a step between two isochrones.
+    nheadings:
+        The number of headings explored from every position.
+    resolution:
+        The size (in degrees) of the cells used to prune the isochrones.
+    max_points:
+        The maximum number of positions on an isochrone (the ones closest to the
+        target are kept).
+    max_steps:
+        The maximum number of steps.
+    time_limit:
+        The maximum wall-clock time (in seconds) spent in the search. The search
+        stops after the first step which exceeds it.
+    """
+    deadline = None if time_limit is None else time.perf_counter() + time_limit
+    # A target smaller than the cells cannot be resolved by the isochrones: it is
+    # reached when the route is within half a cell of it, and the route then ends
+    # at its center
+    radius = max(
+        target.radius, 0.5 * utl.distance_on_surface(0.0, 0.0, 0.0, resolution)
+    )
+    nrows = int(np.ceil(180.0 / resolution))
+    visited = np.zeros((nrows, int(np.ceil(360.0 / resolution))), dtype=bool)
+    headings = np.linspace(0, 360, nheadings, endpoint=False).reshape(1, -1)
+
+    lat = np.array([start.latitude], dtype=float)
+    lon = np.array([start.longitude], dtype=float)
+    visited[utl.equal_area_cells(lat, lon, resolution)] = True
+    # The positions and the index of their parent on the previous isochrone
+    history = [(lat, lon, np.zeros(1, dtype=int))]
+    wind_u = np.empty(max_points)
+    wind_v = np.empty(max_points)
+    best = (0, 0)
+    best_dist = np.inf
+
+    for step in range(max_steps):
+        n = len(lat)
+        forecast.sample_many(lat, lon, t + step * dt, wind_u[:n], wind_v[:n])
+        fx, fy = utl.wind_force_many(
+            headings, wind_u[:n].reshape(-1, 1), wind_v[:n].reshape(-1, 1)
+        )
+        parent = np.repeat(np.arange(n), nheadings)
+        start_lat = lat[parent]
+        new_lat, new_lon, dist = utl.march_rays(
+            sea_array,
+            start_lat,
+            lon[parent],
+            utl.lat_degs_from_length(fy.ravel() * dt),
+            utl.lon_degs_from_length(fx.ravel() * dt, start_lat),
+        )
+        remaining = utl.distance_on_surface(
+            new_lon, new_lat, target.longitude, target.latitude
+        )
+        arrived = np.where((remaining < radius) & (dist > 0))[0]
+        if len(arrived) > 0:
+            i = arrived[np.argmin(remaining[arrived])]
+            history.append((new_lat, new_lon, parent))
+            best = (step + 1, i)
+            best_dist = 0.0
+            break
+
+        # Keep the position closest to the target in each new cell
+        keep = utl.prune_isochrone(
+            new_lat, new_lon, remaining, dist > 0, visited, resolution, max_points
+        )
+        if len(keep) == 0:
+            break
+
+        lat, lon = new_lat[keep], new_lon[keep]
+        history.append((lat, lon, parent[keep]))
+        if remaining[keep[0]] < best_dist:
+            best = (step + 1, 0)
+            best_dist = remaining[keep[0]]
+        if (deadline is not None) and (time.perf_counter() > deadline):
+            break
+
+    # Walk back from the best position to the start
+    step, i = best
+    waypoints = []
+    while step > 0:
+        lats, lons, parents = history[step]
+        waypoints.append(Location(latitude=float(lats[i]), longitude=float(lons[i])))
+        i = parents[i]
+        step -= 1
+    waypoints = waypoints[::-1]
+    if (best_dist == 0.0) and (radius > target.radius):
+        waypoints.append(Location(latitude=target.latitude, longitude=target.longitude))
+    return waypoints, t + best[0] * dt
+
+
+def route(
+    start: Location,
+    forecast: WeatherForecast,
+    world_map,
+    checkpoints: Optional[Sequence[Checkpoint]] = None,
+    t: float = 0.0,
+    time_limit: Optional[float] = None,
+    **kwargs,
+) -> List[Location]:
+    """
+    Find a fast route through a sequence of checkpoints, with the isochrone method
+    (see ``isochrones``).
+    The waypoints can be given to the ship one after the other with
+    ``Instructions(location=...)``.
+
+    With the default parameters, a route around the world (two checkpoints and the
+    finish) takes about 30 ms, within the time budget of a bot for one step
+    (``config.bot_time_budget``). Finer searches (e.g. with more headings or
+    points per isochrone) can take longer: set a ``time_limit`` to stay within the
+    budget. The route then stops at the position closest to the next checkpoint
+    which was found in time, and it can be extended at the next steps.
+
+    Parameters
+    ----------
+    start:
+        The starting location.
+    forecast:
+        The weather forecast.
+    world_map:
+        The world map given to the bots (or the game ``Map``).
+    checkpoints:
+        The checkpoints to go through, in order. Defaults to all the checkpoints of
+        the race, followed by the finish line.
+    t:
+        The time (in hours, relative to the start of the forecast) at which the
+        route starts.
+    time_limit:
+        The maximum wall-clock time (in seconds) spent in the search, for all the
+        checkpoints.
+    **kwargs:
+        Additional arguments for ``isochrones``.
+    """
+    if checkpoints is None:
+        checkpoints = [*config.checkpoints, config.start]
+    deadline = None if time_limit is None else time.perf_counter() + time_limit
+    waypoints = []
+    for checkpoint in checkpoints:
+        leg, t = isochrones(
+            start=start,
+            target=checkpoint,
+            forecast=forecast,
+            sea_array=world_map.sea_array,
+            t=t,
+            time_limit=None if deadline is None else deadline - time.perf_counter(),
+            **kwargs,
+        )
+        waypoints.extend(leg)
+        if leg:
+            start = leg[-1]
+        if (deadline is not None) and (time.perf_counter() > deadline):
+            break
+    return waypoints
@@ -1,7 +1,7 @@
 # SPDX-License-Identifier: BSD-3-Clause
 
 import os
-from typing import Dict
+from typing import Dict, List
 
 import numpy as np
 
@@ -66,15 +66,14 @@ def get_player_points(player: Player) -> int:
     return points
 
 
-def get_rankings(players: Dict[str, Player]) -> Dict[str, int]:
+def get_rankings(players: Dict[str, Player]) -> List[str]:
     status = [(get_player_points(player), player.team) for player in players.values()]
     return [team for _, team in sorted(status, reverse=True)]
 
 
-def _get_final_scores(players: Dict[str, Player], scores: Dict[str, int]):
-    rankings = get_rankings(players)
+def _get_final_scores(rankings: List[str], scores: Dict[str, int]):
     # exponential points distribution
-    n = len(players)  # Points for the 1st position
+    n = len(rankings)  # Points for the 1st position
     k = np.log(n) / (n - 1)
     points = n * np.exp(-k * (np.arange(1, n + 1) - 1))
     final_scores = {}
@@ -100,7 +99,7 @@ def _print_scores(
 
 def finalize_scores(players: Dict[str, Player], test: bool = False):
     scores = read_scores(players, test=test)
-    round_scores, final_scores = _get_final_scores(players, scores)
+    round_scores, final_scores = _get_final_scores(get_rankings(players), scores)
     _print_scores(round_scores=round_scores, final_scores=final_scores)
     _write_scores(final_scores)
     return final_scores
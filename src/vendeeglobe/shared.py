@@ -0,0 +1,42 @@
+# SPDX-License-Identifier: BSD-3-Clause
+
+import os
+import uuid
+from pathlib import Path
+from typing import Dict, Mapping, Union
+
+import numpy as np
+
+
+def share_arrays(
+    arrays: Mapping[str, np.ndarray], directory: Union[str, Path]
+) -> Dict[str, Path]:
+    """
+    Store arrays as ``.npy`` files in the given directory, so that other processes
+    can memory-map them with ``attach_arrays`` instead of holding their own copy.
+    Returns the paths to the files.
+
+    The files are written under a temporary name (unique to the call, so that
+    several threads or processes can share the same arrays at once) and then
+    renamed, so that a process never sees a partially written array.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = {}
+    suffix = uuid.uuid4().hex
+    for key, array in arrays.items():
+        path = directory / f"{key}.npy"
+        tmp = directory / f".{key}.{suffix}.npy"
+        np.save(tmp, np.ascontiguousarray(array))
+        os.replace(tmp, path)
+        paths[key] = path
+    return paths
+
+
+def attach_arrays(paths: Mapping[str, Union[str, Path]]) -> Dict[str, np.ndarray]:
+    """
+    Memory-map arrays stored with ``share_arrays``, in read-only mode.
+    The data is only read from disk (or the page cache, which is shared between
+    processes) when it is accessed.
+    """
+    return {key: np.load(path, mmap_mode="r") for key, path in paths.items()}
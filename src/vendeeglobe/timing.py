@@ -0,0 +1,33 @@
+# SPDX-License-Identifier: BSD-3-Clause
+
+import time
+from typing import Dict
+
+# The wall-clock time (in seconds) spent in each stage of the startup, in the order
+# in which the stages first ran. Stages which run several times are accumulated.
+startup_times: Dict[str, float] = {}
+
+
+def record_startup_time(stage: str, elapsed: float):
+    startup_times[stage] = startup_times.get(stage, 0.0) + elapsed
+
+
+def print_done(stage: str, t0: float):
+    """
+    Print the time elapsed since ``t0`` at the end of a startup stage, and record
+    it in ``startup_times``.
+    """
+    elapsed = time.time() - t0
+    record_startup_time(stage, elapsed)
+    print(f"done [{elapsed:.2f} s]")
+
+
+def startup_report() -> str:
+    """
+    A summary of the time spent in each stage of the startup.
+    """
+    lines = ["Startup times:"]
+    for stage, elapsed in startup_times.items():
+        lines.append(f"  {stage}: {elapsed:.2f} s")
+    lines.append(f"  total: {sum(startup_times.values()):.2f} s")
+    return "\n".join(lines)
@@ -0,0 +1,158 @@
+# SPDX-License-Identifier: BSD-3-Clause
+
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .headless import HeadlessEngine, PlayerSummary
+from .map import Map, load_map_data
+from .scores import (
+    _get_final_scores,
+    _print_scores,
+    _write_scores,
+    get_rankings,
+    read_fastest_times,
+    read_scores,
+    write_fastest_times,
+)
+from .shared import attach_arrays, share_arrays
+from .weather import Weather, generate_fields
+
+
+def _share_weather(
+    seed: int, time_limit: float, precision: str, directory: Path
+) -> Dict[str, Path]:
+    """
+    Generate the weather for a race in a worker process, and store it so that it
+    can be memory-mapped by the processes running the race.
+    """
+    return share_arrays(
+        generate_fields(time_limit=time_limit, seed=seed, precision=precision),
+        directory,
+    )
+
+
+def _play_round(
+    bots: list,
+    seed: int,
+    time_limit: float,
+    time_step: float,
+    mapdata: Dict[str, Path],
+    fields: Dict[str, Path],
+) -> Tuple[List[str], Dict[str, PlayerSummary]]:
+    """
+    Play a single headless race in a worker process.
+    The worker builds its own map and weather, on top of read-only memory-mapped
+    arrays.
+    """
+    engine = HeadlessEngine(
+        bots=bots,
+        test=False,
+        time_limit=time_limit,
+        seed=seed,
+        time_step=time_step,
+        game_map=Map(mapdata=attach_arrays(mapdata)),
+        weather=Weather(time_limit=time_limit, seed=seed, fields=attach_arrays(fields)),
+    )
+    summary = engine.simulate()
+    return get_rankings(engine.players), summary
+
+
+def play_tournament(
+    bots: list,
+    rounds: int = 8,
+    seeds: Optional[Sequence[int]] = None,
+    time_limit: float = 8 * 60,
+    time_step: float = 0.05,
+    max_workers: Optional[int] = None,
+    test: bool = False,
+    precision: str = "float64",
+) -> Dict[str, float]:
+    """
+    Play several headless races in parallel, one per process, with a different
+    weather seed for each race.
+    The scores of the rounds are accumulated in the same way as for a single race
+    played with ``play``.
+
+    Parameters
+    ----------
+    bots:
+        The bots taking part in the tournament.
+    rounds:
+        The number of races to play. Ignored if ``seeds`` are supplied.
+    seeds:
+        The weather seeds, one per race. Random seeds are used if not supplied.
+    time_limit:
+        The time limit of each race, in seconds.
+    time_step:
+        The fixed time step of the simulations, in seconds.
+    max_workers:
+        The number of processes to use. Defaults to the number of CPUs.
+    test:
+        If ``True``, start from zero scores instead of reading the scores file.
+    precision:
+        The storage precision of the weather fields (see ``Weather``).
+    """
+    if seeds is None:
+        seeds = np.random.default_rng().integers(2**31, size=rounds).tolist()
+    seeds = list(seeds)
+    teams = [bot.team for bot in bots]
+    scores = read_scores(teams, test=test)
+    fastest_times = read_fastest_times(teams)
+
+    t0 = time.time()
+    nworkers = os.cpu_count() if max_workers is None else max_workers
+    with tempfile.TemporaryDirectory(prefix="vendeeglobe-") as tmp:
+        with ProcessPoolExecutor(max_workers=nworkers) as pool:
+            # The map and the weather of each seed are generated only once, and all
+            # the workers memory-map them instead of holding their own copy.
+            mapdata = share_arrays(load_map_data(), Path(tmp) / "map")
+            # Play the races in batches of one race per worker, so that only the
+            # weather of the races in progress is stored at any given time.
+            for istart in range(0, len(seeds), nworkers):
+                batch = seeds[istart : istart + nworkers]
+                weather = {
+                    seed: pool.submit(
+                        _share_weather,
+                        seed=seed,
+                        time_limit=time_limit,
+                        precision=precision,
+                        directory=Path(tmp) / f"weather-{seed}",
+                    )
+                    for seed in dict.fromkeys(batch)
+                }
+                futures = [
+                    pool.submit(
+                        _play_round,
+                        bots=bots,
+                        seed=seed,
+                        time_limit=time_limit,
+                        time_step=time_step,
+                        mapdata=mapdata,
+                        fields=weather[seed].result(),
+                    )
+                    for seed in batch
+                ]
+                # Merge in the order of the seeds, so that the outcome is reproducible
+                for i, (seed, future) in enumerate(zip(batch, futures), start=istart):
+                    rankings, summary = future.result()
+                    round_scores, scores = _get_final_scores(rankings, scores)
+                    for name, player in summary.items():
+                        fastest_times[name] = min(
+                            player.finish_time, fastest_times[name]
+                        )
+                    print(f"Round {i + 1} (seed={seed}):")
+                    _print_scores(round_scores=round_scores, final_scores=scores)
+                for seed in weather:
+                    shutil.rmtree(Path(tmp) / f"weather-{seed}")
+
+    print(f"Tournament done [{time.time() - t0:.2f} s]")
+    _write_scores(scores)
+    write_fastest_times(fastest_times)
+    return scores
@@ -1,25 +1,179 @@
 # SPDX-License-Identifier: BSD-3-Clause
 
 import hashlib
+import os
 import time
-from typing import Tuple, Union
+from typing import Callable, Tuple, Union
 
-import numba
 import numpy as np
 
 from . import config
 from .core import Location
+from .timing import print_done
+
+try:
+    import numba
+    from numba import types
+except ImportError:
+    numba = None
 
 RADIUS = float(config.map_radius)
 
 
+if numba is not None:
+    # Array types for the signatures of the kernels. The inputs are read-only and
+    # can have any layout, so that e.g. memory-mapped fields and slices are accepted
+    # without copies.
+    def _input(dtype, ndim: int = 1) -> types.Array:
+        return types.Array(dtype, ndim, "A", readonly=True)
+
+    def _output(dtype) -> types.Array:
+        return types.Array(dtype, 1, "A")
+
+    _f8 = types.float64
+    # The storage types of the wind fields (see ``weather.PRECISIONS``)
+    _FIELD_TYPES = (types.float64, types.float32, types.int16)
+    # The types of the sea array (it contains zeros and ones)
+    _SEA_TYPES = (
+        types.int64,
+        types.int32,
+        types.uint8,
+        types.int8,
+        types.boolean,
+    )
+    # The types of the arrays in which the wind is sampled
+    _OUT_TYPES = (types.float64, types.float32)
+
+    # The argument types of the kernels which are compiled for the types of each
+    # call: scalars, and the contiguous arrays used by the engine and the graphics
+    _a1 = types.float64[::1]
+    _a2 = types.float64[:, ::1]
+    _b1 = types.boolean[::1]
+
+    _SIGNATURES = {
+        "to_xyz": [
+            (x, x, gl)
+            for x in (_f8, _a1, _a2)
+            for gl in (types.Omitted(False), types.boolean)
+        ]
+        + [(types.float32[:, ::1], types.float32[:, ::1], types.boolean)],
+        "lat_to_theta": [(x,) for x in (_f8, _a1)],
+        "lon_to_phi": [(x,) for x in (_f8, _a1)],
+        "wrap": [(x, x) for x in (_f8, _a1)],
+        "wind_force": [(_a1, _a1)],
+        "lon_degs_from_length": [(x, x) for x in (_f8, _a1)],
+        "lat_degs_from_length": [(x,) for x in (_f8, _a1)],
+        "distance_on_surface": [(x, x, x, x) for x in (_f8, _a1)]
+        + [(_a1, _a1, _f8, _f8)],
+        "longitude_difference": [(_f8, _f8)],
+        "prune_isochrone": [
+            (_a1, _a1, _a1, _b1, types.boolean[:, ::1], _f8, types.int64)
+        ],
+        "_wind_force_many": [types.void(*[_input(_f8)] * 4, *[_output(_f8)] * 2)],
+        "march_rays": [
+            types.UniTuple(types.float64[::1], 3)(_input(sea, 2), *[_input(_f8)] * 4)
+            for sea in _SEA_TYPES
+        ],
+        "interpolate_uv_into": [
+            types.void(
+                *[_input(field, 3)] * 2,
+                *[_input(_f8)] * 3,
+                *[_f8] * 4,
+                types.boolean,
+                *[_output(out)] * 2,
+            )
+            for field in _FIELD_TYPES
+            for out in _OUT_TYPES
+        ],
+        "interpolate_uv": [
+            types.UniTuple(types.float64[::1], 2)(
+                *[_input(field, 3)] * 2, *[_input(_f8)] * 3, *[_f8] * 4, types.boolean
+            )
+            for field in _FIELD_TYPES
+        ],
+        "sample_uv_into": [
+            types.void(
+                *[_input(field, 3)] * 2,
+                *[_input(_f8)] * 3,
+                *[_f8] * 3,
+                *[_output(out)] * 2,
+            )
+            for field in _FIELD_TYPES
+            for out in _OUT_TYPES
+        ],
+    }
+
+
+# The functions compiled with ``jit``, and whether they have explicit signatures
+_KERNELS = []
+_cache_enabled = False
+_compiled = False
+
+
+def jit(typed: bool = False) -> Callable:
+    """
+    Compile a function with numba.
+
+    The function is compiled (or loaded from the cache) by ``pre_compile`` for its
+    signatures listed in ``_SIGNATURES``, and then for the types of the arguments of
+    each new call which matches none of them. If ``typed`` is ``True``, it instead
+    only accepts arguments which match one of its signatures from then on.
+    Nothing is compiled, and the cache is not touched, when this module is imported:
+    see ``enable_cache`` and ``pre_compile``.
+    If numba is not installed, the function is left as it is (the loop kernels are
+    then replaced by vectorized NumPy versions, see the end of this module).
+    """
+
+    def decorator(func):
+        if numba is None:
+            return func
+        kernel = numba.njit(func)
+        _KERNELS.append((kernel, typed))
+        return kernel
+
+    return decorator
+
+
+def _numba_cache_dir() -> str:
+    """
+    The directory where numba stores the compiled functions: a ``numba`` folder in
+    the vendeeglobe cache, instead of the ``__pycache__`` next to the sources, which
+    is often read-only in installed packages and containers.
+    An empty string (i.e. numba's default) is returned if the folder is not
+    writable.
+    """
+    path = config.cache_dir / "numba"
+    try:
+        path.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        return ""
+    return str(path) if os.access(path, os.W_OK) else ""
+
+
+def enable_cache():
+    """
+    Cache the compiled functions on disk, in the directory given by the
+    ``NUMBA_CACHE_DIR`` environment variable if it is set, or else in the ``numba``
+    folder of the vendeeglobe cache (see ``config.cache_dir``).
+    Only the functions compiled after this call are written to the cache.
+    """
+    global _cache_enabled
+    if (numba is None) or _cache_enabled:
+        return
+    if not numba.config.CACHE_DIR:
+        numba.config.CACHE_DIR = _numba_cache_dir()
+    for kernel, _ in _KERNELS:
+        kernel.enable_caching()
+    _cache_enabled = True
+
+
 def string_to_color(input_string: str) -> str:
     hash_object = hashlib.md5(input_string.encode())
     hex_hash = hash_object.hexdigest()
     return "#" + hex_hash[:6]
 
 
-@numba.njit(cache=True)
+@jit()
 def to_xyz(
     phi: Union[float, np.ndarray],
     theta: Union[float, np.ndarray],
@@ -38,19 +192,19 @@ def to_xyz(
     return xpos, ypos, zpos
 
 
-@numba.njit(cache=True)
+@jit()
 def lat_to_theta(lat: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
     return np.radians(90.0 - lat)
 
 
-@numba.njit(cache=True)
+@jit()
 def lon_to_phi(lon: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
     out = lon % 360.0
     out += 180.0
     return np.radians(out)
 
 
-@numba.njit(cache=True)
+@jit()
 def wrap(
     lat: Union[float, np.ndarray], lon: Union[float, np.ndarray]
 ) -> Tuple[Union[float, np.ndarray], Union[float, np.ndarray]]:
@@ -62,7 +216,7 @@ def wrap(
     return out_lat, out_lon
 
 
-@numba.njit(cache=True)
+@jit()
 def wind_force(ship_vector: np.ndarray, wind: np.ndarray) -> np.ndarray:
     norm = np.linalg.norm(wind)
     vsum = ship_vector + wind / norm
@@ -71,7 +225,71 @@ def wind_force(ship_vector: np.ndarray, wind: np.ndarray) -> np.ndarray:
     return (mag * norm) * ship_vector
 
 
-@numba.njit(cache=True)
+@jit(typed=True)
+def _wind_force_many(
+    headings: np.ndarray,
+    u: np.ndarray,
+    v: np.ndarray,
+    sail: np.ndarray,
+    out_x: np.ndarray,
+    out_y: np.ndarray,
+):
+    for k in range(len(headings)):
+        h = np.radians(headings[k])
+        ship_u = np.cos(h)
+        ship_v = np.sin(h)
+        norm = np.sqrt(u[k] ** 2 + v[k] ** 2)
+        if norm == 0.0:
+            out_x[k] = 0.0
+            out_y[k] = 0.0
+            continue
+        sum_u = ship_u + u[k] / norm
+        sum_v = ship_v + v[k] / norm
+        sum_norm = np.sqrt(sum_u**2 + sum_v**2)
+        mag = 0.0
+        if sum_norm > 0.0:
+            mag = np.abs(ship_u * sum_u + ship_v * sum_v) / sum_norm
+        out_x[k] = sail[k] * mag * norm * ship_u
+        out_y[k] = sail[k] * mag * norm * ship_v
+
+
+def wind_force_many(
+    headings: Union[float, np.ndarray],
+    u: Union[float, np.ndarray],
+    v: Union[float, np.ndarray],
+    sail: Union[float, np.ndarray] = 1.0,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Same as ``wind_force``, for many ships at once: compute the force (i.e. the
+    velocity in km/h) given to ships sailing with the given ``headings`` (in
+    degrees) and ``sail`` (between 0 and 1), by the wind ``u`` and ``v``.
+    The inputs are broadcast against each other, so that e.g. a fan of headings can
+    be evaluated for many winds at once.
+    A wind of zero (or a wind coming from straight ahead) gives no force.
+
+    Returns the horizontal and vertical components of the force.
+    """
+    headings, u, v, sail = np.broadcast_arrays(
+        np.asarray(headings, dtype=float),
+        np.asarray(u, dtype=float),
+        np.asarray(v, dtype=float),
+        np.asarray(sail, dtype=float),
+    )
+    shape = headings.shape
+    out_x = np.empty(shape)
+    out_y = np.empty(shape)
+    _wind_force_many(
+        np.ascontiguousarray(headings).ravel(),
+        np.ascontiguousarray(u).ravel(),
+        np.ascontiguousarray(v).ravel(),
+        np.ascontiguousarray(sail).ravel(),
+        out_x.reshape(-1),
+        out_y.reshape(-1),
+    )
+    return out_x, out_y
+
+
+@jit()
 def lon_degs_from_length(length: np.ndarray, lat: np.ndarray) -> np.ndarray:
     """
     Given a length, compute how many degrees of longitude it represents at a given
@@ -80,7 +298,7 @@ def lon_degs_from_length(length: np.ndarray, lat: np.ndarray) -> np.ndarray:
     return length / ((np.pi * RADIUS * np.cos(np.radians(lat))) / 180.0)
 
 
-@numba.njit(cache=True)
+@jit()
 def lat_degs_from_length(length: np.ndarray) -> np.ndarray:
     """
     Given a length, compute how many degrees of latitude it represents.
@@ -88,7 +306,7 @@ def lat_degs_from_length(length: np.ndarray) -> np.ndarray:
     return length / (2.0 * np.pi * RADIUS) * 360.0
 
 
-@numba.njit(cache=True)
+@jit()
 def distance_on_surface(
     longitude1: float, latitude1: float, longitude2: float, latitude2: float
 ) -> float:
@@ -107,7 +325,7 @@ def distance_on_surface(
     return RADIUS * c
 
 
-@numba.njit(cache=True)
+@jit()
 def longitude_difference(lon1: float, lon2: float) -> float:
     # Calculate the standard difference in longitudes
     lon_diff = lon1 - lon2
@@ -120,6 +338,510 @@ def longitude_difference(lon1: float, lon2: float) -> float:
         return -min(-lon_diff, crossing_diff)
 
 
+@jit()
+def _is_sea(sea_array: np.ndarray, ilat: int, ilon: int) -> bool:
+    """
+    Look up a cell of the sea array, wrapping the indices over the poles and around
+    the globe in the same way as ``wrap``.
+    """
+    nlat, nlon = sea_array.shape
+    if ilat >= nlat:
+        ilat = 2 * nlat - 1 - ilat
+        ilon += nlon // 2
+    elif ilat < 0:
+        ilat = -1 - ilat
+        ilon += nlon // 2
+    return sea_array[ilat, ilon % nlon] != 0
+
+
+@jit(typed=True)
+def march_rays(
+    sea_array: np.ndarray,
+    latitudes: np.ndarray,
+    longitudes: np.ndarray,
+    dlat: np.ndarray,
+    dlon: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Move along straight lines (in latitude/longitude space) from the given positions,
+    by the given increments in degrees, stopping just before the first land cell.
+
+    The rays are traversed one cell of the sea array at a time (DDA grid traversal),
+    so a ray that hits land early exits early.
+    A ray starting on land does not move.
+
+    Returns the final latitudes, longitudes, and the distances travelled (in km).
+    """
+    nlat, nlon = sea_array.shape
+    cell_lat = 180.0 / nlat
+    cell_lon = 360.0 / nlon
+    n = len(latitudes)
+    out_lat = np.empty(n)
+    out_lon = np.empty(n)
+    dist = np.zeros(n)
+    for k in range(n):
+        # Positions and increments in units of cells
+        y = (latitudes[k] + 90.0) / cell_lat
+        x = (longitudes[k] + 180.0) / cell_lon
+        dy = dlat[k] / cell_lat
+        dx = dlon[k] / cell_lon
+        iy = int(np.floor(y))
+        ix = int(np.floor(x))
+        step_y = 1 if dy > 0 else -1
+        step_x = 1 if dx > 0 else -1
+        # Ray parameter at which the next cell boundary is crossed along each axis
+        if dy != 0:
+            t_next_y = ((iy + 1 - y) if dy > 0 else (y - iy)) / abs(dy)
+            t_delta_y = 1.0 / abs(dy)
+        else:
+            t_next_y = np.inf
+            t_delta_y = np.inf
+        if dx != 0:
+            t_next_x = ((ix + 1 - x) if dx > 0 else (x - ix)) / abs(dx)
+            t_delta_x = 1.0 / abs(dx)
+        else:
+            t_next_x = np.inf
+            t_delta_x = np.inf
+
+        t_stop = 1.0
+        if not _is_sea(sea_array, iy, ix):
+            t_stop = 0.0
+        while t_stop > 0.0 and min(t_next_x, t_next_y) < 1.0:
+            if t_next_x < t_next_y:
+                t = t_next_x
+                t_next_x += t_delta_x
+                ix += step_x
+                backoff = 1.0e-6 / abs(dx)
+            else:
+                t = t_next_y
+                t_next_y += t_delta_y
+                iy += step_y
+                backoff = 1.0e-6 / abs(dy)
+            if not _is_sea(sea_array, iy, ix):
+                # Stop just before the cell boundary
+                t_stop = max(t - backoff, 0.0)
+                break
+
+        lat = latitudes[k] + dlat[k] * t_stop
+        lon = longitudes[k] + dlon[k] * t_stop
+        if lat > 90.0:
+            lat = 180.0 - lat
+            lon += 180.0
+        elif lat < -90.0:
+            lat = -180.0 - lat
+            lon += 180.0
+        lon = (lon + 180.0) % 360.0 - 180.0
+        out_lat[k] = lat
+        out_lon[k] = lon
+        if t_stop > 0.0:
+            dist[k] = distance_on_surface(longitudes[k], latitudes[k], lon, lat)
+    return out_lat, out_lon, dist
+
+
+def equal_area_cells(
+    latitudes: np.ndarray, longitudes: np.ndarray, resolution: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Bin positions into cells of roughly equal area on the sphere: the cells are
+    ``resolution`` degrees high, and their width in longitude grows towards the
+    poles so that they keep the same width in kilometers.
+    Returns the row and column indices of the cells.
+    """
+    nrows = int(np.ceil(180.0 / resolution))
+    ilat = np.minimum(((latitudes + 90.0) / resolution).astype(int), nrows - 1)
+    row_lat = -90.0 + (ilat + 0.5) * resolution
+    ncols = np.maximum(
+        (360.0 * np.cos(np.radians(row_lat)) / resolution).astype(int), 1
+    )
+    ilon = np.minimum(((longitudes + 180.0) / 360.0 * ncols).astype(int), ncols - 1)
+    return ilat, ilon
+
+
+@jit()
+def prune_isochrone(
+    latitudes: np.ndarray,
+    longitudes: np.ndarray,
+    remaining: np.ndarray,
+    moved: np.ndarray,
+    visited: np.ndarray,
+    resolution: float,
+    max_points: int,
+) -> np.ndarray:
+    """
+    Select the positions of a new isochrone: the positions which ``moved`` are
+    binned in cells (see ``equal_area_cells``), and only the position with the
+    smallest ``remaining`` distance is kept in each cell which is not yet
+    ``visited``. At most ``max_points`` positions are kept (the ones with the
+    smallest ``remaining`` distance), and their cells are marked as visited.
+
+    Returns the indices of the kept positions, sorted by remaining distance.
+    """
+    nrows, ncols_max = visited.shape
+    n = len(latitudes)
+    rows = np.empty(n, dtype=np.int64)
+    cols = np.empty(n, dtype=np.int64)
+    # The index of the best position in each cell, and the cells that were hit
+    best = np.full(nrows * ncols_max, -1, dtype=np.int64)
+    cells = np.empty(n, dtype=np.int64)
+    ncells = 0
+    for k in range(n):
+        if not moved[k]:
+            continue
+        rows[k] = min(int((latitudes[k] + 90.0) / resolution), nrows - 1)
+        row_lat = -90.0 + (rows[k] + 0.5) * resolution
+        ncols = max(int(360.0 * np.cos(np.radians(row_lat)) / resolution), 1)
+        cols[k] = min(int((longitudes[k] + 180.0) / 360.0 * ncols), ncols - 1)
+        if visited[rows[k], cols[k]]:
+            continue
+        cell = rows[k] * ncols_max + cols[k]
+        if best[cell] < 0:
+            best[cell] = k
+            cells[ncells] = cell
+            ncells += 1
+        elif remaining[k] < remaining[best[cell]]:
+            best[cell] = k
+    keep = best[cells[:ncells]]
+    keep = keep[np.argsort(remaining[keep], kind="mergesort")[:max_points]]
+    for k in keep:
+        visited[rows[k], cols[k]] = True
+    return keep
+
+
+@jit()
+def _bilinear(
+    field: np.ndarray,
+    iz: int,
+    iy0: int,
+    iy1: int,
+    ix0: int,
+    ix1: int,
+    fy: float,
+    fx: float,
+) -> float:
+    return (1.0 - fy) * (
+        (1.0 - fx) * field[iz, iy0, ix0] + fx * field[iz, iy0, ix1]
+    ) + fy * ((1.0 - fx) * field[iz, iy1, ix0] + fx * field[iz, iy1, ix1])
+
+
+@jit(typed=True)
+def interpolate_uv_into(
+    u: np.ndarray,
+    v: np.ndarray,
+    lat: np.ndarray,
+    lon: np.ndarray,
+    t: np.ndarray,
+    dv: float,
+    du: float,
+    dt: float,
+    scale: float,
+    periodic: bool,
+    out_u: np.ndarray,
+    out_v: np.ndarray,
+):
+    """
+    Sample the wind fields ``u`` and ``v`` of shape (nt, ny, nx) at the given
+    latitudes, longitudes and times, with bilinear interpolation in space and linear
+    interpolation in time. The results are written to ``out_u`` and ``out_v``.
+
+    The grid values are located at the centers of the cells.
+    The longitude wraps around the globe, and the latitude is clamped at the poles.
+    If ``periodic`` is ``True``, the time wraps around the time axis, otherwise it
+    is clamped to the first and last time slices.
+    All the values are multiplied by ``scale`` (to dequantize integer fields).
+    """
+    nt, ny, nx = u.shape
+    for k in range(len(lat)):
+        y = (lat[k] + 90.0) / dv - 0.5
+        x = (lon[k] + 180.0) / du - 0.5
+        z = t[k] / dt - 0.5
+        iy = int(np.floor(y))
+        ix = int(np.floor(x))
+        iz = int(np.floor(z))
+        fy = y - iy
+        fx = x - ix
+        fz = z - iz
+        iy0 = min(max(iy, 0), ny - 1)
+        iy1 = min(max(iy + 1, 0), ny - 1)
+        ix0 = ix % nx
+        ix1 = (ix + 1) % nx
+        if periodic:
+            iz0 = iz % nt
+            iz1 = (iz + 1) % nt
+        else:
+            iz0 = min(max(iz, 0), nt - 1)
+            iz1 = min(max(iz + 1, 0), nt - 1)
+        out_u[k] = scale * (
+            (1.0 - fz) * _bilinear(u, iz0, iy0, iy1, ix0, ix1, fy, fx)
+            + fz * _bilinear(u, iz1, iy0, iy1, ix0, ix1, fy, fx)
+        )
+        out_v[k] = scale * (
+            (1.0 - fz) * _bilinear(v, iz0, iy0, iy1, ix0, ix1, fy, fx)
+            + fz * _bilinear(v, iz1, iy0, iy1, ix0, ix1, fy, fx)
+        )
+
+
+@jit(typed=True)
+def interpolate_uv(
+    u: np.ndarray,
+    v: np.ndarray,
+    lat: np.ndarray,
+    lon: np.ndarray,
+    t: np.ndarray,
+    dv: float,
+    du: float,
+    dt: float,
+    scale: float,
+    periodic: bool,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Same as ``interpolate_uv_into``, returning new arrays.
+    """
+    out_u = np.empty(len(lat))
+    out_v = np.empty(len(lat))
+    interpolate_uv_into(u, v, lat, lon, t, dv, du, dt, scale, periodic, out_u, out_v)
+    return out_u, out_v
+
+
+@jit(typed=True)
+def sample_uv_into(
+    u: np.ndarray,
+    v: np.ndarray,
+    lat: np.ndarray,
+    lon: np.ndarray,
+    t: np.ndarray,
+    dv: float,
+    du: float,
+    dt: float,
+    out_u: np.ndarray,
+    out_v: np.ndarray,
+):
+    """
+    Sample the wind fields ``u`` and ``v`` of shape (nt, ny, nx) at the given
+    latitudes, longitudes and times, using the value of the cell each point falls
+    in. The results are written to ``out_u`` and ``out_v``.
+    Points outside of the grid use the nearest cell on the edge of the grid
+    (the longitude wraps around the globe).
+    """
+    nt, ny, nx = u.shape
+    for k in range(len(lat)):
+        iy = min(max(int((lat[k] + 90.0) / dv), 0), ny - 1)
+        ix = int((lon[k] + 180.0) / du) % nx
+        iz = min(max(int(t[k] / dt), 0), nt - 1)
+        out_u[k] = u[iz, iy, ix]
+        out_v[k] = v[iz, iy, ix]
+
+
+# Vectorized NumPy versions of the loop kernels, which are used instead of the
+# kernels when numba is not installed (the loops would be far too slow in Python).
+
+
+def _wind_force_many_numpy(
+    headings: np.ndarray,
+    u: np.ndarray,
+    v: np.ndarray,
+    sail: np.ndarray,
+    out_x: np.ndarray,
+    out_y: np.ndarray,
+):
+    h = np.radians(headings)
+    ship_u = np.cos(h)
+    ship_v = np.sin(h)
+    norm = np.sqrt(u**2 + v**2)
+    calm = norm == 0.0
+    safe_norm = np.where(calm, 1.0, norm)
+    sum_u = ship_u + u / safe_norm
+    sum_v = ship_v + v / safe_norm
+    sum_norm = np.sqrt(sum_u**2 + sum_v**2)
+    head_wind = sum_norm == 0.0
+    mag = np.abs(ship_u * sum_u + ship_v * sum_v) / np.where(head_wind, 1.0, sum_norm)
+    mag[calm | head_wind] = 0.0
+    out_x[:] = sail * mag * norm * ship_u
+    out_y[:] = sail * mag * norm * ship_v
+
+
+def _is_sea_numpy(sea_array: np.ndarray, ilat: np.ndarray, ilon: np.ndarray):
+    nlat, nlon = sea_array.shape
+    above = ilat >= nlat
+    below = ilat < 0
+    ilon = np.where(above | below, ilon + nlon // 2, ilon)
+    ilat = np.where(above, 2 * nlat - 1 - ilat, np.where(below, -1 - ilat, ilat))
+    return sea_array[ilat, ilon % nlon] != 0
+
+
+def _march_rays_numpy(
+    sea_array: np.ndarray,
+    latitudes: np.ndarray,
+    longitudes: np.ndarray,
+    dlat: np.ndarray,
+    dlon: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    nlat, nlon = sea_array.shape
+    cell_lat = 180.0 / nlat
+    cell_lon = 360.0 / nlon
+    y = (latitudes + 90.0) / cell_lat
+    x = (longitudes + 180.0) / cell_lon
+    dy = dlat / cell_lat
+    dx = dlon / cell_lon
+    iy = np.floor(y).astype(int)
+    ix = np.floor(x).astype(int)
+    step_y = np.where(dy > 0, 1, -1)
+    step_x = np.where(dx > 0, 1, -1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t_delta_y = np.where(dy != 0, 1.0 / np.abs(dy), np.inf)
+        t_delta_x = np.where(dx != 0, 1.0 / np.abs(dx), np.inf)
+        t_next_y = np.where(
+            dy != 0, np.where(dy > 0, iy + 1 - y, y - iy) * t_delta_y, np.inf
+        )
+        t_next_x = np.where(
+            dx != 0, np.where(dx > 0, ix + 1 - x, x - ix) * t_delta_x, np.inf
+        )
+
+    t_stop = np.where(_is_sea_numpy(sea_array, iy, ix), 1.0, 0.0)
+    # All the rays advance by one cell at a time, until they hit land or end
+    active = np.where((t_stop > 0.0) & (np.minimum(t_next_x, t_next_y) < 1.0))[0]
+    while len(active) > 0:
+        along_x = t_next_x[active] < t_next_y[active]
+        kx = active[along_x]
+        ky = active[~along_x]
+        t = np.where(along_x, t_next_x[active], t_next_y[active])
+        backoff = np.empty(len(active))
+        backoff[along_x] = 1.0e-6 / np.abs(dx[kx])
+        backoff[~along_x] = 1.0e-6 / np.abs(dy[ky])
+        t_next_x[kx] += t_delta_x[kx]
+        ix[kx] += step_x[kx]
+        t_next_y[ky] += t_delta_y[ky]
+        iy[ky] += step_y[ky]
+        land = ~_is_sea_numpy(sea_array, iy[active], ix[active])
+        t_stop[active[land]] = np.maximum(t[land] - backoff[land], 0.0)
+        active = active[~land]
+        active = active[np.minimum(t_next_x[active], t_next_y[active]) < 1.0]
+
+    lat = latitudes + dlat * t_stop
+    lon = longitudes + dlon * t_stop
+    over_pole = np.abs(lat) > 90.0
+    lat = np.where(lat > 90.0, 180.0 - lat, np.where(lat < -90.0, -180.0 - lat, lat))
+    lon = np.where(over_pole, lon + 180.0, lon)
+    lon = (lon + 180.0) % 360.0 - 180.0
+    dist = np.where(
+        t_stop > 0.0, distance_on_surface(longitudes, latitudes, lon, lat), 0.0
+    )
+    return lat, lon, dist
+
+
+def _interpolate_uv_into_numpy(
+    u: np.ndarray,
+    v: np.ndarray,
+    lat: np.ndarray,
+    lon: np.ndarray,
+    t: np.ndarray,
+    dv: float,
+    du: float,
+    dt: float,
+    scale: float,
+    periodic: bool,
+    out_u: np.ndarray,
+    out_v: np.ndarray,
+):
+    nt, ny, nx = u.shape
+    y = (lat + 90.0) / dv - 0.5
+    x = (lon + 180.0) / du - 0.5
+    z = t / dt - 0.5
+    iy = np.floor(y).astype(int)
+    ix = np.floor(x).astype(int)
+    iz = np.floor(z).astype(int)
+    fy = y - iy
+    fx = x - ix
+    fz = z - iz
+    iy0 = np.clip(iy, 0, ny - 1)
+    iy1 = np.clip(iy + 1, 0, ny - 1)
+    ix0 = ix % nx
+    ix1 = (ix + 1) % nx
+    if periodic:
+        iz0 = iz % nt
+        iz1 = (iz + 1) % nt
+    else:
+        iz0 = np.clip(iz, 0, nt - 1)
+        iz1 = np.clip(iz + 1, 0, nt - 1)
+
+    def bilinear(field, iz):
+        return (1.0 - fy) * (
+            (1.0 - fx) * field[iz, iy0, ix0] + fx * field[iz, iy0, ix1]
+        ) + fy * ((1.0 - fx) * field[iz, iy1, ix0] + fx * field[iz, iy1, ix1])
+
+    for field, out in ((u, out_u), (v, out_v)):
+        out[:] = scale * ((1.0 - fz) * bilinear(field, iz0) + fz * bilinear(field, iz1))
+
+
+def _interpolate_uv_numpy(
+    u: np.ndarray,
+    v: np.ndarray,
+    lat: np.ndarray,
+    lon: np.ndarray,
+    t: np.ndarray,
+    dv: float,
+    du: float,
+    dt: float,
+    scale: float,
+    periodic: bool,
+) -> Tuple[np.ndarray, np.ndarray]:
+    out_u = np.empty(len(lat))
+    out_v = np.empty(len(lat))
+    _interpolate_uv_into_numpy(
+        u, v, lat, lon, t, dv, du, dt, scale, periodic, out_u, out_v
+    )
+    return out_u, out_v
+
+
+def _sample_uv_into_numpy(
+    u: np.ndarray,
+    v: np.ndarray,
+    lat: np.ndarray,
+    lon: np.ndarray,
+    t: np.ndarray,
+    dv: float,
+    du: float,
+    dt: float,
+    out_u: np.ndarray,
+    out_v: np.ndarray,
+):
+    nt, ny, nx = u.shape
+    iy = np.clip(((lat + 90.0) / dv).astype(int), 0, ny - 1)
+    ix = ((lon + 180.0) / du).astype(int) % nx
+    iz = np.clip((t / dt).astype(int), 0, nt - 1)
+    out_u[:] = u[iz, iy, ix]
+    out_v[:] = v[iz, iy, ix]
+
+
+def _prune_isochrone_numpy(
+    latitudes: np.ndarray,
+    longitudes: np.ndarray,
+    remaining: np.ndarray,
+    moved: np.ndarray,
+    visited: np.ndarray,
+    resolution: float,
+    max_points: int,
+) -> np.ndarray:
+    index = np.where(moved)[0]
+    ilat, ilon = equal_area_cells(latitudes[index], longitudes[index], resolution)
+    cells = ilat * visited.shape[1] + ilon
+    order = np.lexsort((remaining[index], cells))
+    _, first = np.unique(cells[order], return_index=True)
+    first = order[first]
+    first = first[~visited[ilat[first], ilon[first]]]
+    first = first[np.argsort(remaining[index[first]], kind="mergesort")[:max_points]]
+    visited[ilat[first], ilon[first]] = True
+    return index[first]
+
+
+if numba is None:
+    _wind_force_many = _wind_force_many_numpy  # noqa: F811
+    march_rays = _march_rays_numpy  # noqa: F811
+    prune_isochrone = _prune_isochrone_numpy  # noqa: F811
+    interpolate_uv_into = _interpolate_uv_into_numpy  # noqa: F811
+    interpolate_uv = _interpolate_uv_numpy  # noqa: F811
+    sample_uv_into = _sample_uv_into_numpy  # noqa: F811
+
+
 def goto(origin: Location, to: Location):
     """
     Find the heading angle (in degrees) for the shortest distance from `origin` to `to`.
@@ -137,18 +859,21 @@ def goto(origin: Location, to: Location):
 
 
 def pre_compile():
+    """
+    Compile the functions for their signatures listed in ``_SIGNATURES``, or load
+    them from the cache (see ``enable_cache``). The kernels compiled with
+    ``jit(typed=True)`` only accept these signatures from then on.
+    """
+    global _compiled
+    if (numba is None) or _compiled:
+        return
     t0 = time.time()
     print('Precompiling utils...', end=' ', flush=True)
-    a = np.zeros(2)
-    b = 0.0
-    for ab in (a, b):
-        to_xyz(ab, ab)
-        lat_to_theta(ab)
-        lon_to_phi(ab)
-        wrap(ab, ab)
-        lon_degs_from_length(ab, ab)
-        lat_degs_from_length(ab)
-        distance_on_surface(ab, ab, ab, ab)
-    wind_force(a, a)
-    longitude_difference(b, b)
-    print(f'done [{time.time() - t0:.2f} s]')
+    enable_cache()
+    for kernel, typed in _KERNELS:
+        for signature in _SIGNATURES.get(kernel.py_func.__name__, []):
+            kernel.compile(signature)
+        if typed:
+            kernel.disable_compile()
+    _compiled = True
+    print_done('jit', t0)
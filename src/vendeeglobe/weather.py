@@ -1,23 +1,116 @@
 # SPDX-License-Identifier: BSD-3-Clause
 
 import time
-from dataclasses import dataclass
-from typing import Optional, Tuple
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Mapping, Optional, Tuple
 
 import numpy as np
-from scipy.ndimage import gaussian_filter, uniform_filter
 
 from . import config
-from .utils import lat_degs_from_length, lon_degs_from_length, wrap
+from .cache import get_or_create
+from .timing import print_done
+from .utils import (
+    interpolate_uv,
+    interpolate_uv_into,
+    lat_degs_from_length,
+    lon_degs_from_length,
+    sample_uv_into,
+    wind_force_many,
+    wrap,
+)
+
+INTERPOLATIONS = ("nearest", "linear")
+
+
+def _interpolate(
+    u: np.ndarray,
+    v: np.ndarray,
+    lat: np.ndarray,
+    lon: np.ndarray,
+    t: np.ndarray,
+    dv: float,
+    du: float,
+    dt: float,
+    scale: Optional[float],
+    periodic: bool,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Broadcast the coordinates against each other, and sample the wind with linear
+    interpolation (see ``utils.interpolate_uv``).
+    """
+    lat, lon, t = np.broadcast_arrays(
+        np.asarray(lat, dtype=float),
+        np.asarray(lon, dtype=float),
+        np.asarray(t, dtype=float),
+    )
+    out_u, out_v = interpolate_uv(
+        u,
+        v,
+        np.ascontiguousarray(lat).ravel(),
+        np.ascontiguousarray(lon).ravel(),
+        np.ascontiguousarray(t).ravel(),
+        dv,
+        du,
+        dt,
+        1.0 if scale is None else float(scale),
+        periodic,
+    )
+    return out_u.reshape(lat.shape), out_v.reshape(lat.shape)
 
 
 @dataclass(frozen=True)
 class WeatherForecast:
+    """
+    The weather forecast given to the bots.
+
+    Calling the forecast (or its ``get_uv`` method) gives the wind at the
+    requested locations and times.
+    For faster queries, the raw forecast grids ``u`` and ``v`` (read-only arrays of
+    shape (nf, ny, nx)) can be used directly, along with the coordinates of the
+    grid cell centers in ``latitudes``, ``longitudes`` and ``times``.
+    The grids always hold wind speeds as floats: when the weather is stored with
+    the ``"int16"`` precision, the forecast is converted back to wind speeds when
+    it is made, so there is no scale factor to apply.
+    """
+
     u: np.ndarray
     v: np.ndarray
     du: float
     dv: float
     dt: float
+    interpolation: str = "nearest"
+    _speed_tables: Dict[Tuple[int, int], np.ndarray] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+
+    def __call__(
+        self, latitudes: np.ndarray, longitudes: np.ndarray, times: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        return self.get_uv(latitudes=latitudes, longitudes=longitudes, times=times)
+
+    @property
+    def latitudes(self) -> np.ndarray:
+        """
+        The latitudes of the centers of the grid cells, in degrees.
+        """
+        return -90.0 + self.dv * (np.arange(self.u.shape[1]) + 0.5)
+
+    @property
+    def longitudes(self) -> np.ndarray:
+        """
+        The longitudes of the centers of the grid cells, in degrees.
+        """
+        return -180.0 + self.du * (np.arange(self.u.shape[2]) + 0.5)
+
+    @property
+    def times(self) -> np.ndarray:
+        """
+        The lead times of the centers of the forecast slices, in hours.
+        The slice ``k`` covers the lead times from ``k * step`` to
+        ``(k + 1) * step``, where ``step`` is the time between two slices.
+        """
+        return (np.arange(self.u.shape[0]) + 0.5) * self.dt * config.seconds_to_hours
 
     def get_uv(
         self, *, latitudes: np.ndarray, longitudes: np.ndarray, times: np.ndarray
@@ -34,6 +127,19 @@ class WeatherForecast:
         times: np.ndarray
             Time in hours.
         """
+        if self.interpolation == "linear":
+            return _interpolate(
+                self.u,
+                self.v,
+                lat=latitudes,
+                lon=longitudes,
+                t=np.asarray(times) / config.seconds_to_hours,
+                dv=self.dv,
+                du=self.du,
+                dt=self.dt,
+                scale=None,
+                periodic=False,
+            )
         iv = ((np.asarray(latitudes) + 90.0) / self.dv).astype(int)
         iu = ((np.asarray(longitudes) + 180.0) / self.du).astype(int)
         it = ((np.asarray(times) / config.seconds_to_hours) / self.dt).astype(int)
@@ -41,44 +147,340 @@ class WeatherForecast:
         v = self.v[it, iv, iu]
         return u, v
 
+    def sample_many(
+        self,
+        latitudes: np.ndarray,
+        longitudes: np.ndarray,
+        times: np.ndarray,
+        out_u: np.ndarray,
+        out_v: np.ndarray,
+    ):
+        """
+        Same as ``get_uv`` for arrays of points, but writing the results into the
+        supplied ``out_u`` and ``out_v`` arrays instead of allocating new ones.
+        Locations outside of the grid (and times outside of the forecast) use the
+        nearest grid values.
 
-class Weather:
-    def __init__(self, time_limit: int, seed: Optional[int] = None):
-        t0 = time.time()
-        print("Generating weather...", end=" ", flush=True)
-        rng = np.random.default_rng(seed)
+        Parameters
+        ----------
+        latitudes: np.ndarray
+            Latitudes in degrees (an array of any shape).
+        longitudes: np.ndarray
+            Longitudes in degrees, with the same shape as ``latitudes``.
+        times: np.ndarray
+            Times in hours (a single time can be used for all points).
+        out_u: np.ndarray
+            The float64 or float32 array receiving the horizontal wind component,
+            with the same shape as ``latitudes``.
+        out_v: np.ndarray
+            The array receiving the vertical wind component, with the same shape
+            and dtype as ``out_u``.
+        """
+        latitudes = np.asarray(latitudes, dtype=float)
+        shape = latitudes.shape
+        longitudes = np.asarray(longitudes, dtype=float)
+        if longitudes.shape != shape:
+            raise ValueError(
+                f"The longitudes have shape {longitudes.shape}, but the latitudes "
+                f"have shape {shape}."
+            )
+        outputs = []
+        for name, out in (("out_u", out_u), ("out_v", out_v)):
+            if (not isinstance(out, np.ndarray)) or (
+                out.dtype not in (np.float64, np.float32)
+            ):
+                raise TypeError(f"{name} must be a float64 or float32 NumPy array.")
+            if out.shape != shape:
+                raise ValueError(
+                    f"{name} has shape {out.shape}, but the latitudes have shape "
+                    f"{shape}."
+                )
+            if (out.ndim > 1) and (not out.flags.c_contiguous):
+                raise ValueError(f"{name} must be C-contiguous.")
+            outputs.append(out.reshape(-1))
+        if out_u.dtype != out_v.dtype:
+            raise TypeError(
+                f"out_u ({out_u.dtype}) and out_v ({out_v.dtype}) must have the same "
+                "dtype."
+            )
+        times = np.broadcast_to(
+            np.asarray(times, dtype=float) / config.seconds_to_hours, shape
+        )
+        args = (self.u, self.v, latitudes.ravel(), longitudes.ravel(), times.ravel())
+        if self.interpolation == "linear":
+            interpolate_uv_into(*args, self.dv, self.du, self.dt, 1.0, False, *outputs)
+        else:
+            sample_uv_into(*args, self.dv, self.du, self.dt, *outputs)
 
-        self.ny = 128
-        self.nx = self.ny * 2
-        self.nt = int(time_limit / config.weather_update_interval)
+    def speed_table(self, it: int, nheadings: int = 36) -> np.ndarray:
+        """
+        Get the speed of a ship (in km/h, with the sails fully out) for a fan of
+        ``nheadings`` headings evenly spaced from 0 to 360 degrees, at every cell of
+        the forecast slice ``it``.
+        The returned read-only array has shape (nheadings, ny, nx).
+        The table is computed the first time it is requested, and then cached.
 
-        self.dt = config.weather_update_interval  # weather changes every 12 hours
+        Parameters
+        ----------
+        it:
+            The index of the forecast lead time (see ``times``).
+        nheadings:
+            The number of headings.
+        """
+        key = (it, nheadings)
+        if key not in self._speed_tables:
+            headings = np.linspace(0, 360, nheadings, endpoint=False)
+            fx, fy = wind_force_many(headings.reshape(-1, 1, 1), self.u[it], self.v[it])
+            table = np.sqrt(fx**2 + fy**2).astype(np.float32)
+            table.setflags(write=False)
+            self._speed_tables[key] = table
+        return self._speed_tables[key]
+
+
+PRECISIONS = ("float64", "float32", "int16")
+
+
+def generate_fields(
+    time_limit: int, seed: Optional[int] = None, precision: str = "float64"
+) -> Dict[str, np.ndarray]:
+    """
+    Generate random wind fields for a race of the given duration.
+    Returns the ``u`` and ``v`` wind components, and their blurred versions used to
+    make the forecasts, stored with the requested precision
+    (see ``convert_fields``).
+    """
+    # Only needed when the fields are not in the cache
+    from scipy.ndimage import gaussian_filter, uniform_filter
+
+    rng = np.random.default_rng(seed)
 
-        nseeds = 300  # 350
-        sigma = 8
+    ny = 128
+    nx = ny * 2
+    nt = int(time_limit / config.weather_update_interval)
 
-        image = np.zeros([self.nt, self.ny, self.nx])
-        dy = self.ny // 6
-        xseed = rng.integers(self.nx, size=nseeds)
-        yseed = rng.integers(dy, self.ny - dy, size=nseeds)
-        tseed = rng.integers(self.nt, size=nseeds)
+    nseeds = 300  # 350
+    sigma = 8
 
-        image[(tseed, yseed, xseed)] = 10000
-        smooth = gaussian_filter(image, sigma=sigma, mode="wrap")
-        normed = smooth / smooth.max()
+    image = np.zeros([nt, ny, nx])
+    dy = ny // 6
+    xseed = rng.integers(nx, size=nseeds)
+    yseed = rng.integers(dy, ny - dy, size=nseeds)
+    tseed = rng.integers(nt, size=nseeds)
 
-        angle = normed * 360.0
-        angle = (angle + 180.0) % 360.0
-        angle *= np.pi / 180.0
-        self.angle = angle
+    image[(tseed, yseed, xseed)] = 10000
+    smooth = gaussian_filter(image, sigma=sigma, mode="wrap")
+    normed = smooth / smooth.max()
 
-        self.u = np.cos(angle)
-        self.v = np.sin(angle)
+    angle = normed * 360.0
+    angle = (angle + 180.0) % 360.0
+    angle *= np.pi / 180.0
 
-        div = np.abs(np.array(sum(np.gradient(normed))))
-        speed = (1.0 - div / div.max()) * 75.0
-        self.u *= speed
-        self.v *= speed
+    u = np.cos(angle)
+    v = np.sin(angle)
+
+    div = np.abs(np.array(sum(np.gradient(normed))))
+    speed = (1.0 - div / div.max()) * 75.0
+    u *= speed
+    v *= speed
+
+    # The forecasts are blends of the wind and a blurred version of it
+    blurred_u = uniform_filter(u, size=30, mode="wrap")
+    blurred_v = uniform_filter(v, size=30, mode="wrap")
+    return convert_fields(
+        {"u": u, "v": v, "blurred_u": blurred_u, "blurred_v": blurred_v},
+        precision=precision,
+    )
+
+
+def convert_fields(
+    fields: Mapping[str, np.ndarray], precision: str
+) -> Dict[str, np.ndarray]:
+    """
+    Convert the wind fields to a storage precision:
+
+    - ``"float64"``: the fields are unchanged
+    - ``"float32"``: the fields are stored as single precision floats
+    - ``"int16"``: the fields are quantized to 16-bit integers. The scale factor to
+      convert them back to wind speeds is stored in the ``"scale"`` entry.
+    """
+    if precision == "float64":
+        return dict(fields)
+    if precision == "float32":
+        return {key: array.astype(np.float32) for key, array in fields.items()}
+    if precision == "int16":
+        vmax = max(np.abs(array).max() for array in fields.values())
+        scale = vmax / np.iinfo(np.int16).max
+        out = {
+            key: np.round(array / scale).astype(np.int16)
+            for key, array in fields.items()
+        }
+        out["scale"] = np.array(scale, dtype=np.float32)
+        return out
+    raise ValueError(f"Unknown precision {precision}, must be one of {PRECISIONS}.")
+
+
+def _cache_params(time_limit: int, seed: int, precision: str) -> Dict[str, Any]:
+    """
+    All the parameters that affect the generated wind fields.
+    """
+    return {
+        "seed": int(seed),
+        "time_limit": float(time_limit),
+        "precision": precision,
+        "weather_update_interval": config.weather_update_interval,
+        "forecast_length": config.forecast_length,
+    }
+
+
+def _forecast_times() -> np.ndarray:
+    return np.arange(0, config.forecast_length * 6, config.weather_update_interval)
+
+
+class ForecastProvider:
+    """
+    Make weather forecasts on demand.
+
+    The forecast for a lead time is a blend of the wind and its blurred version:
+    the further in the future, the more blurred the forecast.
+    Only the slices needed for the requested forecast window are computed, and the
+    most recently requested windows are kept in a small cache.
+
+    Parameters
+    ----------
+    u:
+        The horizontal wind component, of shape (nt, ny, nx).
+    v:
+        The vertical wind component, of shape (nt, ny, nx).
+    blurred_u:
+        The blurred horizontal wind component.
+    blurred_v:
+        The blurred vertical wind component.
+    scale:
+        The scale factor for quantized fields (``None`` if the fields are floats).
+    cache_size:
+        The number of forecast windows to keep in the cache.
+    """
+
+    def __init__(
+        self,
+        u: np.ndarray,
+        v: np.ndarray,
+        blurred_u: np.ndarray,
+        blurred_v: np.ndarray,
+        scale: Optional[float] = None,
+        cache_size: int = 4,
+    ):
+        self.u = u
+        self.v = v
+        self.blurred_u = blurred_u
+        self.blurred_v = blurred_v
+        self.scale = scale
+        self.cache_size = cache_size
+        self.nt = u.shape[0]
+        self.dt = config.weather_update_interval
+        self.times = _forecast_times()
+        nf = len(self.times)
+        dtype = np.float64 if u.dtype == np.float64 else np.float32
+        self.coeffs_a = np.linspace(0, 1, nf, dtype=dtype).reshape((nf, 1, 1))
+        self.coeffs_b = np.linspace(1, 0, nf, dtype=dtype).reshape((nf, 1, 1))
+        self._cache = OrderedDict()
+
+    def get_window(self, t: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the forecast ``u`` and ``v`` over all lead times, starting at time ``t``
+        (in seconds). The returned arrays have shape (nf, ny, nx).
+        """
+        it = ((t + self.times) / self.dt).astype(int) % self.nt
+        key = tuple(it)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+        u = self.coeffs_b * self.u[it] + self.coeffs_a * self.blurred_u[it]
+        v = self.coeffs_b * self.v[it] + self.coeffs_a * self.blurred_v[it]
+        if self.scale is not None:
+            u *= self.scale
+            v *= self.scale
+        u.setflags(write=False)
+        v.setflags(write=False)
+        self._cache[key] = (u, v)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return u, v
+
+
+class Weather:
+    """
+    The wind fields of a race.
+
+    Parameters
+    ----------
+    time_limit:
+        The duration of the race, in seconds.
+    seed:
+        The seed used to generate the random wind fields. It is kept in ``seed``,
+        so that a race can be recorded with the seed of its weather.
+    fields:
+        Pre-computed wind fields (as returned by ``generate_fields``), e.g. arrays
+        shared between processes. If supplied, ``time_limit`` is ignored, and
+        ``seed`` should be the seed the fields were generated with.
+    cache:
+        If ``True`` and a ``seed`` is supplied, the wind fields are stored in (and
+        loaded from) the on-disk cache in ``config.cache_dir``.
+    precision:
+        The storage precision of the wind fields: ``"float64"``, ``"float32"`` or
+        ``"int16"`` (quantized). Wind values are always returned as floats.
+        Ignored if ``fields`` are supplied.
+    interpolation:
+        How the wind is sampled: ``"nearest"`` uses the value of the grid cell (and
+        time slice) containing the requested point, ``"linear"`` interpolates
+        bilinearly in space and linearly in time.
+    """
+
+    def __init__(
+        self,
+        time_limit: int,
+        seed: Optional[int] = None,
+        fields: Optional[Mapping[str, np.ndarray]] = None,
+        cache: bool = True,
+        precision: str = "float64",
+        interpolation: str = "nearest",
+    ):
+        if interpolation not in INTERPOLATIONS:
+            raise ValueError(
+                f"Unknown interpolation {interpolation}, must be one of "
+                f"{INTERPOLATIONS}."
+            )
+        self.interpolation = interpolation
+        self.seed = seed
+        if fields is None:
+            t0 = time.time()
+            print("Generating weather...", end=" ", flush=True)
+            if cache and (seed is not None):
+                fields = get_or_create(
+                    "weather",
+                    params=_cache_params(
+                        time_limit=time_limit, seed=seed, precision=precision
+                    ),
+                    create=lambda: generate_fields(
+                        time_limit=time_limit, seed=seed, precision=precision
+                    ),
+                )
+            else:
+                fields = generate_fields(
+                    time_limit=time_limit, seed=seed, precision=precision
+                )
+            print_done("weather", t0)
+
+        self.u = fields["u"]
+        self.v = fields["v"]
+        self.blurred_u = fields["blurred_u"]
+        self.blurred_v = fields["blurred_v"]
+        self.scale = None
+        if "scale" in fields:
+            self.scale = np.float32(fields["scale"].item())
+        self.nt, self.ny, self.nx = self.u.shape
+
+        self.dt = config.weather_update_interval  # weather changes every 12 hours
 
         lat_min = -90
         lat_max = 90
@@ -90,88 +492,126 @@ class Weather:
         size = (config.tracer_lifetime, config.ntracers)
         self.tracer_lat = np.random.uniform(-89.9, 89.9, size=size)
         self.tracer_lon = np.random.uniform(-180, 180, size=size)
+        # The tracer positions are stored in a ring buffer: the newest positions
+        # are in the row ``tracer_head``, and the older ones in the following rows
+        self.tracer_head = 0
+        # The colors of the tracers, from the newest to the oldest positions
         self.tracer_colors = np.ones(self.tracer_lat.shape + (4,))
         self.tracer_colors[..., 3] = np.linspace(1, 0, 50).reshape((-1, 1))
 
         self.number_of_new_tracers = 5
         self.new_tracer_counter = 0
 
-        # Make forecast data
-        self.forecast_times = np.arange(
-            0, config.forecast_length * 6, config.weather_update_interval
-        )
-        nf = len(self.forecast_times)
-
-        blurred_u = uniform_filter(self.u, size=30, mode="wrap")
-        blurred_v = uniform_filter(self.v, size=30, mode="wrap")
-        coeffs_a = np.linspace(0, 1, nf)
-        coeffs_b = np.linspace(1, 0, nf)
-        shape = self.u.shape + (1,)
-        u_r = self.u.reshape(shape)
-        v_r = self.v.reshape(shape)
-        bu_r = blurred_u.reshape(shape)
-        bv_r = blurred_v.reshape(shape)
-
-        self.forecast_u = np.transpose(
-            coeffs_b * u_r + coeffs_a * bu_r, axes=[3, 0, 1, 2]
-        )
-        self.forecast_v = np.transpose(
-            coeffs_b * v_r + coeffs_a * bv_r, axes=[3, 0, 1, 2]
+        self.forecast_times = _forecast_times()
+        self.forecasts = ForecastProvider(
+            u=self.u,
+            v=self.v,
+            blurred_u=self.blurred_u,
+            blurred_v=self.blurred_v,
+            scale=self.scale,
         )
 
         self.u.setflags(write=False)
         self.v.setflags(write=False)
-        self.forecast_u.setflags(write=False)
-        self.forecast_v.setflags(write=False)
-        print(f"done [{time.time() - t0:.2f} s]")
+        self.blurred_u.setflags(write=False)
+        self.blurred_v.setflags(write=False)
+
+    @property
+    def fields(self) -> Dict[str, np.ndarray]:
+        """
+        The wind fields, which can be used to create an identical ``Weather``.
+        """
+        fields = {
+            "u": self.u,
+            "v": self.v,
+            "blurred_u": self.blurred_u,
+            "blurred_v": self.blurred_v,
+        }
+        if self.scale is not None:
+            fields["scale"] = np.array(self.scale)
+        return fields
 
     def get_forecast(self, t: float) -> WeatherForecast:
-        t = t + self.forecast_times
-        it = (t / self.dt).astype(int) % self.nt
-        ik = np.arange(len(t))
+        u, v = self.forecasts.get_window(t)
         return WeatherForecast(
-            u=self.forecast_u[ik, it, ...],
-            v=self.forecast_v[ik, it, ...],
+            u=u,
+            v=v,
             du=self.du,
             dv=self.dv,
             dt=self.dt,
+            interpolation=self.interpolation,
         )
 
     def get_uv(
         self, lat: np.ndarray, lon: np.ndarray, t: np.ndarray
     ) -> Tuple[np.ndarray, np.ndarray]:
+        if self.interpolation == "linear":
+            return _interpolate(
+                self.u,
+                self.v,
+                lat=lat,
+                lon=lon,
+                t=t,
+                dv=self.dv,
+                du=self.du,
+                dt=self.dt,
+                scale=self.scale,
+                periodic=True,
+            )
         iv = ((lat + 90.0) / self.dv).astype(int)
         iu = ((lon + 180.0) / self.du).astype(int)
         it = (t / self.dt).astype(int) % self.nt
         u = self.u[it, iv, iu]
         v = self.v[it, iv, iu]
+        if self.scale is not None:
+            u = u * self.scale
+            v = v * self.scale
         return u, v
 
-    def update_wind_tracers(self, t: float, dt: float, speedup: Optional[float]):
-        self.tracer_lat = np.roll(self.tracer_lat, 1, axis=0)
-        self.tracer_lon = np.roll(self.tracer_lon, 1, axis=0)
+    def update_wind_tracers(
+        self,
+        t: float,
+        dt: float,
+        speedup: Optional[float],
+        ntracers: Optional[int] = None,
+    ):
+        """
+        Advect the newest tracer positions with the wind, and store the result in
+        place of the oldest positions, which becomes the new head of the ring
+        buffer.
+
+        Only the first ``ntracers`` tracers are advected (all of them by default).
+        The other ones stay where they are until they are used again.
+        """
+        previous = self.tracer_head
+        head = (previous - 1) % config.tracer_lifetime
+        self.tracer_head = head
+        if ntracers is None:
+            ntracers = config.ntracers
+        self.tracer_lat[head, ntracers:] = self.tracer_lat[previous, ntracers:]
+        self.tracer_lon[head, ntracers:] = self.tracer_lon[previous, ntracers:]
+        lat = self.tracer_lat[previous, :ntracers]
+        lon = self.tracer_lon[previous, :ntracers]
 
-        u, v = self.get_uv(self.tracer_lat[1, :], self.tracer_lon[1, :], t)
+        u, v = self.get_uv(lat, lon, t)
 
         scaling = 1.0
         if speedup is not None:
             scaling /= speedup
         incr_x = u * dt * scaling
         incr_y = v * dt * scaling
-        incr_lon = lon_degs_from_length(incr_x, self.tracer_lat[1, :])
+        incr_lon = lon_degs_from_length(incr_x, lat)
         incr_lat = lat_degs_from_length(incr_y)
 
-        self.tracer_lat[0, :], self.tracer_lon[0, :] = wrap(
-            lat=self.tracer_lat[1, :] + incr_lat, lon=self.tracer_lon[1, :] + incr_lon
+        self.tracer_lat[head, :ntracers], self.tracer_lon[head, :ntracers] = wrap(
+            lat=lat + incr_lat, lon=lon + incr_lon
         )
 
         # Randomly replace tracers
         new_lat = np.random.uniform(-89.9, 89.9, size=(self.number_of_new_tracers,))
         new_lon = np.random.uniform(-180, 180, size=(self.number_of_new_tracers,))
-        istart = self.new_tracer_counter
-        iend = self.new_tracer_counter + self.number_of_new_tracers
-        self.tracer_lat[0, istart:iend] = new_lat
-        self.tracer_lon[0, istart:iend] = new_lon
-        self.new_tracer_counter = (
-            self.new_tracer_counter + self.number_of_new_tracers
-        ) % config.ntracers
+        istart = self.new_tracer_counter % ntracers
+        iend = min(istart + self.number_of_new_tracers, ntracers)
+        self.tracer_lat[head, istart:iend] = new_lat[: iend - istart]
+        self.tracer_lon[head, istart:iend] = new_lon[: iend - istart]
+        self.new_tracer_counter = iend % ntracers
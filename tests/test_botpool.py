@@ -0,0 +1,222 @@
+# SPDX-License-Identifier: BSD-3-Clause
+
+import os
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from vendeeglobe import Heading, Instructions
+from vendeeglobe.botpool import BotPool
+from vendeeglobe.weather import WeatherForecast
+
+WORLD_MAP = SimpleNamespace(sea_array=np.ones((18, 36), dtype=np.uint8))
+
+
+class Bot:
+    """
+    A bot which points the ship to the heading given by the time of the step.
+    """
+
+    def __init__(self, team):
+        self.team = team
+        self.calls = 0
+
+    def work(self):
+        pass
+
+    def run(
+        self, t, dt, longitude, latitude, heading, speed, vector, forecast, world_map
+    ):
+        self.calls += 1
+        assert forecast.u.shape == (2, 3, 4)
+        assert world_map.sea_array.shape == (18, 36)
+        self.work()
+        return Instructions(heading=Heading(angle=float(t)))
+
+
+class SleepyBot(Bot):
+    """
+    Sleeps (without using any CPU time) through its first step.
+    """
+
+    def work(self):
+        if self.calls == 1:
+            time.sleep(1.0)
+
+
+class BusyBot(Bot):
+    """
+    Uses more CPU time than the budget at every step.
+    """
+
+    def work(self):
+        t0 = time.process_time()
+        while time.process_time() - t0 < 0.15:
+            pass
+
+
+class CrashingBot(Bot):
+    def work(self):
+        raise ValueError("Oops")
+
+
+class DyingBot(Bot):
+    """
+    Kills its own worker process at its second step.
+    """
+
+    def work(self):
+        if self.calls == 2:
+            os._exit(1)
+
+
+def _forecast():
+    return WeatherForecast(
+        u=np.zeros((2, 3, 4)), v=np.ones((2, 3, 4)), du=90.0, dv=60.0, dt=6.0
+    )
+
+
+def _state(t):
+    return {
+        "t": t,
+        "dt": 1.0,
+        "longitude": 0.0,
+        "latitude": 0.0,
+        "heading": 180.0,
+        "speed": 0.0,
+        "vector": np.array([-1.0, 0.0]),
+    }
+
+
+@pytest.fixture
+def make_pool():
+    pools = []
+
+    def make(bots, budget=0.1, wall_budget=0.5):
+        pool = BotPool(
+            bots={bot.team: bot for bot in bots},
+            world_map=WORLD_MAP,
+            budget=budget,
+            wall_budget=wall_budget,
+        )
+        pools.append(pool)
+        return pool
+
+    yield make
+    for pool in pools:
+        pool.close()
+
+
+def _run(pool, t, forecast, safe=True):
+    return pool.run(
+        states={team: _state(t) for team in pool.stats}, forecast=forecast, safe=safe
+    )
+
+
+def _headings(instructions):
+    # The bots which failed have no instructions
+    return {
+        team: instr.heading.angle
+        for team, instr in instructions.items()
+        if instr is not None
+    }
+
+
+def test_pool_returns_instructions_of_all_bots(make_pool):
+    pool = make_pool([Bot("a"), Bot("b")])
+    forecast = _forecast()
+    for t in range(3):
+        assert _headings(_run(pool, t, forecast)) == {"a": t, "b": t}
+    for stats in pool.stats.values():
+        assert stats.calls == 3
+        assert stats.timeouts == stats.errors == 0
+        assert not stats.dead
+
+
+def test_pool_drops_late_replies(make_pool):
+    pool = make_pool([Bot("a"), SleepyBot("sleepy")], wall_budget=0.2)
+    forecast = _forecast()
+    # The first step times out
+    assert _headings(_run(pool, 1, forecast)) == {"a": 1}
+    # The bot is still busy with the first step: it is not sent the second one
+    assert _headings(_run(pool, 2, forecast)) == {"a": 2}
+    assert pool.stats["sleepy"].timeouts == 2
+    time.sleep(1.0)
+    # The late reply to the first step is discarded, and the bot is back in time
+    assert _headings(_run(pool, 3, forecast)) == {"a": 3, "sleepy": 3}
+    assert pool.stats["sleepy"].timeouts == 2
+    assert pool.stats["sleepy"].calls == 2
+    assert pool.stats["a"].timeouts == 0
+
+
+def test_pool_enforces_cpu_time_budget(make_pool):
+    # The bot replies before the wall-clock deadline, but uses too much CPU time
+    pool = make_pool([Bot("a"), BusyBot("busy")], budget=0.1, wall_budget=2.0)
+    forecast = _forecast()
+    assert _headings(_run(pool, 1, forecast)) == {"a": 1}
+    assert pool.stats["busy"].calls == 1
+    assert pool.stats["busy"].timeouts == 1
+    assert pool.stats["busy"].max_time >= 0.15
+    # A larger budget lets the bot through
+    pool.budget = 1.0
+    assert _headings(_run(pool, 2, forecast)) == {"a": 2, "busy": 2}
+
+
+def test_pool_records_errors(make_pool):
+    pool = make_pool([Bot("a"), CrashingBot("crash")])
+    forecast = _forecast()
+    assert _headings(_run(pool, 1, forecast)) == {"a": 1}
+    assert pool.stats["crash"].errors == 1
+    assert not pool.stats["crash"].dead
+    with pytest.raises(RuntimeError, match="Oops"):
+        _run(pool, 2, forecast, safe=False)
+
+
+def test_pool_survives_a_worker_which_dies(make_pool):
+    pool = make_pool([Bot("a"), DyingBot("dying")])
+    forecast = _forecast()
+    assert _headings(_run(pool, 1, forecast)) == {"a": 1, "dying": 1}
+    assert _headings(_run(pool, 2, forecast)) == {"a": 2}
+    for t in (3, 4):
+        assert _headings(_run(pool, t, forecast)) == {"a": t}
+    assert pool.stats["dying"].dead
+    assert pool.stats["dying"].errors == 1
+    assert pool.stats["a"].calls == 4
+
+
+def test_pool_survives_a_killed_worker(make_pool):
+    pool = make_pool([Bot("a"), Bot("killed")])
+    forecast = _forecast()
+    assert _headings(_run(pool, 1, forecast)) == {"a": 1, "killed": 1}
+    process = pool._processes["killed"]
+    process.kill()
+    process.join()
+    for t in (2, 3):
+        assert _headings(_run(pool, t, forecast)) == {"a": t}
+    assert pool.stats["killed"].dead
+    assert pool.stats["killed"].errors == 1
+
+
+def test_pool_sends_new_forecasts(make_pool):
+    pool = make_pool([Bot("a")])
+    _run(pool, 1, _forecast())
+    _run(pool, 2, _forecast())
+    # Only the forecast before the previous one is removed from the shared directory
+    assert len(list(pool._forecast_dir.iterdir())) == 4
+    _run(pool, 3, _forecast())
+    assert len(list(pool._forecast_dir.iterdir())) == 4
+    pool.close()
+    assert not pool._forecast_dir.exists()
+
+
+def test_default_wall_budget_scales_with_bots_per_core():
+    bots = [Bot(str(i)) for i in range(2 * (os.cpu_count() or 1))]
+    pool = BotPool(
+        bots={bot.team: bot for bot in bots}, world_map=WORLD_MAP, budget=0.05
+    )
+    try:
+        assert pool.wall_budget == pytest.approx(0.1)
+    finally:
+        pool.close()
@@ -0,0 +1,87 @@
+# SPDX-License-Identifier: BSD-3-Clause
+
+import os
+
+import numpy as np
+import pytest
+
+from vendeeglobe import cache, config
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    # The config is frozen, so that the game code cannot change it by mistake
+    old = config.cache_dir, config.max_cache_size
+    object.__setattr__(config, "cache_dir", tmp_path / "cache")
+    yield config.cache_dir
+    object.__setattr__(config, "cache_dir", old[0])
+    object.__setattr__(config, "max_cache_size", old[1])
+
+
+class Counter:
+    def __init__(self, size=100):
+        self.calls = 0
+        self.size = size
+
+    def __call__(self):
+        self.calls += 1
+        return {"a": np.arange(self.size, dtype=np.float64)}
+
+
+def test_get_or_create_miss_then_hit(cache_dir):
+    create = Counter()
+    first = cache.get_or_create("test", {"n": 1}, create)
+    second = cache.get_or_create("test", {"n": 1}, create)
+    assert create.calls == 1
+    for arrays in (first, second):
+        assert not arrays["a"].flags.writeable
+        np.testing.assert_array_equal(arrays["a"], np.arange(100.0))
+
+
+def test_different_parameters_are_different_entries(cache_dir):
+    create = Counter()
+    cache.get_or_create("test", {"n": 1}, create)
+    cache.get_or_create("test", {"n": 2}, create)
+    cache.get_or_create("other", {"n": 1}, create)
+    assert create.calls == 3
+    assert cache.load("test", {"n": 3}) is None
+
+
+def test_corrupt_marker_is_a_miss(cache_dir):
+    create = Counter()
+    cache.get_or_create("test", {"n": 1}, create)
+    entry = cache_dir / "test" / cache.cache_key("test", {"n": 1})
+    (entry / cache._COMPLETE).write_text("{not json")
+    assert cache.load("test", {"n": 1}) is None
+    arrays = cache.get_or_create("test", {"n": 1}, create)
+    assert create.calls == 2
+    np.testing.assert_array_equal(arrays["a"], np.arange(100.0))
+
+
+def test_missing_array_is_a_miss(cache_dir):
+    cache.get_or_create("test", {"n": 1}, Counter())
+    entry = cache_dir / "test" / cache.cache_key("test", {"n": 1})
+    (entry / "a.npy").unlink()
+    assert cache.load("test", {"n": 1}) is None
+
+
+def test_eviction_removes_least_recently_used(cache_dir):
+    for n in range(3):
+        cache.get_or_create("test", {"n": n}, Counter())
+        entry = cache_dir / "test" / cache.cache_key("test", {"n": n})
+        os.utime(entry / cache._COMPLETE, (n, n))
+    # Room for three entries, but not four
+    object.__setattr__(config, "max_cache_size", int(3.5 * cache._entry_size(entry)))
+    # Use the oldest entry, so that the second one becomes the least recently used
+    assert cache.load("test", {"n": 0}) is not None
+    cache.get_or_create("test", {"n": 3}, Counter())
+    assert cache.load("test", {"n": 1}) is None
+    for n in (0, 2, 3):
+        assert cache.load("test", {"n": n}) is not None
+
+
+def test_eviction_keeps_the_new_entry(cache_dir):
+    object.__setattr__(config, "max_cache_size", 10)
+    arrays = cache.get_or_create("test", {"n": 1}, Counter())
+    np.testing.assert_array_equal(arrays["a"], np.arange(100.0))
+    assert len(list((cache_dir / "test").iterdir())) == 1
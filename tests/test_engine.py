@@ -0,0 +1,59 @@
+# SPDX-License-Identifier: BSD-3-Clause
+
+import numpy as np
+import pytest
+
+from vendeeglobe.player import PlayerFleet
+
+engine = pytest.importorskip("vendeeglobe.engine")
+
+TEAMS = ["Alice", "Bob"]
+
+
+def _snapshot(fleet, t):
+    return engine.Snapshot(
+        time=t,
+        clock_time=t,
+        accumulator=0.0,
+        finished=False,
+        previous_latitude=fleet.latitude.copy(),
+        previous_longitude=fleet.longitude.copy(),
+        **{
+            name: getattr(fleet, name).copy()
+            for name in (
+                "latitude",
+                "longitude",
+                "heading",
+                "sail",
+                "speed",
+                "distance_travelled",
+                "bonus",
+                "arrived",
+                "reached",
+            )
+        },
+    )
+
+
+def test_snapshot_view_reuses_players():
+    fleet = PlayerFleet(teams=TEAMS)
+    view = engine.SnapshotView(_snapshot(fleet, 0.0), TEAMS)
+    players = dict(view.players)
+    assert list(players) == TEAMS
+    assert players["Bob"].latitude == fleet.latitude[1]
+
+    start = fleet.latitude.copy()
+    fleet.latitude[:] = [10.0, 20.0]
+    fleet.distance_travelled[:] = [100.0, 200.0]
+    fleet.reached[1, 0] = True
+    old = view.snapshot
+    view.snapshot = _snapshot(fleet, 1.0)
+    # The same players, showing the new snapshot
+    assert all(view.players[team] is players[team] for team in TEAMS)
+    assert players["Alice"].latitude == 10.0
+    assert players["Bob"].distance_travelled == 200.0
+    assert players["Bob"].checkpoints[0].reached
+    assert not players["Alice"].checkpoints[0].reached
+    # The previous snapshot is not modified
+    np.testing.assert_array_equal(old.latitude, start)
+    assert not old.reached.any()
@@ -0,0 +1,42 @@
+# SPDX-License-Identifier: BSD-3-Clause
+
+import numpy as np
+import pytest
+
+graphics = pytest.importorskip("vendeeglobe.graphics")
+
+
+def _state(track):
+    return track.size, track.stride, track.skipped, track.positions.copy()
+
+
+@pytest.mark.parametrize("capacity", [1, 2, 7, 16])
+@pytest.mark.parametrize("seed", range(4))
+def test_track_extend_matches_repeated_append(capacity, seed):
+    rng = np.random.default_rng(seed)
+    points = rng.random((500, 3)).astype(np.float32)
+    appended = graphics.TrackBuffer(capacity=capacity)
+    extended = graphics.TrackBuffer(capacity=capacity)
+    start = 0
+    while start < len(points):
+        # Chunks of various lengths, including empty ones and ones longer than the
+        # capacity
+        stop = start + int(rng.integers(0, 3 * capacity + 3))
+        chunk = points[start:stop]
+        for point in chunk:
+            appended.append(point)
+        extended.extend(chunk)
+        size, stride, skipped, positions = _state(appended)
+        assert _state(extended)[:3] == (size, stride, skipped)
+        np.testing.assert_array_equal(extended.positions, positions)
+        start = stop
+
+
+def test_track_keeps_evenly_spaced_points_and_the_latest_one():
+    track = graphics.TrackBuffer(capacity=8)
+    points = np.arange(21.0)[:, None].repeat(3, axis=1).astype(np.float32)
+    track.extend(points)
+    assert track.stride == 4
+    np.testing.assert_array_equal(track.positions[:, 0], [0, 4, 8, 12, 16, 20])
+    track.append(np.full(3, 21.0, dtype=np.float32))
+    np.testing.assert_array_equal(track.positions[:, 0], [0, 4, 8, 12, 16, 20, 21])
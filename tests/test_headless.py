@@ -0,0 +1,148 @@
+# SPDX-License-Identifier: BSD-3-Clause
+
+import numpy as np
+import pytest
+
+from vendeeglobe import Heading, Instructions, config
+from vendeeglobe.headless import HeadlessEngine
+from vendeeglobe.map import Map
+from vendeeglobe.recorder import read_meta
+from vendeeglobe.utils import pre_compile
+from vendeeglobe.weather import Weather
+
+pytest.importorskip("numba")
+pytest.importorskip("scipy")
+
+
+class Bot:
+    def __init__(self, team, angle):
+        self.team = team
+        self.angle = angle
+
+    def run(self, **kwargs):
+        return Instructions(heading=Heading(angle=self.angle))
+
+
+@pytest.fixture(scope="module", autouse=True)
+def cache_dir(tmp_path_factory):
+    """
+    Store the weather of the races in a temporary cache. The kernels are compiled
+    first, so that they are still cached in the usual place.
+    """
+    pre_compile()
+    old = config.cache_dir
+    object.__setattr__(config, "cache_dir", tmp_path_factory.mktemp("cache"))
+    yield config.cache_dir
+    object.__setattr__(config, "cache_dir", old)
+
+
+@pytest.fixture(scope="module")
+def game_map():
+    # The open sea, with a continent in the middle of the Pacific
+    sea = np.ones((180, 360), dtype=np.uint8)
+    sea[60:120, 20:60] = 0
+    return Map(
+        mapdata={
+            "array": np.zeros((180, 360, 4), dtype=np.uint8),
+            "sea_array": sea,
+            "high_contrast_texture": np.zeros((180, 360, 4), dtype=np.uint8),
+        }
+    )
+
+
+@pytest.mark.parametrize("dispatch", ["serial", "threads"])
+def test_race_without_bots(game_map, dispatch):
+    engine = HeadlessEngine(
+        bots=[], game_map=game_map, seed=1, time_limit=6, dispatch=dispatch
+    )
+    try:
+        assert engine.simulate() == {}
+    finally:
+        engine.close()
+
+
+@pytest.mark.parametrize("dispatch", ["serial", "threads"])
+def test_dispatch_modes_give_the_same_race(game_map, dispatch):
+    bots = [Bot("west", 180.0), Bot("south", 270.0), Bot("north-east", 45.0)]
+    engine = HeadlessEngine(
+        bots=bots, game_map=game_map, seed=1, time_limit=6, dispatch=dispatch
+    )
+    try:
+        summary = engine.simulate()
+    finally:
+        engine.close()
+    reference = HeadlessEngine(bots=bots, game_map=game_map, seed=1, time_limit=6)
+    assert summary == reference.simulate()
+    assert all(player.distance_travelled > 0 for player in summary.values())
+
+
+def test_recorded_race_can_be_read_back(game_map, tmp_path):
+    RaceLog = pytest.importorskip("vendeeglobe.replay").RaceLog
+    bots = [Bot("west", 180.0), Bot("north-east", 45.0)]
+    engine = HeadlessEngine(
+        bots=bots, game_map=game_map, time_limit=6, record=tmp_path / "race"
+    )
+    # The state of the fleet after each step
+    states = {0.0: (engine.fleet.latitude.copy(), engine.fleet.longitude.copy())}
+    engine.initialize_time()
+    while not engine.finished:
+        engine.advance(engine.time_step)
+        states[engine.current_time] = (
+            engine.fleet.latitude.copy(),
+            engine.fleet.longitude.copy(),
+        )
+    engine.recorder.flush()
+
+    log = RaceLog(tmp_path / "race")
+    assert log.teams == ["west", "north-east"]
+    assert log.meta["seed"] is not None
+    assert log.nframes == pytest.approx(6 / 0.1, abs=1)
+    for i, t in enumerate(log.time):
+        lat, lon = states[min(states, key=lambda s: abs(s - t))]
+        np.testing.assert_allclose(log.get("latitude", i), lat, atol=1e-4)
+        np.testing.assert_allclose(log.get("longitude", i), lon, atol=1e-4)
+    engine.close()
+
+    # The weather can be generated again from the log
+    weather = Weather(
+        seed=log.meta["seed"],
+        time_limit=log.meta["time_limit"],
+        precision=log.meta["precision"],
+    )
+    np.testing.assert_array_equal(weather.u, engine.weather.u)
+
+
+def test_simulate_flushes_the_race_log(game_map, tmp_path):
+    RaceLog = pytest.importorskip("vendeeglobe.replay").RaceLog
+    engine = HeadlessEngine(
+        bots=[Bot("west", 180.0)],
+        game_map=game_map,
+        time_limit=6,
+        record=tmp_path / "race",
+    )
+    engine.simulate()
+    # Before the engine is closed
+    assert RaceLog(tmp_path / "race").nframes == pytest.approx(6 / 0.1, abs=1)
+    engine.close()
+
+
+def test_recording_with_a_supplied_weather_uses_its_seed(game_map, tmp_path):
+    weather = Weather(seed=3, time_limit=6, precision="float32")
+    engine = HeadlessEngine(
+        bots=[], game_map=game_map, weather=weather, record=tmp_path / "a"
+    )
+    engine.close()
+    meta = read_meta(tmp_path / "a")
+    assert meta["seed"] == 3
+    assert meta["precision"] == "float32"
+
+    unknown = Weather(time_limit=6, fields=weather.fields)
+    with pytest.raises(ValueError, match="seed"):
+        HeadlessEngine(
+            bots=[], game_map=game_map, weather=unknown, record=tmp_path / "b"
+        )
+    engine = HeadlessEngine(
+        bots=[], game_map=game_map, weather=unknown, seed=3, record=tmp_path / "c"
+    )
+    engine.close()
+    assert read_meta(tmp_path / "c")["seed"] == 3
@@ -0,0 +1,97 @@
+# SPDX-License-Identifier: BSD-3-Clause
+
+import pickle
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from vendeeglobe import config
+from vendeeglobe import map as map_module
+from vendeeglobe.map import create_distance_to_land
+
+pytest.importorskip("scipy")
+
+
+def _haversine(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = (
+        np.sin(0.5 * (lat2 - lat1)) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin(0.5 * (lon2 - lon1)) ** 2
+    )
+    return 2.0 * config.map_radius * np.arcsin(np.sqrt(a))
+
+
+def _brute_force(sea):
+    nlat, nlon = sea.shape
+    lat = np.linspace(-90 + 90 / nlat, 90 - 90 / nlat, nlat)
+    lon = np.linspace(-180 + 180 / nlon, 180 - 180 / nlon, nlon)
+    lat, lon = np.meshgrid(lat, lon, indexing="ij")
+    expected = np.zeros(sea.shape)
+    for mask, sign in ((sea, 1.0), (~sea, -1.0)):
+        other = ~mask
+        for i, j in zip(*np.where(mask)):
+            expected[i, j] = sign * np.min(
+                _haversine(lat[i, j], lon[i, j], lat[other], lon[other])
+            )
+    return expected
+
+
+def test_distance_to_land_matches_brute_force():
+    rng = np.random.default_rng(3)
+    sea = np.ones((36, 72), dtype=bool)
+    # A few rectangular islands, including one across the date line and one
+    # around the North pole
+    for _ in range(6):
+        i, j = rng.integers(0, 36), rng.integers(0, 72)
+        sea[i : i + 4, j : j + 6] = False
+    sea[10:14, -3:] = False
+    sea[10:14, :3] = False
+    sea[-2:, :] = False
+    distance = create_distance_to_land(sea.astype(np.uint8))
+    assert distance.dtype == np.float32
+    np.testing.assert_allclose(distance, _brute_force(sea), rtol=1e-4, atol=1e-2)
+
+
+def test_distance_to_land_is_zero_without_land():
+    sea = np.ones((18, 36), dtype=np.uint8)
+    np.testing.assert_array_equal(create_distance_to_land(sea), 0.0)
+
+
+def _synthetic_map():
+    sea = np.ones((18, 36), dtype=np.uint8)
+    sea[5:10, 10:20] = 0
+    return map_module.Map(
+        mapdata={
+            "array": np.zeros((18, 36, 4), dtype=np.uint8),
+            "sea_array": sea,
+            "high_contrast_texture": np.zeros((18, 36, 4), dtype=np.uint8),
+        }
+    )
+
+
+def test_distance_field_is_loaded_once_by_concurrent_threads(monkeypatch):
+    game_map = _synthetic_map()
+    calls = []
+
+    def load(sea_array):
+        calls.append(threading.get_ident())
+        time.sleep(0.1)
+        return create_distance_to_land(sea_array)
+
+    monkeypatch.setattr(map_module, "load_distance_to_land", load)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        fields = list(executor.map(lambda _: game_map.distance_field, range(8)))
+    assert len(calls) == 1
+    assert all(field is fields[0] for field in fields)
+
+
+def test_map_can_be_pickled():
+    # The world map is sent to the bot worker processes
+    game_map = _synthetic_map()
+    world_map = pickle.loads(pickle.dumps(game_map.world_map))
+    np.testing.assert_array_equal(world_map.sea_array, game_map.sea_array)
+    assert world_map(latitudes=-30.0, longitudes=-70.0) == 0
+    assert world_map.distance_to_land(latitudes=-30.0, longitudes=-70.0) < 0.0
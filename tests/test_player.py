@@ -0,0 +1,101 @@
+# SPDX-License-Identifier: BSD-3-Clause
+
+from types import SimpleNamespace
+
+import numpy as np
+
+from vendeeglobe import config
+from vendeeglobe import utils as utl
+from vendeeglobe.core import Location
+from vendeeglobe.player import PlayerFleet
+
+# A map without land, so that the ships are never stopped by the coast
+OPEN_SEA = SimpleNamespace(sea_array=np.ones((180, 360), dtype=np.uint8))
+
+
+def _move_one(lat, lon, heading, sail, u, v, dt):
+    """
+    Move a single ship, as the player did before the fleet existed.
+    """
+    h = np.radians(heading)
+    vec = utl.wind_force(np.array([np.cos(h), np.sin(h)]), np.array([u, v]))
+    f = vec * dt * sail
+    new_lat, new_lon = utl.wrap(
+        lat=lat + utl.lat_degs_from_length(f[1]),
+        lon=lon + utl.lon_degs_from_length(f[0], lat),
+    )
+    return float(new_lat), float(new_lon), float(np.linalg.norm(vec))
+
+
+def _make_fleet(n, seed=0):
+    rng = np.random.default_rng(seed)
+    fleet = PlayerFleet(teams=[f"team{i}" for i in range(n)])
+    fleet.latitude[:] = rng.uniform(-60.0, 60.0, n)
+    fleet.longitude[:] = rng.uniform(-180.0, 180.0, n)
+    fleet.heading[:] = rng.uniform(0.0, 360.0, n)
+    fleet.sail[:] = rng.uniform(0.2, 1.0, n)
+    u = rng.normal(0.0, 10.0, n)
+    v = rng.normal(0.0, 10.0, n)
+    return fleet, u, v
+
+
+def test_fleet_move_matches_per_player_loop():
+    fleet, u, v = _make_fleet(20)
+    fleet.arrived[3] = True
+    before = [
+        (p.latitude, p.longitude, p.heading, p.sail) for p in fleet.players.values()
+    ]
+    fleet.move(OPEN_SEA, u, v, dt=1.0)
+    for i, player in enumerate(fleet.players.values()):
+        lat, lon, heading, sail = before[i]
+        if i == 3:
+            assert (player.latitude, player.longitude) == (lat, lon)
+            continue
+        exp_lat, exp_lon, exp_speed = _move_one(
+            lat, lon, heading, sail, u[i], v[i], 1.0
+        )
+        assert np.isclose(player.latitude, exp_lat, atol=1e-6)
+        assert np.isclose(player.longitude, exp_lon, atol=1e-6)
+        assert np.isclose(player.speed, exp_speed)
+        assert np.isclose(
+            player.distance_travelled,
+            utl.distance_on_surface(lon, lat, exp_lon, exp_lat),
+            rtol=1e-6,
+        )
+
+
+def test_update_checkpoints_matches_per_player_loop():
+    fleet, _, _ = _make_fleet(len(config.checkpoints) + 2)
+    for i, checkpoint in enumerate(config.checkpoints):
+        fleet.latitude[i] = checkpoint.latitude
+        fleet.longitude[i] = checkpoint.longitude
+    expected = np.array(
+        [
+            [
+                utl.distance_on_surface(
+                    p.longitude, p.latitude, ch.longitude, ch.latitude
+                )
+                < ch.radius
+                for ch in config.checkpoints
+            ]
+            for p in fleet.players.values()
+        ]
+    )
+    assert expected.any()
+    np.testing.assert_array_equal(fleet.update_checkpoints(), expected)
+    np.testing.assert_array_equal(fleet.reached, expected)
+    # Checkpoints are only reported once
+    assert not fleet.update_checkpoints().any()
+
+
+def test_player_views_write_through_to_fleet():
+    fleet = PlayerFleet(teams=["a", "b"], start=Location(longitude=1.0, latitude=2.0))
+    player = fleet.players["b"]
+    player.heading = 45.0
+    player.checkpoints[1].reached = True
+    assert fleet.heading[1] == 45.0
+    assert fleet.reached[1, 1]
+    assert not fleet.reached[0].any()
+    fleet.reached[1, 0] = True
+    assert player.checkpoints[0].reached
+    assert (player.latitude, player.longitude) == (2.0, 1.0)
@@ -0,0 +1,114 @@
+# SPDX-License-Identifier: BSD-3-Clause
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from vendeeglobe import config
+from vendeeglobe.player import PlayerFleet
+from vendeeglobe.recorder import FINISH, RaceRecorder
+
+replay = pytest.importorskip("vendeeglobe.replay")
+
+TEAMS = ["Alice", "Bob", "Carol"]
+
+
+def _frame(rng):
+    return SimpleNamespace(
+        latitude=rng.uniform(-80.0, 80.0, len(TEAMS)),
+        longitude=rng.uniform(-180.0, 180.0, len(TEAMS)),
+        heading=rng.uniform(0.0, 360.0, len(TEAMS)),
+        sail=rng.uniform(0.0, 1.0, len(TEAMS)),
+        speed=rng.uniform(0.0, 30.0, len(TEAMS)),
+        distance_travelled=rng.uniform(0.0, 1e4, len(TEAMS)),
+    )
+
+
+@pytest.fixture
+def race(tmp_path):
+    """
+    Record a race of 25 frames, with a small chunk size so that the frames are
+    written in several chunks.
+    """
+    rng = np.random.default_rng(5)
+    recorder = RaceRecorder(
+        tmp_path / "race", teams=TEAMS, seed=42, interval=1.0, chunk_size=4
+    )
+    frames = []
+    times = []
+    for i in range(50):
+        t = 0.5 * i
+        frame = _frame(rng)
+        if t >= recorder.next_time:
+            frames.append(frame)
+            times.append(t)
+        recorder.record(t, frame)
+    recorder.record_event(3.0, player=1, checkpoint=0)
+    recorder.record_event(7.0, player=1, checkpoint=1)
+    recorder.record_event(9.0, player=1, checkpoint=FINISH)
+    recorder.record_event(11.0, player=2, checkpoint=1)
+    recorder.close()
+    return tmp_path / "race", np.array(times), frames
+
+
+TOLERANCES = {
+    "latitude": 1e-4,
+    "longitude": 1e-4,
+    "heading": 360.0 / 65536,
+    "sail": 1.0 / 255,
+    "speed": 0.02,
+    "distance_travelled": 1e-3,
+}
+
+
+def test_race_log_reads_recorded_frames(race):
+    directory, times, frames = race
+    log = replay.RaceLog(directory)
+    assert log.teams == TEAMS
+    assert log.meta["seed"] == 42
+    assert log.nframes == len(frames) == 25
+    np.testing.assert_array_equal(log.time, times)
+    for name, tol in TOLERANCES.items():
+        expected = np.array([getattr(frame, name) for frame in frames])
+        np.testing.assert_allclose(log.get(name, slice(None)), expected, atol=tol)
+        np.testing.assert_allclose(log.get(name, 7), expected[7], atol=tol)
+    assert len(log.events) == 4
+
+
+def test_race_log_frame_index(race):
+    log = replay.RaceLog(race[0])
+    assert log.frame_index(-1.0) == 0
+    assert log.frame_index(0.0) == 0
+    assert log.frame_index(4.9) == 4
+    assert log.frame_index(5.0) == 5
+    assert log.frame_index(1e6) == log.nframes - 1
+
+
+def test_race_log_without_frames_is_an_error(tmp_path):
+    RaceRecorder(tmp_path, teams=TEAMS, seed=1).close()
+    with pytest.raises(ValueError):
+        replay.RaceLog(tmp_path)
+
+
+def test_replay_reconstructs_frames(race):
+    directory, times, frames = race
+    # Only the reconstruction of the state of the ships, without the map, the
+    # weather and the graphics
+    player = replay.Replay.__new__(replay.Replay)
+    player.log = replay.RaceLog(directory)
+    player.fleet = PlayerFleet(teams=TEAMS)
+    for i in (10, 3, 24, 0):
+        player.set_frame(i)
+        assert player.frame == i
+        for name, tol in TOLERANCES.items():
+            np.testing.assert_allclose(
+                getattr(player.fleet, name), getattr(frames[i], name), atol=tol
+            )
+        t = times[i]
+        reached = np.zeros((len(TEAMS), len(config.checkpoints)), dtype=bool)
+        reached[1, 0] = t >= 3.0
+        reached[1, 1] = t >= 7.0
+        reached[2, 1] = t >= 11.0
+        np.testing.assert_array_equal(player.fleet.reached, reached)
+        np.testing.assert_array_equal(player.fleet.arrived, [False, t >= 9.0, False])
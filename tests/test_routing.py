@@ -0,0 +1,118 @@
+# SPDX-License-Identifier: BSD-3-Clause
+
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from vendeeglobe import config, routing
+from vendeeglobe.core import Checkpoint, Location
+from vendeeglobe.weather import WeatherForecast
+
+pytest.importorskip("numba")
+
+# The resolution of the game map, in degrees
+RESOLUTION = 0.2
+
+
+@pytest.fixture(scope="module")
+def world_map():
+    # A wall of land between 0 and 2 degrees East, from 40 degrees South to
+    # 40 degrees North
+    sea = np.ones((int(180 / RESOLUTION), int(360 / RESOLUTION)), dtype=np.uint8)
+    sea[int(50 / RESOLUTION) : int(130 / RESOLUTION), 900:910] = 0
+    sea.setflags(write=False)
+    return SimpleNamespace(sea_array=sea)
+
+
+@pytest.fixture(scope="module")
+def forecast():
+    shape = (40, 64, 128)
+    return WeatherForecast(
+        u=np.full(shape, 30.0),
+        v=np.full(shape, 15.0),
+        du=360 / 128,
+        dv=180 / 64,
+        dt=3.0,
+    )
+
+
+def _on_sea(sea_array, lat, lon):
+    ilat = ((np.asarray(lat) + 90.0) / RESOLUTION).astype(int)
+    ilon = ((np.asarray(lon) + 180.0) / RESOLUTION).astype(int)
+    return sea_array[ilat, ilon] != 0
+
+
+def _assert_avoids_land(sea_array, start, waypoints):
+    points = [start, *waypoints]
+    for a, b in zip(points[:-1], points[1:]):
+        # The ships move in straight lines in latitude and longitude
+        f = np.linspace(0.0, 1.0, 200)
+        lat = a.latitude + f * (b.latitude - a.latitude)
+        lon = a.longitude + f * (b.longitude - a.longitude)
+        assert _on_sea(sea_array, lat, lon).all()
+
+
+def test_leg_goes_around_land_within_the_bot_budget(world_map, forecast):
+    start = Location(latitude=0.0, longitude=-10.0)
+    target = Checkpoint(latitude=0.0, longitude=10.0, radius=100.0)
+    args = dict(
+        start=start, target=target, forecast=forecast, sea_array=world_map.sea_array
+    )
+    routing.isochrones(**args)
+    elapsed = []
+    for _ in range(5):
+        t0 = time.perf_counter()
+        waypoints, arrival = routing.isochrones(**args)
+        elapsed.append(time.perf_counter() - t0)
+    assert min(elapsed) < 0.5 * config.bot_time_budget
+
+    end = waypoints[-1]
+    assert (end.latitude, end.longitude) == (target.latitude, target.longitude)
+    # The route must go around the wall, beyond 40 degrees of latitude
+    assert max(abs(w.latitude) for w in waypoints) > 40.0
+    _assert_avoids_land(world_map.sea_array, start, waypoints)
+    assert arrival > 0.0
+
+
+def test_route_through_checkpoints_avoids_land(world_map, forecast):
+    start = Location(latitude=-20.0, longitude=-30.0)
+    checkpoints = [
+        Checkpoint(latitude=20.0, longitude=30.0, radius=200.0),
+        Checkpoint(latitude=-50.0, longitude=60.0, radius=200.0),
+        Checkpoint(latitude=-20.0, longitude=-30.0, radius=5.0),
+    ]
+    waypoints = routing.route(
+        start=start, forecast=forecast, world_map=world_map, checkpoints=checkpoints
+    )
+    _assert_avoids_land(world_map.sea_array, start, waypoints)
+    # Every checkpoint is reached, in order
+    i = 0
+    for checkpoint in checkpoints:
+        while (
+            routing.utl.distance_on_surface(
+                waypoints[i].longitude,
+                waypoints[i].latitude,
+                checkpoint.longitude,
+                checkpoint.latitude,
+            )
+            > checkpoint.radius
+        ):
+            i += 1
+    assert i == len(waypoints) - 1
+
+
+def test_time_limit_stops_the_search(world_map, forecast):
+    start = Location(latitude=0.0, longitude=-10.0)
+    target = Checkpoint(latitude=0.0, longitude=10.0, radius=100.0)
+    waypoints, _ = routing.isochrones(
+        start=start,
+        target=target,
+        forecast=forecast,
+        sea_array=world_map.sea_array,
+        time_limit=0.0,
+    )
+    # A single step, towards the target
+    assert len(waypoints) == 1
+    _assert_avoids_land(world_map.sea_array, start, waypoints)
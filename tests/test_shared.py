@@ -0,0 +1,58 @@
+# SPDX-License-Identifier: BSD-3-Clause
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from vendeeglobe.shared import attach_arrays, share_arrays
+
+
+def _arrays():
+    rng = np.random.default_rng(0)
+    return {
+        "sea": (rng.random((18, 36)) > 0.5).astype(np.uint8),
+        "u": rng.random((4, 18, 36)).astype(np.float32),
+        # Not contiguous: share_arrays must still store the values
+        "v": rng.random((36, 18))[::2].T,
+    }
+
+
+def test_attach_arrays_returns_identical_arrays(tmp_path):
+    arrays = _arrays()
+    paths = share_arrays(arrays, tmp_path / "shared")
+    assert set(paths) == set(arrays)
+    attached = attach_arrays(paths)
+    for key, array in arrays.items():
+        assert attached[key].dtype == array.dtype
+        np.testing.assert_array_equal(attached[key], array)
+
+
+def test_attach_arrays_returns_read_only_memory_maps(tmp_path):
+    attached = attach_arrays(share_arrays(_arrays(), tmp_path))
+    for array in attached.values():
+        assert isinstance(array, np.memmap)
+        assert not array.flags.writeable
+        with pytest.raises(ValueError):
+            array[0] = 0
+
+
+def test_share_arrays_replaces_previous_arrays_and_leaves_no_temporary_files(
+    tmp_path,
+):
+    share_arrays({"a": np.zeros(3)}, tmp_path)
+    paths = share_arrays({"a": np.arange(5.0)}, tmp_path)
+    np.testing.assert_array_equal(attach_arrays(paths)["a"], np.arange(5.0))
+    assert [p.name for p in tmp_path.iterdir()] == ["a.npy"]
+
+
+def test_share_arrays_from_concurrent_threads(tmp_path):
+    arrays = _arrays()
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        all_paths = list(
+            executor.map(lambda _: share_arrays(arrays, tmp_path), range(32))
+        )
+    for paths in all_paths:
+        for key, array in attach_arrays(paths).items():
+            np.testing.assert_array_equal(array, arrays[key])
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["sea.npy", "u.npy", "v.npy"]
@@ -0,0 +1,171 @@
+# SPDX-License-Identifier: BSD-3-Clause
+
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Optional
+
+import pytest
+
+# The bot API must be importable without the engines, the JIT compiler or the GUI
+# stack (see benchmarks/startup.py)
+HEAVY_MODULES = (
+    "numba",
+    "scipy",
+    "PIL",
+    "vendeeglobe.engine",
+    "vendeeglobe.headless",
+    "vendeeglobe.graphics",
+    "PyQt5",
+    "PySide2",
+    "pyqtgraph",
+    "OpenGL",
+    "matplotlib",
+)
+API_BUDGET = 0.5
+
+API = """
+import json, sys, time
+t0 = time.perf_counter()
+from vendeeglobe import Instructions, Location
+elapsed = time.perf_counter() - t0
+print(json.dumps({
+    "import": elapsed,
+    "modules": [m for m in %r if m in sys.modules],
+}))
+"""
+
+
+GUI_MODULES = ("PyQt5", "PySide2", "pyqtgraph", "OpenGL", "matplotlib")
+HEADLESS_BUDGET = 3.0
+
+HEADLESS = """
+import json, sys, time
+t0 = time.perf_counter()
+import vendeeglobe as vg
+from vendeeglobe.timing import startup_times
+import numpy as np
+from vendeeglobe import config
+from vendeeglobe.map import Map
+
+
+class Bot:
+    team = "bot"
+
+    def run(self, **kwargs):
+        return vg.Instructions()
+
+
+game_map = None
+if not (config.resourcedir / "mapdata.npz").exists():
+    # The map is not installed: use a map of the same size, without land
+    game_map = Map(mapdata={
+        "array": np.zeros((900, 1800, 4), dtype=np.uint8),
+        "sea_array": np.ones((900, 1800), dtype=np.uint8),
+        "high_contrast_texture": np.zeros((900, 1800, 4), dtype=np.uint8),
+    })
+engine = vg.HeadlessEngine(bots=[Bot()], seed=42, game_map=game_map)
+elapsed = time.perf_counter() - t0
+print(json.dumps({
+    "times": {**startup_times, "total": elapsed},
+    "modules": [m for m in %r if m in sys.modules],
+}))
+"""
+
+
+# A race with bots which use the routing, after which the functions compiled with
+# ``utils.jit`` must not have gained any signature
+RACE = """
+import json
+import numpy as np
+import vendeeglobe as vg
+from vendeeglobe import routing, utils
+from vendeeglobe.map import Map
+
+
+class Bot:
+    team = "bot"
+
+    def run(self, longitude, latitude, forecast, world_map, **kwargs):
+        start = vg.Location(longitude=longitude, latitude=latitude)
+        waypoints = routing.route(start, forecast, world_map, time_limit=0.2)
+        return vg.Instructions(location=waypoints[0] if waypoints else None)
+
+
+game_map = Map(mapdata={
+    "array": np.zeros((900, 1800, 4), dtype=np.uint8),
+    "sea_array": np.ones((900, 1800), dtype=np.uint8),
+    "high_contrast_texture": np.zeros((900, 1800, 4), dtype=np.uint8),
+})
+engine = vg.HeadlessEngine(bots=[Bot(), Bot()], seed=3, game_map=game_map, time_limit=12)
+before = {kernel: len(kernel.signatures) for kernel, _ in utils._KERNELS}
+engine.simulate()
+print(json.dumps({
+    kernel.py_func.__name__: [str(s) for s in kernel.signatures[n:]]
+    for kernel, n in before.items() if len(kernel.signatures) > n
+}))
+"""
+
+
+def _run(code: str, env: Optional[dict] = None) -> dict:
+    # Make the package importable in the subprocess, without importing it here
+    package = Path(importlib.util.find_spec("vendeeglobe").origin).parent
+    env = dict(os.environ, **(env or {}))
+    env["PYTHONPATH"] = os.pathsep.join(
+        [str(package.parent), *filter(None, [env.get("PYTHONPATH")])]
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    # The engines print their progress: the results are on the last line
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def _import_api() -> dict:
+    return _run(API % (HEAVY_MODULES,))
+
+
+def test_import_api_is_light():
+    # The first import may have to compile the modules to bytecode
+    _import_api()
+    result = _import_api()
+    assert result["modules"] == []
+    assert result["import"] < API_BUDGET
+
+
+def test_import_headless_engine_without_gui():
+    result = _run(
+        "import json, sys\n"
+        "import vendeeglobe.headless\n"
+        f"print(json.dumps([m for m in {GUI_MODULES!r} if m in sys.modules]))"
+    )
+    assert result == []
+
+
+@pytest.fixture(scope="module")
+def warm_cache(tmp_path_factory) -> dict:
+    env = {"VENDEEGLOBE_CACHE_DIR": str(tmp_path_factory.mktemp("cache"))}
+    # The first run fills the JIT and weather caches
+    _run(HEADLESS % (GUI_MODULES,), env=env)
+    return env
+
+
+@pytest.mark.slow
+def test_headless_engine_startup_with_warm_caches(warm_cache):
+    result = _run(HEADLESS % (GUI_MODULES,), env=warm_cache)
+    assert result["modules"] == []
+    times = result["times"]
+    assert {"jit", "weather", "map", "players"} <= set(times)
+    assert times["total"] < HEADLESS_BUDGET, times
+
+
+@pytest.mark.slow
+def test_race_only_uses_precompiled_kernels(warm_cache):
+    assert _run(RACE, env=warm_cache) == {}
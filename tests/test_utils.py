@@ -0,0 +1,233 @@
+# SPDX-License-Identifier: BSD-3-Clause
+
+import numpy as np
+import pytest
+
+from vendeeglobe import utils as utl
+
+
+def _sea(nlat=180, nlon=360):
+    return np.ones((nlat, nlon), dtype=np.uint8)
+
+
+def _march(sea_array, lat, lon, dlat, dlon):
+    return utl.march_rays(
+        sea_array,
+        np.array([lat], dtype=float),
+        np.array([lon], dtype=float),
+        np.array([dlat], dtype=float),
+        np.array([dlon], dtype=float),
+    )
+
+
+def test_march_rays_open_sea_moves_all_the_way():
+    lat, lon, dist = _march(_sea(), 10.2, 20.3, 1.5, -2.5)
+    assert np.isclose(lat[0], 11.7)
+    assert np.isclose(lon[0], 17.8)
+    assert np.isclose(dist[0], utl.distance_on_surface(20.3, 10.2, 17.8, 11.7))
+
+
+def test_march_rays_stops_before_land():
+    sea = _sea()
+    # Land between 25 and 26 degrees East
+    sea[:, 205] = 0
+    lat, lon, dist = _march(sea, 0.5, 20.5, 0.0, 10.0)
+    assert lat[0] == 0.5
+    assert 24.99 < lon[0] < 25.0
+    assert np.isclose(dist[0], utl.distance_on_surface(20.5, 0.5, lon[0], 0.5))
+
+
+def test_march_rays_does_not_move_from_land():
+    sea = _sea()
+    sea[90, 180] = 0
+    lat, lon, dist = _march(sea, 0.5, 0.5, 3.0, 3.0)
+    assert (lat[0], lon[0], dist[0]) == (0.5, 0.5, 0.0)
+
+
+def test_march_rays_wraps_across_the_date_line():
+    sea = _sea()
+    lat, lon, _ = _march(sea, 0.5, 179.5, 0.0, 1.0)
+    assert np.isclose(lon[0], -179.5)
+    # Land between -178 and -177 degrees, on the other side of the date line
+    sea[:, 2] = 0
+    lat, lon, _ = _march(sea, 0.5, 179.5, 0.0, 5.0)
+    assert -178.01 < lon[0] < -178.0
+
+
+def test_march_rays_wraps_across_the_poles():
+    sea = _sea()
+    lat, lon, _ = _march(sea, 89.5, 0.5, 1.0, 0.0)
+    assert np.isclose(lat[0], 89.5)
+    assert np.isclose(lon[0], -179.5)
+    # Land between 88 and 89 degrees North, on the other side of the North pole
+    sea[178, 0] = 0
+    lat, lon, _ = _march(sea, 89.5, 0.5, 2.0, 0.0)
+    assert 89.0 < lat[0] < 89.01
+    assert np.isclose(lon[0], -179.5)
+    # And across the South pole
+    lat, lon, _ = _march(sea, -89.5, 0.5, -1.0, 0.0)
+    assert np.isclose(lat[0], -89.5)
+    assert np.isclose(lon[0], -179.5)
+
+
+@pytest.mark.parametrize("dtype", [bool, np.int8, np.uint8, np.int32, np.int64])
+def test_march_rays_matches_numpy_version(dtype):
+    rng = np.random.default_rng(1)
+    sea = (rng.random((90, 180)) > 0.2).astype(dtype)
+    n = 200
+    args = (
+        rng.uniform(-85.0, 85.0, n),
+        rng.uniform(-180.0, 180.0, n),
+        rng.uniform(-5.0, 5.0, n),
+        rng.uniform(-5.0, 5.0, n),
+    )
+    expected = utl._march_rays_numpy(sea, *args)
+    for result, exp in zip(utl.march_rays(sea, *args), expected):
+        np.testing.assert_allclose(result, exp, atol=1e-9)
+
+
+def _linear_field(nt, ny, nx, dv, du, dt):
+    # Values at the centers of the cells
+    t = (np.arange(nt) + 0.5) * dt
+    lat = (np.arange(ny) + 0.5) * dv - 90.0
+    lon = (np.arange(nx) + 0.5) * du - 180.0
+    t, lat, lon = np.meshgrid(t, lat, lon, indexing="ij")
+    u = 2.0 * lat - 0.5 * lon + 3.0 * t + 1.0
+    v = -lat + 0.25 * lon - t
+    return u, v
+
+
+@pytest.mark.parametrize("interpolate", [utl.interpolate_uv, utl._interpolate_uv_numpy])
+def test_interpolate_uv_is_exact_on_a_linear_field(interpolate):
+    dv, du, dt = 2.0, 3.0, 6.0
+    u, v = _linear_field(8, 90, 120, dv, du, dt)
+    rng = np.random.default_rng(2)
+    # Stay between the first and last cell centers, where the field is not
+    # clamped or wrapped
+    lat = rng.uniform(-89.0, 89.0, 500)
+    lon = rng.uniform(-178.5, 178.5, 500)
+    t = rng.uniform(3.0, 45.0, 500)
+    out_u, out_v = interpolate(u, v, lat, lon, t, dv, du, dt, 1.0, False)
+    np.testing.assert_allclose(out_u, 2.0 * lat - 0.5 * lon + 3.0 * t + 1.0)
+    np.testing.assert_allclose(out_v, -lat + 0.25 * lon - t, atol=1e-12)
+
+
+def test_interpolate_uv_returns_grid_values_at_cell_centers():
+    dv, du, dt = 2.0, 3.0, 6.0
+    u, v = _linear_field(8, 90, 120, dv, du, dt)
+    lat = np.array([-89.0, 1.0, 89.0])
+    lon = np.array([-178.5, 1.5, 178.5])
+    t = np.array([3.0, 15.0, 45.0])
+    out_u, out_v = utl.interpolate_uv(u, v, lat, lon, t, dv, du, dt, 1.0, False)
+    np.testing.assert_allclose(out_u, u[[0, 2, 7], [0, 45, 89], [0, 60, 119]])
+    np.testing.assert_allclose(out_v, v[[0, 2, 7], [0, 45, 89], [0, 60, 119]])
+
+
+def test_interpolate_uv_wraps_longitude_and_periodic_time():
+    u = np.zeros((2, 1, 2))
+    u[0, 0, 1] = 1.0
+    u[1, 0, 1] = 1.0
+    v = np.zeros_like(u)
+    # Halfway between the last cell center (90) and the first one (-90)
+    out_u, _ = utl.interpolate_uv(
+        u,
+        v,
+        np.array([0.0]),
+        np.array([180.0]),
+        np.array([3.0]),
+        180.0,
+        180.0,
+        6.0,
+        1.0,
+        False,
+    )
+    assert np.isclose(out_u[0], 0.5)
+    # Halfway between the last time slice and the first one
+    u = np.zeros((2, 1, 1))
+    u[1] = 1.0
+    v = np.zeros_like(u)
+    for periodic, expected in ((True, 0.5), (False, 1.0)):
+        out_u, _ = utl.interpolate_uv(
+            u,
+            v,
+            np.array([0.0]),
+            np.array([0.0]),
+            np.array([12.0]),
+            180.0,
+            360.0,
+            6.0,
+            1.0,
+            periodic,
+        )
+        assert np.isclose(out_u[0], expected)
+
+
+def test_interpolate_uv_dequantizes_integer_fields():
+    dv, du, dt = 2.0, 3.0, 6.0
+    u, v = _linear_field(8, 90, 120, dv, du, dt)
+    scale = 0.01
+    qu = np.round(u / scale).astype(np.int16)
+    qv = np.round(v / scale).astype(np.int16)
+    lat = np.array([-30.0, 12.5])
+    lon = np.array([40.0, -100.0])
+    t = np.array([10.0, 20.0])
+    expected = utl.interpolate_uv(u, v, lat, lon, t, dv, du, dt, 1.0, False)
+    result = utl.interpolate_uv(qu, qv, lat, lon, t, dv, du, dt, scale, False)
+    np.testing.assert_allclose(result, expected, atol=scale)
+
+
+def _wind_force_loop(headings, u, v):
+    forces = []
+    for h, wu, wv in zip(headings, u, v):
+        h = np.radians(h)
+        forces.append(
+            utl.wind_force(np.array([np.cos(h), np.sin(h)]), np.array([wu, wv]))
+        )
+    return np.array(forces)
+
+
+def test_wind_force_many_matches_wind_force():
+    rng = np.random.default_rng(4)
+    headings = rng.uniform(0.0, 360.0, 300)
+    u = rng.normal(0.0, 10.0, 300)
+    v = rng.normal(0.0, 10.0, 300)
+    expected = _wind_force_loop(headings, u, v)
+    fx, fy = utl.wind_force_many(headings, u, v)
+    np.testing.assert_allclose(fx, expected[:, 0], atol=1e-12)
+    np.testing.assert_allclose(fy, expected[:, 1], atol=1e-12)
+    out_x = np.empty(300)
+    out_y = np.empty(300)
+    utl._wind_force_many_numpy(headings, u, v, np.ones(300), out_x, out_y)
+    np.testing.assert_allclose(out_x, expected[:, 0], atol=1e-12)
+    np.testing.assert_allclose(out_y, expected[:, 1], atol=1e-12)
+
+
+def test_wind_force_many_broadcasts_and_scales_with_sail():
+    headings = np.arange(0.0, 360.0, 15.0)
+    fx, fy = utl.wind_force_many(headings[:, None], [3.0, -2.0], [1.0, 4.0], 0.5)
+    assert fx.shape == (24, 2)
+    expected_x, expected_y = utl.wind_force_many(
+        np.repeat(headings, 2), np.tile([3.0, -2.0], 24), np.tile([1.0, 4.0], 24)
+    )
+    np.testing.assert_allclose(fx.ravel(), 0.5 * expected_x)
+    np.testing.assert_allclose(fy.ravel(), 0.5 * expected_y)
+
+
+@pytest.mark.parametrize(
+    "wind_force_many", [utl.wind_force_many, utl._wind_force_many_numpy]
+)
+def test_wind_force_many_gives_no_force_without_wind_or_in_head_wind(
+    wind_force_many,
+):
+    # No wind, and a wind coming from straight ahead (heading East, wind blowing West)
+    headings = np.array([0.0, 90.0, 0.0])
+    u = np.array([0.0, 0.0, -5.0])
+    v = np.array([0.0, 0.0, 0.0])
+    if wind_force_many is utl.wind_force_many:
+        fx, fy = wind_force_many(headings, u, v)
+    else:
+        fx, fy = np.empty(3), np.empty(3)
+        wind_force_many(headings, u, v, np.ones(3), fx, fy)
+    assert np.all(np.isfinite(fx)) and np.all(np.isfinite(fy))
+    np.testing.assert_allclose(fx, 0.0, atol=1e-12)
+    np.testing.assert_allclose(fy, 0.0, atol=1e-12)
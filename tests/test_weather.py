@@ -0,0 +1,75 @@
+# SPDX-License-Identifier: BSD-3-Clause
+
+import numpy as np
+import pytest
+
+from vendeeglobe import config
+from vendeeglobe.weather import Weather, convert_fields
+
+
+def _fields(seed=0, nt=4, ny=16, nx=32):
+    rng = np.random.default_rng(seed)
+    return {
+        key: rng.normal(0.0, 20.0, (nt, ny, nx))
+        for key in ("u", "v", "blurred_u", "blurred_v")
+    }
+
+
+@pytest.mark.parametrize("interpolation", ["nearest", "linear"])
+def test_forecast_times_are_the_centers_of_the_slices(interpolation):
+    weather = Weather(time_limit=12, fields=_fields(), interpolation=interpolation)
+    forecast = weather.get_forecast(0)
+    times = forecast.times
+    step = config.weather_update_interval * config.seconds_to_hours
+    np.testing.assert_allclose(np.diff(times), step)
+    assert times[0] == 0.5 * step
+    lat = forecast.latitudes[3]
+    lon = forecast.longitudes[5]
+    for k, t in enumerate(times):
+        u, v = forecast(np.array([lat]), np.array([lon]), np.array([t]))
+        np.testing.assert_allclose(u, forecast.u[k, 3, 5])
+        np.testing.assert_allclose(v, forecast.v[k, 3, 5])
+
+
+def test_forecast_grids_of_quantized_weather_are_wind_speeds():
+    fields = _fields()
+    weather = Weather(time_limit=12, fields=convert_fields(fields, "int16"))
+    reference = Weather(time_limit=12, fields=fields)
+    forecast = weather.get_forecast(0)
+    expected = reference.get_forecast(0)
+    assert forecast.u.dtype.kind == "f"
+    assert not forecast.u.flags.writeable
+    assert not forecast.v.flags.writeable
+    tol = 2 * weather.scale
+    np.testing.assert_allclose(forecast.u, expected.u, atol=tol)
+    np.testing.assert_allclose(forecast.v, expected.v, atol=tol)
+
+
+@pytest.mark.parametrize("interpolation", ["nearest", "linear"])
+def test_forecast_sample_many_with_2d_grids(interpolation):
+    weather = Weather(time_limit=12, fields=_fields(), interpolation=interpolation)
+    forecast = weather.get_forecast(0)
+    lat, lon = np.meshgrid(
+        np.linspace(-60, 60, 5), np.linspace(-170, 170, 7), indexing="ij"
+    )
+    out_u = np.empty(lat.shape)
+    out_v = np.empty(lat.shape)
+    forecast.sample_many(lat, lon, 1.0, out_u, out_v)
+    flat_u = np.empty(lat.size)
+    flat_v = np.empty(lat.size)
+    forecast.sample_many(lat.ravel(), lon.ravel(), 1.0, flat_u, flat_v)
+    np.testing.assert_allclose(out_u.ravel(), flat_u)
+    np.testing.assert_allclose(out_v.ravel(), flat_v)
+
+
+def test_forecast_sample_many_rejects_bad_outputs():
+    forecast = Weather(time_limit=12, fields=_fields()).get_forecast(0)
+    lat = np.zeros((3, 4))
+    with pytest.raises(ValueError, match="shape"):
+        forecast.sample_many(lat, lat, 0.0, np.empty(12), np.empty(12))
+    with pytest.raises(TypeError, match="float64 or float32"):
+        forecast.sample_many(lat, lat, 0.0, np.empty((3, 4), dtype=int), lat.copy())
+    with pytest.raises(ValueError, match="contiguous"):
+        forecast.sample_many(lat, lat, 0.0, np.empty((4, 3)).T, lat.copy())
+    with pytest.raises(TypeError, match="same dtype"):
+        forecast.sample_many(lat, lat, 0.0, lat.copy(), lat.astype(np.float32))